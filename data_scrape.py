@@ -1,167 +1,47 @@
-import os
 from datetime import datetime
-from dotenv import load_dotenv
-from googleapiclient.discovery import build
-from youtube_transcript_api import YouTubeTranscriptApi
-import psycopg2
-from psycopg2.extras import execute_values
-
-# Load environment variables
-load_dotenv()
-
-SUPABASE_CONNECTION_STRING = os.getenv("SUPABASE_CONNECTION_STRING")
-google_cloud_api_key = os.getenv("google_cloud_api_key")
-
-# Initialize YouTube API
-youtube = build("youtube", "v3", developerKey=google_cloud_api_key)
+from jtbc import db
+from jtbc.captions import fetch_best_captions
+from jtbc.discovery import enumerate_videos
+from jtbc.ytapi import harvest_comments
 
 # Date range
 START_DATE = datetime(2024, 11, 1)
 END_DATE = datetime(2025, 10, 31)
 
 def get_playlist_videos(playlist_id):
-    """Fetch all videos from a playlist within date range"""
-    videos = []
-    next_page_token = None
-    
-    while True:
-        request = youtube.playlistItems().list(
-            part="snippet,contentDetails",
-            playlistId=playlist_id,
-            maxResults=50,
-            pageToken=next_page_token
-        )
-        response = request.execute()
-        
-        for item in response['items']:
-            published_at = datetime.strptime(
-                item['snippet']['publishedAt'], 
-                '%Y-%m-%dT%H:%M:%SZ'
-            )
-            
-            if START_DATE <= published_at <= END_DATE:
-                video_id = item['contentDetails']['videoId']
-                videos.append({
-                    'video_id': video_id,
-                    'title': item['snippet']['title'],
-                    'published_at': published_at,
-                    'url': f"https://www.youtube.com/watch?v={video_id}"
-                })
-        
-        next_page_token = response.get('nextPageToken')
-        if not next_page_token:
-            break
-    
-    return videos
+    """Fetch all videos from a playlist within date range
 
-def get_video_comments(video_id, max_comments=100):
-    """Fetch comments for a video"""
-    comments = []
-    
-    try:
-        request = youtube.commentThreads().list(
-            part="snippet",
-            videoId=video_id,
-            maxResults=max_comments,
-            textFormat="plainText"
-        )
-        response = request.execute()
-        
-        for item in response['items']:
-            comment = item['snippet']['topLevelComment']['snippet']
-            comments.append({
-                'author': comment['authorDisplayName'],
-                'text': comment['textDisplay'],
-                'published_at': comment['publishedAt'],
-                'like_count': comment['likeCount']
-            })
-    except Exception as e:
-        print(f"Error fetching comments for {video_id}: {e}")
-    
-    return comments
+    Stops paging once the playlist runs past START_DATE and adds duration/statistics
+    from batched videos().list calls (see jtbc.discovery).
+    """
+    return enumerate_videos(START_DATE, END_DATE, playlist_ids=[playlist_id])
+
+def get_video_caption_segments(video_id):
+    """Fetch caption pieces with timing as [{"start", "end", "text"}]
+
+    Tries manual captions, then auto captions that pass the quality check.
+    Videos without usable captions are left for the STT engine (python -m jtbc transcribe).
+    """
+    result = fetch_best_captions(video_id, languages=['ko', 'en'])
+    if result is None:
+        print(f"No usable captions for {video_id}")
+        return None
+    return result.segments
 
 def get_video_transcript(video_id):
     """Fetch transcript for a video"""
-    try:
-        transcript_list = YouTubeTranscriptApi.get_transcript(
-            video_id, 
-            languages=['ko', 'en']
-        )
-        transcript = ' '.join([t['text'] for t in transcript_list])
-        return transcript
-    except Exception as e:
-        print(f"Error fetching transcript for {video_id}: {e}")
+    segments = get_video_caption_segments(video_id)
+    if not segments:
         return None
+    return ' '.join(seg['text'] for seg in segments)
 
 def create_tables(conn):
-    """Create database tables if they don't exist"""
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS videos (
-            id SERIAL PRIMARY KEY,
-            video_id VARCHAR(50) UNIQUE NOT NULL,
-            title TEXT,
-            published_at TIMESTAMP,
-            url TEXT,
-            transcript TEXT,
-            created_at TIMESTAMP DEFAULT NOW()
-        )
-    """)
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS comments (
-            id SERIAL PRIMARY KEY,
-            video_id VARCHAR(50) REFERENCES videos(video_id),
-            author VARCHAR(255),
-            text TEXT,
-            published_at TIMESTAMP,
-            like_count INTEGER,
-            created_at TIMESTAMP DEFAULT NOW()
-        )
-    """)
-    
-    conn.commit()
-    cursor.close()
+    """Create database tables if they don't exist (videos, comments, transcript_segments, llm_scores)"""
+    db.get_storage().create_tables(conn)
 
 def insert_data(conn, videos_data):
-    """Insert videos and comments into database"""
-    cursor = conn.cursor()
-    
-    for video in videos_data:
-        # Insert video
-        cursor.execute("""
-            INSERT INTO videos (video_id, title, published_at, url, transcript)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (video_id) DO NOTHING
-        """, (
-            video['video_id'],
-            video['title'],
-            video['published_at'],
-            video['url'],
-            video.get('transcript')
-        ))
-        
-        # Insert comments
-        if video.get('comments'):
-            comments_data = [
-                (
-                    video['video_id'],
-                    comment['author'],
-                    comment['text'],
-                    comment['published_at'],
-                    comment['like_count']
-                )
-                for comment in video['comments']
-            ]
-            
-            execute_values(cursor, """
-                INSERT INTO comments (video_id, author, text, published_at, like_count)
-                VALUES %s
-            """, comments_data)
-    
-    conn.commit()
-    cursor.close()
+    """Insert videos, caption timing and comments into database"""
+    db.get_storage().insert_data(videos_data, conn)
 
 def display_first_10_rows(conn):
     """Display first 10 rows from videos and comments"""
@@ -189,20 +69,25 @@ def main():
     videos = get_playlist_videos(playlist_id)
     print(f"Found {len(videos)} videos in date range")
     
-    # Connect to database
-    conn = psycopg2.connect(SUPABASE_CONNECTION_STRING)
+    # Connect to database (JTBC_DATABASE_URL selects Postgres, SQLite or DuckDB)
+    conn = db.get_db_connection()
     create_tables(conn)
     
+    # Fetch comments for all videos concurrently (async client, pooled connections)
+    print("Fetching comments...")
+    comments_by_video = harvest_comments([video['video_id'] for video in videos], max_comments=100)
+    
     # Process each video
     for i, video in enumerate(videos, 1):
         print(f"\nProcessing video {i}/{len(videos)}: {video['title']}")
         
         # Get comments
-        video['comments'] = get_video_comments(video['video_id'])
+        video['comments'] = comments_by_video.get(video['video_id'], [])
         print(f"  - Fetched {len(video['comments'])} comments")
         
-        # Get transcript
-        video['transcript'] = get_video_transcript(video['video_id'])
+        # Get transcript (keep caption timing for transcript_segments)
+        video['segments'] = get_video_caption_segments(video['video_id'])
+        video['transcript'] = ' '.join(seg['text'] for seg in video['segments']) if video['segments'] else None
         if video['transcript']:
             print(f"  - Fetched transcript ({len(video['transcript'])} chars)")
         
@@ -0,0 +1,5 @@
+"""JTBC 뉴스룸 수집/분석 파이프라인 패키지.
+
+스크립트마다 복사돼 있던 설정, 다운로드, STT 로직을 한곳에 모은 엔진입니다.
+CLI: ``python -m jtbc transcribe --since 2025-04-13 --until 2025-07-10 --workers 2``
+"""
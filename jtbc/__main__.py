@@ -0,0 +1,4 @@
+from jtbc.cli import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""yt-dlp 오디오 다운로드와 pydub 분할."""
+import os
+import random
+from pathlib import Path
+from typing import NamedTuple
+
+from jtbc import config, metrics, profiling, shutdown
+
+
+class AudioChunk(NamedTuple):
+    """분할된 오디오 청크. start_ms/end_ms 는 원본 오디오 기준 위치."""
+    index: int
+    path: str
+    start_ms: int
+    end_ms: int
+
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+
+
+def is_bot_block(e: Exception) -> bool:
+    """봇 감지/차단 계열 오류인지 판별합니다."""
+    msg = str(e).lower()
+    return 'bot' in msg or 'captcha' in msg or '429' in msg or 'too many requests' in msg
+
+
+def build_ydl_opts(output_path: str, sleep: tuple = None) -> dict:
+    """yt-dlp 옵션을 구성합니다. (봇 차단 우회 옵션 포함)"""
+    sleep_min, sleep_max = sleep or config.sleep_range()
+    opts = {
+        'format': 'bestaudio[ext=m4a]/bestaudio/best',
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '32',  # STT 전용으로 32kbps로 설정 (최대 압축)
+        }],
+        'postprocessor_args': [
+            '-ar', '8000',   # 샘플레이트 8kHz로 낮춤 (음성 인식에 충분, 파일 크기 최소화)
+            '-ac', '1',      # 모노로 변환 (STT에는 스테레오 불필요)
+        ],
+        'outtmpl': output_path,
+        'quiet': True,
+        'noplaylist': True,
+        'socket_timeout': 30,
+        'retries': 10,
+        'fragment_retries': 10,
+        'concurrent_fragment_downloads': 1,
+        'sleep_interval': sleep_min,
+        'max_sleep_interval': sleep_max,
+        'geo_bypass': True,
+        'http_headers': {
+            # 일부 네트워크/차단 회피용 브라우저 헤더
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
+            'Accept-Encoding': 'gzip, deflate',
+        },
+        'extractor_args': {
+            'youtube': {
+                # 플레이어 클라이언트 변경으로 차단 회피 시도
+                'player_client': ['android', 'web'],
+                'skip': ['hls', 'dash'],  # HLS/DASH 스트림 건너뛰기
+            }
+        },
+    }
+    if config.YTDLP_PROXY:
+        opts['proxy'] = config.YTDLP_PROXY
+    if config.YTDLP_COOKIEFILE and Path(config.YTDLP_COOKIEFILE).exists():
+        opts['cookiefile'] = config.YTDLP_COOKIEFILE
+    return opts
+
+
+@metrics.traced("download_audio")
+def download_audio(video_id: str, output_path: str, sleep: tuple = None, start_ms: int = None, end_ms: int = None) -> str:
+    """유튜브 영상의 오디오를 다운로드합니다.
+
+    start_ms/end_ms 를 주면 해당 구간만 받습니다. (yt-dlp download_ranges)
+    """
+    import yt_dlp
+
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    ydl_opts = build_ydl_opts(output_path, sleep)
+    if start_ms is not None and end_ms is not None:
+        from yt_dlp.utils import download_range_func
+
+        ydl_opts['download_ranges'] = download_range_func(None, [(start_ms / 1000, end_ms / 1000)])
+        ydl_opts['force_keyframes_at_cuts'] = True
+
+    last_err = None
+    for attempt in range(1, config.YTDLP_MAX_ATTEMPTS + 1):
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([url])
+            return f"{output_path}.mp3"
+        except Exception as e:
+            last_err = e
+            if is_bot_block(e):
+                # 봇 감지 시 대기 시간 2배 + 추가 지연
+                print("  - ⚠️ 봇 차단 감지! 대기 시간을 늘립니다...")
+                delay = config.YTDLP_BACKOFF_BASE * (2 ** (attempt - 1)) * 2 + random.uniform(5, 15)
+            else:
+                delay = config.YTDLP_BACKOFF_BASE * (2 ** (attempt - 1)) + random.uniform(0, 1.0)
+            print(f"  - 다운로드 재시도 {attempt}/{config.YTDLP_MAX_ATTEMPTS} 예정, 대기 {delay:.1f}s: {e}")
+            if shutdown.wait(delay):
+                # 종료 중에는 재시도하지 않음 (다음 실행에서 다시 받음)
+                raise shutdown.Interrupted(f"종료 요청으로 다운로드 재시도 중단 ({video_id})") from e
+
+    raise RuntimeError(f"오디오 다운로드 실패 ({video_id}): {last_err}")
+
+
+@profiling.track_memory("split_audio_file")
+@metrics.traced("split_audio_file")
+def split_audio_file(audio_path: str, chunk_duration_minutes: int = 10, skip=()) -> list:
+    """오디오 파일을 여러 청크로 분할합니다. (pydub 사용)
+
+    AudioChunk 목록을 반환합니다. skip 에 든 인덱스와 이미 파일이 있는 청크는 다시 내보내지 않습니다.
+    """
+    try:
+        from pydub import AudioSegment
+    except ImportError:
+        raise RuntimeError("pydub 패키지가 필요합니다. 설치: pip install pydub")
+
+    audio = AudioSegment.from_mp3(audio_path)
+    chunk_length_ms = chunk_duration_minutes * 60 * 1000  # 분을 밀리초로 변환
+
+    chunks = []
+    for i in range(0, len(audio), chunk_length_ms):
+        index = i // chunk_length_ms
+        chunk_path = f"{audio_path}_chunk_{index}.mp3"
+        if index not in skip and not os.path.exists(chunk_path):
+            chunk = audio[i:i + chunk_length_ms]
+            # 내보내는 도중 중단돼도 불완전한 청크가 남지 않도록 임시 이름으로 쓰고 교체
+            tmp_path = chunk_path + ".part"
+            chunk.export(tmp_path, format="mp3", bitrate="32k", parameters=["-ar", "8000", "-ac", "1"])
+            os.replace(tmp_path, chunk_path)
+        chunks.append(AudioChunk(index, chunk_path, i, min(i + chunk_length_ms, len(audio))))
+
+    return chunks
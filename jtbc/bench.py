@@ -0,0 +1,291 @@
+"""종단간 벤치마크: 로컬 가짜 서버와 합성 데이터로 수집 -> 전사 -> 스코어링 처리량을 잽니다.
+
+    python -m jtbc bench                                   # 임시 SQLite DB, 기본 규모
+    python -m jtbc bench --videos 50 --latency 0.05 --rate-limit-rate 0.05 --json bench.json
+    python -m jtbc bench --baseline bench.json --tolerance 0.2   # 기준보다 20% 이상 느려지면 종료 코드 1
+
+외부 API 는 jtbc.fakes 의 FakeYouTubeServer / FakeOpenAIServer 로 대체하고(지연, 429, 5xx 주입 가능),
+오디오는 8kHz 16bit 모노 WAV 를 합성합니다. (25MB 이하라 ffmpeg 없이 Whisper 직접 업로드 경로를 탐)
+DB 는 기본이 임시 SQLite 이고 --db 로 로컬 Postgres/DuckDB URL 을 줄 수 있습니다.
+
+단계별로 처리량(comments/s, videos/hour, texts/s), 호출 지연 p50/p99, 최대 RSS 를 보고합니다.
+합성 데이터는 seed 로 결정되므로 같은 인자면 같은 입력으로 다시 잴 수 있습니다.
+"""
+import array
+import asyncio
+import json
+import math
+import resource
+import shutil
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+from jtbc import config
+
+STAGES = ("comments", "transcribe", "score")
+SAMPLE_RATE = 8000
+WHISPER_LIMIT_BYTES = 25 * 1024 * 1024
+
+
+class StageResult(NamedTuple):
+    stage: str
+    items: int
+    seconds: float
+    throughput: float
+    unit: str
+    p50_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+
+
+def percentile(values: list, q: float) -> float:
+    """nearest-rank 백분위수. 값이 없으면 0."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+# ---- 메모리 ----
+
+def _reset_peak_rss():
+    # Linux 는 clear_refs 에 5 를 쓰면 VmHWM(최대 RSS)이 현재 값으로 초기화됨. 다른 OS 는 프로세스 전체 최대값
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# ---- 합성 오디오 ----
+
+def write_wav(path: Path, seconds: int, seed: int = 0):
+    """8kHz 16bit 모노 WAV (주파수가 바뀌는 사인파)를 씁니다."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for second in range(seconds):
+            freq = 220 + (seed * 37 + second * 11) % 660
+            samples = array.array("h", (int(8000 * math.sin(2 * math.pi * freq * i / SAMPLE_RATE))
+                                        for i in range(SAMPLE_RATE)))
+            wav.writeframes(samples.tobytes())
+
+
+def audio_corpus(directory: Path, count: int, minutes: float) -> list:
+    """영상별 합성 WAV 경로 목록. 같은 길이의 파일이 이미 있으면 다시 만들지 않습니다."""
+    seconds = int(minutes * 60)
+    if seconds * SAMPLE_RATE * 2 >= WHISPER_LIMIT_BYTES:
+        raise ValueError(f"합성 오디오는 25MB 미만이어야 합니다. (--audio-minutes {minutes} 은 너무 김)")
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = directory / f"vid{i}-{seconds}s.wav"
+        if not path.exists():
+            tmp = path.with_suffix(".part")
+            write_wav(tmp, seconds, seed=i)
+            tmp.replace(path)
+        paths.append(path)
+    return paths
+
+
+# ---- 단계 ----
+
+@contextmanager
+def _overrides(**values):
+    """config 값을 잠시 바꿨다가 되돌립니다."""
+    saved = {name: getattr(config, name) for name in values}
+    for name, value in values.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def _seed_videos(storage, count: int):
+    start = datetime(2025, 4, 1)
+    storage.upsert_videos([
+        {"video_id": f"vid{i}", "title": f"뉴스룸 vid{i}", "published_at": start + timedelta(days=count - i),
+         "url": f"https://www.youtube.com/watch?v=vid{i}"}
+        for i in range(count)
+    ])
+
+
+def bench_comments(storage, args) -> StageResult:
+    from jtbc.fakes import FakeYouTubeServer
+    from jtbc.ytapi import AsyncYouTubeClient
+
+    latencies = []
+
+    class TimedClient(AsyncYouTubeClient):
+        async def get(self, endpoint, **params):
+            started = time.perf_counter()
+            try:
+                return await super().get(endpoint, **params)
+            finally:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    async def harvest(server):
+        async with TimedClient("bench", server.base_url, args.concurrency) as yt:
+            results = await asyncio.gather(*(yt.video_comments(v, args.comments) for v in server.video_ids))
+            print(f"  - 댓글 요청 {yt.requests}회 (재시도 {yt.retries}회)")
+        return dict(zip(server.video_ids, results))
+
+    with FakeYouTubeServer(videos=args.videos, comments_per_video=args.comments, latency=args.latency,
+                           error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed) as server:
+        started = time.perf_counter()
+        comments = asyncio.run(harvest(server))
+        storage.insert_data([
+            {"video_id": video_id, "title": f"뉴스룸 {video_id}", "published_at": datetime(2025, 5, 1),
+             "url": f"https://www.youtube.com/watch?v={video_id}", "comments": rows}
+            for video_id, rows in comments.items()
+        ])
+        seconds = time.perf_counter() - started
+    total = sum(len(rows) for rows in comments.values())
+    return StageResult("comments", total, seconds, total / seconds, "comments/s",
+                       percentile(latencies, 50), percentile(latencies, 99), 0.0)
+
+
+def bench_transcribe(storage, args) -> StageResult:
+    from jtbc import openai_client, usage
+    from jtbc.transcribe import transcribe_audio
+
+    count = min(args.videos, args.audio_videos)
+    paths = audio_corpus(config.STATE_DIR / "bench" / "audio", count, args.audio_minutes)
+    latencies = []
+
+    def one(item):
+        index, path = item
+        started = time.perf_counter()
+        with usage.tag(video_id=f"vid{index}"):
+            transcript = transcribe_audio(str(path))
+        latencies.append((time.perf_counter() - started) * 1000)
+        storage.update_transcript(f"vid{index}", transcript.text, segments=transcript.segments)
+
+    openai_client.configure(args.workers)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(one, enumerate(paths)))
+    seconds = time.perf_counter() - started
+    return StageResult("transcribe", count, seconds, count / seconds * 3600, "videos/hour",
+                       percentile(latencies, 50), percentile(latencies, 99), 0.0)
+
+
+def bench_score(storage, args) -> StageResult:
+    import pandas as pd
+
+    from jtbc.scoring import analyze_batch, assemble_scores
+
+    df = storage.fetch_data().head(args.score_texts)
+    batches = [df.iloc[i:i + args.batch_size] for i in range(0, len(df), args.batch_size)]
+    latencies = []
+
+    def one(batch):
+        started = time.perf_counter()
+        results = analyze_batch(batch["text"].tolist())
+        latencies.append((time.perf_counter() - started) * 1000)
+        return assemble_scores(batch, results)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        scored = list(pool.map(one, batches))
+    if scored:
+        storage.insert_scores(pd.concat(scored, ignore_index=True))
+    seconds = time.perf_counter() - started
+    return StageResult("score", len(df), seconds, len(df) / seconds if seconds else 0.0, "texts/s",
+                       percentile(latencies, 50), percentile(latencies, 99), 0.0)
+
+
+def run(args) -> list:
+    """선택한 단계를 순서대로 실행하고 [StageResult] 를 반환합니다."""
+    from jtbc import db, openai_client, usage, whisper_cache
+    from jtbc.fakes import FakeOpenAIServer
+
+    tmpdir = None
+    url = args.db
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix="jtbc-bench-")
+        url = f"sqlite:///{tmpdir}/bench.db"
+    results = []
+    cache_mode = whisper_cache.mode()
+    try:
+        with FakeOpenAIServer(latency=args.latency, seconds_per_mb=args.whisper_seconds_per_mb,
+                              error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                              audio_bytes_per_second=SAMPLE_RATE * 2, seed=args.seed) as openai_server, \
+                _overrides(DATABASE_URL=url, OPENAI_API_KEY="sk-bench-local", OPENAI_BASE_URL=openai_server.base_url,
+                           OPENAI_ORG_ID="", OPENAI_PROJECT_ID="", OPENAI_PROXY=""):
+            openai_client.reset()
+            # 가짜 서버 호출의 비용은 추정치일 뿐이므로 예산 상한은 적용하지 않음
+            usage.set_budget(0, 0)
+            # 캐시 적중은 Whisper 경로를 재지 못하므로 벤치마크에서는 끔
+            whisper_cache.set_mode("off")
+            storage = db.get_storage(url)
+            storage.create_tables()
+            _seed_videos(storage, args.videos)
+            print(f"🏁 벤치마크: {storage.name} ({url})")
+            for stage in args.stages:
+                print(f"▶️ {stage}")
+                _reset_peak_rss()
+                if stage == "comments":
+                    result = bench_comments(storage, args)
+                elif stage == "transcribe":
+                    result = bench_transcribe(storage, args)
+                else:
+                    result = bench_score(storage, args)
+                results.append(result._replace(peak_rss_mb=peak_rss_mb()))
+            print(f"  - 가짜 OpenAI 요청 {openai_server.requests}회 "
+                  f"(전사 {openai_server.transcriptions}, chat {openai_server.completions})")
+            print(f"  - 사용량(추정 비용): {usage.describe_totals()}")
+            usage.flush()
+    finally:
+        whisper_cache.set_mode(cache_mode)
+        openai_client.reset()
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+    return results
+
+
+def report(results: list):
+    for r in results:
+        print(f"📊 {r.stage:10s} {r.items:>7,}건 {r.seconds:8.2f}s | {r.throughput:10,.1f} {r.unit:12s} | "
+              f"p50 {r.p50_ms:8.1f}ms p99 {r.p99_ms:8.1f}ms | 최대 RSS {r.peak_rss_mb:7.1f}MB")
+
+
+def save(results: list, path: str, params: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"params": params, "stages": [r._asdict() for r in results]}, f, ensure_ascii=False, indent=2)
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> list:
+    """기준 결과보다 처리량이 tolerance 이상 낮거나 p99 가 그만큼 높은 단계의 설명 목록."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {s["stage"]: s for s in json.load(f)["stages"]}
+    regressions = []
+    for r in results:
+        base = baseline.get(r.stage)
+        if base is None:
+            continue
+        if r.throughput < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{r.stage}: 처리량 {r.throughput:,.1f} < 기준 {base['throughput']:,.1f} {r.unit}")
+        if base["p99_ms"] and r.p99_ms > base["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{r.stage}: p99 {r.p99_ms:.1f}ms > 기준 {base['p99_ms']:.1f}ms")
+    return regressions
@@ -0,0 +1,101 @@
+"""자막 우선 대본 수집.
+
+오디오를 내려받기 전에 YouTube 자막을 먼저 시도합니다.
+
+    1. 수동 자막 (ko)
+    2. 자동 생성 자막 (ko) - 품질 기준을 통과한 경우만
+    3. 둘 다 없거나 품질 미달이면 None -> 호출자가 다운로드 + Whisper 로 대체
+
+youtube-transcript-api 1.x(인스턴스 API)와 0.x(클래스 메서드 API)를 모두 지원합니다.
+"""
+import os
+import re
+from typing import NamedTuple
+
+LANGUAGES = ['ko']
+
+# 품질 기준 (환경 변수로 조정)
+# 영상 길이 대비 자막이 덮는 시간 비율
+MIN_COVERAGE = float(os.getenv("CAPTION_MIN_COVERAGE", "0.6"))
+# 초당 글자 수. 한국어 뉴스 발화는 보통 초당 5~8자, 너무 낮으면 인식 누락이 많은 자동 자막
+MIN_CHARS_PER_SECOND = float(os.getenv("CAPTION_MIN_CPS", "2.0"))
+# [음악], [박수] 같은 비발화 태그 비율 상한
+MAX_NOISE_RATIO = float(os.getenv("CAPTION_MAX_NOISE_RATIO", "0.3"))
+
+_NOISE_RE = re.compile(r"^\s*[\[\(].*[\]\)]\s*$")
+
+
+class CaptionResult(NamedTuple):
+    kind: str          # "manual" | "auto"
+    language: str
+    text: str
+    segments: list     # [{"start", "end", "text"}]
+    coverage: float
+    chars_per_second: float
+
+
+def _fetch_snippets(transcript) -> list:
+    fetched = transcript.fetch()
+    # 1.x: FetchedTranscript(snippets=[FetchedTranscriptSnippet]), 0.x: list[dict]
+    items = getattr(fetched, "snippets", fetched)
+    segments = []
+    for item in items:
+        if isinstance(item, dict):
+            start, duration, text = item["start"], item.get("duration", 0), item["text"]
+        else:
+            start, duration, text = item.start, item.duration, item.text
+        segments.append({"start": round(start, 2), "end": round(start + duration, 2), "text": text})
+    return segments
+
+
+def _list_transcripts(video_id: str):
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    if hasattr(YouTubeTranscriptApi, "list_transcripts"):
+        return YouTubeTranscriptApi.list_transcripts(video_id)
+    return YouTubeTranscriptApi().list(video_id)
+
+
+def assess(segments: list, duration_seconds: float = None) -> tuple:
+    """(coverage, chars_per_second, noise_ratio) 를 계산합니다."""
+    if not segments:
+        return 0.0, 0.0, 1.0
+    spoken = [s for s in segments if not _NOISE_RE.match(s["text"])]
+    covered = sum(max(0.0, s["end"] - s["start"]) for s in spoken)
+    span = duration_seconds or max(s["end"] for s in segments) or 1.0
+    chars = sum(len(s["text"].strip()) for s in spoken)
+    noise_ratio = 1 - len(spoken) / len(segments)
+    return min(1.0, covered / span), chars / span, noise_ratio
+
+
+def is_acceptable(kind: str, segments: list, duration_seconds: float = None) -> bool:
+    """자막 품질 휴리스틱. 수동 자막은 내용만 있으면 통과, 자동 자막은 기준을 모두 만족해야 통과."""
+    coverage, cps, noise_ratio = assess(segments, duration_seconds)
+    if kind == "manual":
+        return cps > 0
+    return coverage >= MIN_COVERAGE and cps >= MIN_CHARS_PER_SECOND and noise_ratio <= MAX_NOISE_RATIO
+
+
+def fetch_best_captions(video_id: str, duration_seconds: float = None, languages: list = None) -> CaptionResult:
+    """수동 -> 자동 자막 순으로 시도해 품질 기준을 통과한 첫 자막을 반환합니다. 없으면 None."""
+    languages = languages or LANGUAGES
+    try:
+        transcripts = _list_transcripts(video_id)
+    except Exception as e:
+        print(f"  - 자막 목록 조회 실패 ({video_id}): {type(e).__name__}")
+        return None
+
+    for kind, finder in (("manual", transcripts.find_manually_created_transcript),
+                         ("auto", transcripts.find_generated_transcript)):
+        try:
+            transcript = finder(languages)
+            segments = _fetch_snippets(transcript)
+        except Exception:
+            continue
+        coverage, cps, _ = assess(segments, duration_seconds)
+        if not is_acceptable(kind, segments, duration_seconds):
+            print(f"  - {kind} 자막 품질 미달 ({video_id}): coverage={coverage:.2f}, cps={cps:.1f}")
+            continue
+        text = " ".join(s["text"].strip() for s in segments if s["text"].strip())
+        return CaptionResult(kind, getattr(transcript, "language_code", languages[0]), text, segments, coverage, cps)
+    return None
@@ -0,0 +1,120 @@
+"""영상별 STT 진행 상황(청크 단위) 체크포인트.
+
+긴 방송을 청크로 나눠 전사할 때 청크마다 결과를 파일에 기록합니다.
+실패 후 재실행하면 다운로드한 오디오와 남은 청크 파일을 재사용하고,
+텍스트가 없는 청크만 다시 Whisper로 보냅니다.
+
+    .jtbc_state/work/<video_id>/          다운로드 오디오, 청크 파일
+    .jtbc_state/work/<video_id>/checkpoint.json
+"""
+import json
+import os
+import shutil
+import threading
+
+from jtbc import config
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+def work_dir(video_id: str) -> str:
+    """영상별 작업 디렉토리 경로를 반환합니다. (없으면 생성)"""
+    path = config.STATE_DIR / "work" / video_id
+    path.mkdir(parents=True, exist_ok=True)
+    return str(path)
+
+
+def list_pending() -> list:
+    """체크포인트가 남아 있는(완료되지 않은) 영상 ID 목록."""
+    root = config.STATE_DIR / "work"
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if (p / CHECKPOINT_FILE).exists())
+
+
+class ChunkCheckpoint:
+    """한 영상의 청크 계획과 청크별 전사 결과를 보관합니다.
+
+    chunks 항목: {"index", "start_ms", "end_ms", "bytes", "text", "segments"}
+    segments 는 원본 오디오 기준 초 단위 [{"start", "end", "text"}] 입니다.
+    """
+
+    def __init__(self, video_id: str):
+        self.video_id = video_id
+        self.dir = work_dir(video_id)
+        self.path = os.path.join(self.dir, CHECKPOINT_FILE)
+        self._lock = threading.Lock()
+        self.data = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("video_id") == self.video_id:
+                return data
+        except (OSError, ValueError):
+            pass
+        return {"video_id": self.video_id, "chunk_minutes": None, "chunks": {}}
+
+    def _save(self):
+        # 중간에 죽어도 파일이 깨지지 않도록 임시 파일에 쓰고 교체
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def plan(self, chunk_minutes: int, chunks: list):
+        """청크 계획을 기록합니다. 분할 기준이 바뀌면 기존 결과는 버립니다."""
+        with self._lock:
+            if self.data.get("chunk_minutes") != chunk_minutes:
+                self.data = {"video_id": self.video_id, "chunk_minutes": chunk_minutes, "chunks": {}}
+            for chunk in chunks:
+                entry = self.data["chunks"].setdefault(str(chunk.index), {"index": chunk.index, "text": None})
+                entry.update({"start_ms": chunk.start_ms, "end_ms": chunk.end_ms})
+            self._save()
+
+    @property
+    def chunk_minutes(self):
+        return self.data.get("chunk_minutes")
+
+    @property
+    def total(self) -> int:
+        return len(self.data["chunks"])
+
+    def planned_chunks(self) -> list:
+        return [self.data["chunks"][k] for k in sorted(self.data["chunks"], key=int)]
+
+    def text(self, index: int):
+        entry = self.data["chunks"].get(str(index))
+        return entry.get("text") if entry else None
+
+    def done_indices(self) -> set:
+        return {c["index"] for c in self.data["chunks"].values() if c.get("text") is not None}
+
+    def record(self, index: int, text: str, size: int = None, segments: list = None):
+        """청크 하나의 전사 결과를 즉시 디스크에 기록합니다."""
+        with self._lock:
+            entry = self.data["chunks"].setdefault(str(index), {"index": index})
+            entry["text"] = text
+            if size is not None:
+                entry["bytes"] = size
+            if segments is not None:
+                entry["segments"] = segments
+            self._save()
+
+    def joined_text(self) -> str:
+        return " ".join(c["text"] for c in self.planned_chunks())
+
+    def joined_segments(self) -> list:
+        segments = []
+        for chunk in self.planned_chunks():
+            segments.extend(chunk.get("segments") or [])
+        return segments
+
+    def clear(self):
+        """영상 처리가 끝나면 작업 디렉토리(오디오, 청크, 체크포인트)를 삭제합니다."""
+        shutil.rmtree(self.dir, ignore_errors=True)
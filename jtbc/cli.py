@@ -0,0 +1,658 @@
+"""명령행 진입점.
+
+    python -m jtbc transcribe                                  # 대본 없는 영상 전체
+    python -m jtbc transcribe --since 2025-04-13 --until 2025-07-10
+    python -m jtbc transcribe --resume --start-index 131       # 131번째부터 재개
+    python -m jtbc transcribe --workers 3
+    python -m jtbc status                                      # 진행 현황 (API 호출 없음)
+    python -m jtbc backlog --limit 20                          # 대기 중인 영상 목록
+    python -m jtbc probe --backlog 50 --update-db              # 길이 조회 + 비용 추정
+    python -m jtbc search "특검"                               # 어느 영상 몇 분에 언급됐는지
+    python -m jtbc export                                      # Parquet 레이크로 증분 내보내기
+    python -m jtbc sync                                        # 내장 DB(JTBC_DATABASE_URL) -> Supabase 일괄 업로드
+    python -m jtbc migrate                                     # 스키마 마이그레이션 적용/현황
+    python -m jtbc bench --json bench.json                     # 가짜 서버로 종단간 처리량 측정
+    python -m jtbc usage --since 2025-05-01                    # Whisper/chat 사용량과 비용 리포트
+    python -m jtbc replay                                      # 캐시된 Whisper 응답으로 대본/구간 재구성 (API 호출 없음)
+    python -m jtbc shards <job_id> --csv daily.csv             # 샤드 스코어링 진행 현황과 합친 일 단위 시계열
+    python -m jtbc profiles --plan v2                          # 스코어링 프로필별 점수 수, 재스코어링이 필요한 행 수
+    python -m jtbc embed                                       # 댓글/대본 임베딩 (없는 것만) + IVF 색인 갱신
+    python -m jtbc topics --clusters 40 --score                # 주제 클러스터와 클러스터별 대표 텍스트 점수
+    python -m jtbc similar "특검 수사" -k 20                     # 의미가 비슷한 댓글/대본 검색
+    python -m jtbc live --hours 48                             # 새 업로드/댓글 계속 폴링 + 소량 배치 스코어링
+    python -m jtbc --profile transcribe                        # 플레임그래프용 스택/cProfile/메모리 스냅샷 저장
+
+무거운 모듈(openai, httpx, yt_dlp, psycopg2)은 각 명령 안에서 필요할 때만 import 합니다.
+"""
+import argparse
+
+from jtbc import config
+
+
+def _add_query_args(p):
+    from jtbc import scheduler
+
+    p.add_argument("--since", help="게시일 시작 (YYYY-MM-DD, 포함)")
+    p.add_argument("--until", help="게시일 종료 (YYYY-MM-DD, 포함)")
+    p.add_argument("--order", choices=scheduler.POLICIES, default=None,
+                   help=f"대기열 정렬 정책 (기본 {scheduler.DEFAULT_POLICY}, --resume 은 id)")
+    p.add_argument("--boost-hours", type=float, default=scheduler.DEFAULT_BOOST_HOURS,
+                   help="이 시간 이내 게시된 영상을 맨 앞으로 (0이면 끔)")
+
+
+def _resolve_order(args) -> str:
+    from jtbc import scheduler
+
+    if args.order:
+        return args.order
+    # --resume 의 순번은 기존 stt_resume.py 처럼 id 순 기준
+    return "id" if getattr(args, "resume", False) else scheduler.DEFAULT_POLICY
+
+
+def _add_transcribe_parser(subparsers):
+    p = subparsers.add_parser("transcribe", help="대본이 없는 영상의 오디오를 STT로 변환")
+    _add_query_args(p)
+    p.add_argument("--resume", action="store_true",
+                   help="중단 지점부터 재개 (--start-index 또는 START_INDEX 환경변수 사용, 보수적 대기 적용)")
+    p.add_argument("--start-index", type=int, default=None, help="재개 시작 순번 (1부터, 정렬된 대기열 기준. 진행 로그의 [N/전체] 번호)")
+    p.add_argument("--workers", type=int, default=1, help="동시에 처리할 영상 수 (기본 1)")
+    p.add_argument("--sleep-min", type=int, default=None, help="영상 간 최소 대기(초)")
+    p.add_argument("--sleep-max", type=int, default=None, help="영상 간 최대 대기(초)")
+    p.add_argument("--segmented", action="store_true",
+                   help="다운로드 전 길이 조회 후 긴 영상은 구간별로 받아 받는 즉시 전사")
+    p.add_argument("--captions", choices=("first", "only", "off"), default="first",
+                   help="자막 우선 수집: first=자막 실패 시 STT(기본), only=자막만, off=항상 STT")
+    p.add_argument("--caption-workers", type=int, default=8, help="자막 동시 조회 수")
+    p.add_argument("--profile", action="store_true", default=argparse.SUPPRESS,
+                   help="프로파일 모드 (stt.py --profile 용, python -m jtbc --profile 과 같음)")
+    p.add_argument("--whisper-cache", choices=("on", "off", "replay"), default=None,
+                   help="Whisper 응답 캐시: on=재사용+저장(기본), off=사용 안 함, replay=캐시만 사용 (기본 JTBC_WHISPER_CACHE)")
+    _add_budget_arguments(p)
+    p.set_defaults(func=_cmd_transcribe)
+
+
+def _add_budget_arguments(p):
+    p.add_argument("--budget-usd", type=float, default=None,
+                   help="이번 실행의 비용 상한(USD). 넘으면 중단 (기본 JTBC_BUDGET_USD)")
+    p.add_argument("--budget-usd-per-hour", type=float, default=None,
+                   help="시간당 비용 상한(USD). 넘으면 속도를 늦춤 (기본 JTBC_BUDGET_USD_PER_HOUR)")
+
+
+def _cmd_transcribe(args):
+    from jtbc import transcribe, usage, whisper_cache
+
+    usage.set_budget(args.budget_usd, args.budget_usd_per_hour)
+    if args.whisper_cache:
+        whisper_cache.set_mode(args.whisper_cache)
+
+    # 재개/기간 지정 실행은 봇 차단 위험이 높아 기본 대기 시간을 늘립니다.
+    cautious = args.resume or bool(args.since or args.until)
+    sleep_min, sleep_max = config.sleep_range(cautious)
+    if args.sleep_min is not None:
+        sleep_min = args.sleep_min
+    if args.sleep_max is not None:
+        sleep_max = args.sleep_max
+    start_index = args.start_index
+    if start_index is None:
+        start_index = config.START_INDEX if args.resume else 1
+
+    transcribe.run(
+        since=args.since,
+        until=args.until,
+        start_index=max(1, start_index),
+        workers=max(1, args.workers),
+        sleep=(sleep_min, max(sleep_min, sleep_max)),
+        order=_resolve_order(args),
+        boost_hours=args.boost_hours,
+        segmented=args.segmented,
+        captions=args.captions,
+        caption_workers=args.caption_workers,
+    )
+
+
+def _cmd_backlog(args):
+    from jtbc import db, scheduler
+
+    videos = db.get_videos_without_transcript(since=args.since, until=args.until)
+    videos = scheduler.order_videos(videos, _resolve_order(args), args.boost_hours)
+    for idx, video in enumerate(videos[:args.limit] if args.limit else videos, 1):
+        title = (video.get('title') or '')[:50]
+        duration = f"{video['duration_seconds'] // 60}분" if video.get('duration_seconds') else "?"
+        print(f"{idx:>5}. {video['video_id']}  {video.get('published_at') or 'N/A'}  "
+              f"댓글 {video.get('comment_count', 0)}  길이 {duration}  {title}")
+    print(f"대기 중인 영상 {len(videos)}개 | 예상 오디오 {scheduler.estimate_hours(videos):.1f}시간")
+
+
+def _cmd_status(args):
+    from jtbc import checkpoint, db
+
+    st = db.get_transcript_status()
+    print(f"영상 {st['total']}개 | 대본 완료 {st['done']}개 | 대기 {st['pending']}개")
+    if st['pending']:
+        print(f"대기 중 게시일 범위: {st['oldest_pending']} ~ {st['newest_pending']}")
+    for video_id in checkpoint.list_pending():
+        cp = checkpoint.ChunkCheckpoint(video_id)
+        print(f"  - 부분 진행: {video_id} 청크 {len(cp.done_indices())}/{cp.total or '?'}")
+
+
+def _cmd_probe(args):
+    from jtbc import db, probe, scheduler
+
+    video_ids = list(args.video_ids)
+    if args.backlog:
+        videos = db.get_videos_without_transcript(since=args.since, until=args.until)
+        videos = scheduler.order_videos(videos, _resolve_order(args), args.boost_hours)
+        video_ids += [v['video_id'] for v in videos if not v.get('duration_seconds')][:args.backlog]
+
+    total_cost = total_seconds = 0.0
+    for video_id in video_ids:
+        try:
+            info = probe.probe_video(video_id)
+        except Exception as e:
+            print(f"{video_id}: ❌ 조회 실패: {e}")
+            continue
+        plan = probe.plan_chunks(info.duration_seconds)
+        total_cost += plan.cost_usd
+        total_seconds += plan.estimated_seconds
+        print(f"{video_id}: {probe.describe(plan)} | 오디오 포맷 {len(info.audio_formats)}개 | {info.title[:40]}")
+        if args.update_db and info.duration_seconds:
+            db.update_duration(video_id, info.duration_seconds)
+    if len(video_ids) > 1:
+        print(f"합계: 예상 비용 ${total_cost:.2f} | 예상 소요 {total_seconds / 3600:.1f}시간")
+
+
+def _cmd_search(args):
+    from jtbc import db
+
+    days = args.days if args.days is not None else db.SHORT_QUERY_DAYS
+    rows = db.search_segments(args.query, limit=args.limit, source=args.source, short_days=days)
+    for row in rows:
+        start = int(row['start_s'])
+        stamp = f"{start // 3600:d}:{start % 3600 // 60:02d}:{start % 60:02d}"
+        print(f"{row['video_id']} [{stamp}] ({row['source']}) {row['text'][:80]}")
+        print(f"    https://www.youtube.com/watch?v={row['video_id']}&t={start}s  {(row['title'] or '')[:40]}")
+    print(f"{len(rows)}건")
+    if db.query_gram(args.query) is None:
+        # 한 글자 검색어는 색인 없이 훑으므로 기간을 제한함 (결과가 전체가 아님을 알림)
+        print(f"※ 한 글자 검색어는 최근 {days}일 게시 영상에서만 찾았습니다. (--days 로 조정)")
+    elif len(rows) == args.limit:
+        print(f"※ 최신 {args.limit}건까지만 표시했습니다. (--limit 로 조정)")
+
+
+def _cmd_discover(args):
+    from datetime import datetime
+
+    from jtbc import db, discovery
+
+    start = datetime.strptime(args.since, "%Y-%m-%d")
+    end = datetime.strptime(args.until, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+    videos = discovery.enumerate_videos(
+        start, end,
+        playlist_ids=args.playlist or (),
+        channel_ids=args.channel or (),
+        use_search=args.search,
+        workers=args.workers,
+    )
+    hours = sum(v.get('duration_seconds') or 0 for v in videos) / 3600
+    print(f"기간 내 영상 {len(videos)}개 | 총 길이 {hours:.1f}시간")
+    if args.save:
+        print(f"DB 저장: {db.upsert_videos(videos)}개")
+
+
+def _cmd_export(args):
+    from jtbc import lake
+
+    print(f"레이크: {config.LAKE_DIR}")
+    lake.export(tables=args.tables or lake.TABLES, full=args.full)
+
+
+def _cmd_lake(args):
+    from jtbc import lake
+
+    print(f"레이크: {config.LAKE_DIR}")
+    for name, partitions, files, rows, size in lake.summary():
+        print(f"  {name:12s} 월 파티션 {partitions:3d} | 파일 {files:4d} | {rows:>10,}행 | {size / 1024 / 1024:8.1f}MB")
+
+
+def _cmd_sync(args):
+    from jtbc import db
+
+    source = args.source or config.DATABASE_URL
+    target = args.target or config.SUPABASE_CONNECTION_STRING
+    print(f"{db.get_storage(source).name} -> {db.get_storage(target).name}")
+    db.sync_storage(source, target, batch_rows=args.batch_rows)
+
+
+def _cmd_migrate(args):
+    from jtbc import db, migrations
+
+    storage = db.get_storage()
+    with storage.connection() as conn:
+        migrations.migrate(storage, conn)
+        for table in args.partition or ():
+            created = migrations.partition_monthly(storage, conn, table, months_ahead=args.months_ahead)
+            print(f"{table}: 월 파티션 {created}개 생성")
+        for version, name, applied in migrations.status(storage, conn):
+            print(f"  v{version} {'✅' if applied else '  '} {name}")
+    print(f"저장소: {storage.name} | 스키마 버전 {migrations.LATEST}")
+
+
+def _cmd_usage(args):
+    from datetime import datetime
+
+    from jtbc import db
+
+    since = datetime.strptime(args.since, "%Y-%m-%d") if args.since else None
+    report = db.get_storage().usage_report(since)
+    total = 0.0
+    for row in report["models"]:
+        cost = row["cost_usd"] or 0.0
+        total += cost
+        detail = (f"오디오 {(row['audio_seconds'] or 0) / 60:,.1f}분" if row["kind"] == "whisper"
+                  else f"텍스트 {row['items'] or 0:,} | 토큰 {row['prompt_tokens'] or 0:,}+{row['completion_tokens'] or 0:,}")
+        print(f"{row['kind']:8s} {row['model'] or '?':14s} {row['calls']:>7,}회 (오류 {row['errors']}, 재시도 {row['retries']}) "
+              f"| {detail} | 평균 {row['latency_ms'] or 0:,.0f}ms | ${cost:,.4f}")
+        if row["kind"] == "chat" and row["items"]:
+            print(f"         텍스트 1천 건당 ${cost / row['items'] * 1000:.4f} | $1당 {row['items'] / cost if cost else 0:,.0f}건")
+    videos = report["videos"]
+    if videos:
+        costs = [v["cost_usd"] or 0.0 for v in videos]
+        whisper = sum(costs)
+        print(f"영상 {len(videos)}개 전사 | 영상당 평균 ${whisper / len(videos):.4f} (최대 ${max(costs):.4f} {videos[0]['video_id']}) "
+              f"| $1당 {len(videos) / whisper if whisper else 0:,.1f}개")
+    print(f"합계 ${total:,.4f}")
+    for run in report["runs"][:args.runs]:
+        print(f"  실행 {run['run_id']} {run['started']} ~ {run['finished']} | {run['calls']}회 | ${run['cost_usd'] or 0:.4f}")
+
+
+def _cmd_replay(args):
+    from jtbc import transcribe, whisper_cache
+
+    st = whisper_cache.stats()
+    print(f"Whisper 캐시: 응답 {st['entries']}개 ({st['bytes'] / 1024 / 1024:.1f}MB) | 영상 {st['videos']}개")
+    whisper_cache.set_mode("replay")
+    done = transcribe.replay(args.video_ids or None)
+    print(f"대본 재구성 {done}개 (API 호출 없음)")
+
+
+def _cmd_shards(args):
+    from datetime import datetime, timezone
+
+    from jtbc import db
+
+    storage = db.get_storage()
+    if not args.job_id:
+        jobs = storage.shard_jobs()
+        if not jobs:
+            print("샤드 작업이 없습니다. (python llm-ev.py --shards N)")
+        for job in jobs:
+            print(f"{job['job_id']:40s} 샤드 {job['done']}/{job['shards']} 완료 ({job['shard_by']}) "
+                  f"| {job['rows_done'] or 0:,}/{job['rows_total'] or 0:,}행 | 갱신 {job['updated_at']}")
+        return
+    if args.reset:
+        storage.drop_shard_job(args.job_id)
+        print(f"작업 {args.job_id} 의 샤드/합계 행을 지웠습니다. (llm_scores 는 그대로)")
+        return
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    shards = storage.shard_status(args.job_id)
+    if not shards:
+        print(f"작업이 없습니다: {args.job_id}")
+        return
+    counts = {}
+    for row in shards:
+        status = row["status"]
+        if status == "running" and row["lease_until"] and row["lease_until"] < now:
+            status = "expired"  # 다른 작업자가 이어받을 수 있음
+        counts[status] = counts.get(status, 0) + 1
+        total = row["rows_total"]
+        progress = f"{row['rows_done']:,}/{total:,} ({row['rows_done'] / total if total else 1:.0%})" if total is not None else f"{row['rows_done']:,}/?"
+        lease = f"임대 {(row['lease_until'] - now).total_seconds():+.0f}s" if row["lease_until"] else ""
+        print(f"  샤드 {row['shard']:>3} {status:8s} {progress:>22s} 시도 {row['attempts']} {row['owner'] or '':30s} {lease}")
+    print(" | ".join(f"{status} {n}" for status, n in sorted(counts.items())))
+
+    rollup = storage.shard_rollup(args.job_id)
+    if rollup:
+        import pandas as pd
+
+        ts = pd.DataFrame(rollup)
+        print(f"일 단위 합계 ({len(ts)}일, {int(ts['n'].sum()):,}행):")
+        print(ts.tail(10).to_string(index=False))
+        if args.csv:
+            ts.to_csv(args.csv, index=False)
+            print(f"저장: {args.csv}")
+
+
+def _cmd_profiles(args):
+    from jtbc import db, profiles
+
+    storage = db.get_storage()
+    if args.adopt_legacy:
+        profile = profiles.get(args.adopt_legacy)
+        profiles.register(profile, storage)
+        print(f"profile_id 가 없던 점수 {storage.adopt_legacy_scores(profile.profile_id):,}행을 {profile.name} 으로 표시했습니다.")
+        return
+    if args.plan:
+        profile = profiles.get(args.plan)
+        df = storage.fetch_data()
+        print(profiles.describe(profiles.plan(df, profile, storage)))
+        return
+    if args.compare:
+        import pandas as pd
+
+        a, b = (profiles.get(name) for name in args.compare)
+        pairs = pd.DataFrame(storage.profile_pairs(a.profile_id, b.profile_id),
+                             columns=["sentiment_a", "fairness_a", "sentiment_b", "fairness_b"]).astype(float)
+        if pairs.empty:
+            print(f"{a.name} 와 {b.name} 가 함께 스코어링한 텍스트가 없습니다. (llm-ev.py --ab {b.name})")
+            return
+        print(f"{a.name} vs {b.name}: 공통 텍스트 {len(pairs):,}개")
+        for field in ("sentiment", "fairness"):
+            x, y = pairs[f"{field}_a"], pairs[f"{field}_b"]
+            print(f"  {field:9s} 평균 {x.mean():+.3f} -> {y.mean():+.3f} | 평균 절대 차이 {(x - y).abs().mean():.3f} "
+                  f"| 상관 {x.corr(y):.3f}")
+        def sign(v):
+            return (v > 0.1).astype(int) - (v < -0.1).astype(int)
+
+        print(f"  감성 방향(±0.1) 일치율 {(sign(pairs['sentiment_a']) == sign(pairs['sentiment_b'])).mean():.1%}")
+        return
+
+    counts = {row["profile_id"]: row for row in storage.profile_counts()}
+    for profile in profiles.load().values():
+        row = counts.pop(profile.profile_id, None)
+        scored = f"{row['rows']:,}행 (최근 {row['last_scored']})" if row else "점수 없음"
+        default = " *" if profile.name == profiles.DEFAULT_PROFILE else ""
+        print(f"{profile.name}{default:2s} {profile.profile_id} {profile.model} t={profile.temperature:g} "
+              f"schema v{profile.schema_version} | {scored}")
+    for profile_id, row in counts.items():
+        label = (row["name"] or "(등록되지 않은 프로필)") if profile_id else "(프로필 미기록 기존 행, --adopt-legacy)"
+        print(f"{label} {profile_id or ''} | {row['rows']:,}행 (최근 {row['last_scored']})")
+
+
+def _embedding_frame(args):
+    from jtbc import db, profiles
+
+    if getattr(args, "from_lake", False):
+        from jtbc import lake
+
+        return profiles.with_hashes(lake.scoring_frame())
+    return profiles.with_hashes(db.get_storage().fetch_data())
+
+
+def _cmd_embed(args):
+    from jtbc import embeddings, shutdown, usage
+
+    usage.set_budget(args.budget_usd, args.budget_usd_per_hour)
+    store = embeddings.EmbeddingStore()
+    with shutdown.graceful(on_force=(usage.flush,)):
+        added = embeddings.embed_frame(_embedding_frame(args), store, args.batch_size or embeddings.BATCH_SIZE)
+    if len(store):
+        embeddings.load_index(store)
+    print(f"임베딩 저장소 {store.path}: {len(store):,}건 ({store.nbytes() / 1e6:.1f}MB, 이번에 {added:,}건 추가)")
+    print(f"사용량: {usage.describe_totals()}")
+
+
+def _cmd_topics(args):
+    from jtbc import db, embeddings, profiles, shutdown, usage
+
+    usage.set_budget(args.budget_usd, args.budget_usd_per_hour)
+    df = _embedding_frame(args)
+    store = embeddings.EmbeddingStore()
+    # Ctrl-C / SIGTERM: 임베딩/스코어링 배치를 더 보내지 않고 받은 것까지 저장한 뒤 주제를 보여 줌
+    with shutdown.graceful(on_force=(usage.flush,)):
+        embeddings.embed_frame(df, store)
+        if not len(store):
+            print("임베딩이 없습니다. (python -m jtbc embed)")
+            return
+        found = embeddings.topics(store, args.clusters, args.examples)
+        keys = store.keys()
+        texts = dict(zip(df["text_hash"], df["text"]))
+        first = df.drop_duplicates("text_hash").set_index("text_hash")
+        medoids = [keys[topic.examples[0]].decode() for topic in found]
+
+        scores = {}
+        if args.score:
+            # 클러스터마다 대표 텍스트 하나만 스코어링 (이미 점수가 있으면 그대로 사용)
+            from jtbc.scoring import score_dataframe
+
+            storage = db.get_storage()
+            profile = profiles.get(args.scoring_profile)
+            profiles.register(profile, storage)
+            profiles.require_adopted(storage)
+            plan = profiles.plan(first.loc[[h for h in medoids if h in first.index]].reset_index(), profile, storage)
+            if not plan.pending.empty and not shutdown.requested():
+                score_dataframe(plan.pending, sink=storage.insert_scores, profile=profile)
+                usage.flush()
+            scores = storage.scores_for(profile.profile_id, medoids)
+
+    rows = []
+    for topic, medoid in zip(found, medoids):
+        score = scores.get(medoid)
+        label = (f" | 대표 점수 감성 {score['sentiment']:+.2f} 공정 {score['fairness']:.2f}"
+                 if score and score["sentiment"] is not None else "")
+        print(f"\n#{topic.cluster:<3} {topic.size:,}건 ({topic.size / len(store):.1%}){label}")
+        for row in topic.examples:
+            print(f"   - {texts.get(keys[row].decode(), '?')[:100]}")
+        rows.append({"cluster": topic.cluster, "size": topic.size, "text_hash": medoid,
+                     "text": texts.get(medoid), "sentiment": score and score["sentiment"],
+                     "fairness": score and score["fairness"]})
+    if args.csv:
+        import pandas as pd
+
+        pd.DataFrame(rows).to_csv(args.csv, index=False)
+        print(f"저장: {args.csv}")
+
+
+def _cmd_similar(args):
+    from jtbc import db, embeddings
+
+    store = embeddings.EmbeddingStore()
+    if not len(store):
+        print("임베딩이 없습니다. (python -m jtbc embed)")
+        return
+    index = embeddings.load_index(store)
+    query = embeddings.embed_batch([args.query], store.model, store.dims, store.backend)
+    hits = embeddings.search(store, index, query, args.k, args.nprobe)[0]
+    keys = store.keys()
+    hashes = [keys[row].decode() for row, _ in hits]
+    # 전체 텍스트를 읽어 지문을 다시 계산하지 않고, 결과 지문만 llm_scores 의 text_hash 로 찾음
+    if args.from_lake:
+        from jtbc import lake
+
+        found = lake.read_pandas("llm_scores", columns=["text_hash", "dt", "text"],
+                                 filters=[("text_hash", "in", hashes)]) if hashes else None
+        texts = {} if found is None else {row.text_hash: {"dt": row.dt, "text": row.text}
+                                          for row in found.drop_duplicates("text_hash").itertuples()}
+    else:
+        texts = db.get_storage().texts_for(hashes)
+    for (row, sim), key in zip(hits, hashes):
+        hit = texts.get(key)
+        if hit:
+            print(f"{sim:.3f} {hit['dt']} {hit['text'][:100]}")
+        else:
+            print(f"{sim:.3f} (아직 스코어링되지 않은 텍스트 {key})")
+
+
+def _cmd_live(args):
+    from jtbc import live, profiles, usage
+
+    usage.set_budget(args.budget_usd, args.budget_usd_per_hour)
+    live.run(
+        args.playlist,
+        hours=args.hours,
+        profile=profiles.get(args.scoring_profile),
+        score=not args.no_score,
+        concurrency=args.concurrency,
+        once=args.once,
+    )
+    print(f"사용량: {usage.describe_totals()}")
+
+
+def _cmd_bench(args):
+    from jtbc import bench, metrics
+
+    results = bench.run(args)
+    bench.report(results)
+    for stage, calls, total, mean, errors, cpu in metrics.summary():
+        print(f"  ⏱️ {stage:18s} {calls:>6}회 합계 {total:8.2f}s (CPU {cpu:6.2f}s) 평균 {mean * 1000:8.1f}ms 오류 {errors}")
+    if args.json:
+        bench.save(results, args.json, {k: v for k, v in vars(args).items() if k not in ("func", "command")})
+        print(f"결과 저장: {args.json}")
+    if args.baseline:
+        regressions = bench.compare(results, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"⚠️ 성능 저하: {line}")
+        if regressions:
+            raise SystemExit(1)
+        print(f"✅ 기준({args.baseline}) 대비 ±{args.tolerance:.0%} 이내")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="jtbc", description="JTBC 뉴스룸 수집/분석 파이프라인")
+    parser.add_argument("--profile", action="store_true", default=argparse.SUPPRESS,
+                        help="샘플링/cProfile/tracemalloc 프로파일을 .jtbc_state/profiles/ 에 저장")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_transcribe_parser(subparsers)
+
+    p = subparsers.add_parser("backlog", help="대본이 없는 영상 목록 출력")
+    _add_query_args(p)
+    p.add_argument("--limit", type=int, default=None, help="최대 출력 개수")
+    p.set_defaults(func=_cmd_backlog)
+
+    p = subparsers.add_parser("probe", help="다운로드 없이 길이/포맷 조회, 청크 계획과 비용 추정")
+    p.add_argument("video_ids", nargs="*", help="조회할 영상 ID")
+    p.add_argument("--backlog", type=int, default=0, help="대기열에서 길이 미상인 영상 N개를 추가로 조회")
+    p.add_argument("--update-db", action="store_true", help="조회한 길이를 videos.duration_seconds 에 저장")
+    _add_query_args(p)
+    p.set_defaults(func=_cmd_probe)
+
+    p = subparsers.add_parser("discover", help="재생목록/채널에서 기간 내 영상 조회 (조기 중단 + 50개 묶음 상세 조회)")
+    p.add_argument("--playlist", action="append", help="재생목록 ID (여러 번 지정 가능)")
+    p.add_argument("--channel", action="append", help="채널 ID (업로드 재생목록 사용)")
+    p.add_argument("--search", action="store_true", help="채널은 search API(publishedAfter/Before)로 조회")
+    p.add_argument("--since", required=True, help="게시일 시작 (YYYY-MM-DD)")
+    p.add_argument("--until", required=True, help="게시일 종료 (YYYY-MM-DD, 포함)")
+    p.add_argument("--workers", type=int, default=4, help="동시 조회 수")
+    p.add_argument("--save", action="store_true", help="videos 테이블에 저장")
+    p.set_defaults(func=_cmd_discover)
+
+    p = subparsers.add_parser("search", help="대본 구간에서 키워드 위치 검색")
+    p.add_argument("query", help="검색어 (부분 일치)")
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--source", choices=("whisper", "caption"), default=None)
+    p.add_argument("--days", type=int, default=None,
+                   help="한 글자 검색어를 찾을 최근 기간(일, 기본 JTBC_SEARCH_SHORT_DAYS=30)")
+    p.set_defaults(func=_cmd_search)
+
+    p = subparsers.add_parser("export", help="DB를 월별 파티션 Parquet(zstd)로 증분 내보내기")
+    p.add_argument("--tables", nargs="+", choices=("videos", "comments", "transcripts", "llm_scores"),
+                   help="내보낼 테이블 (기본 전체)")
+    p.add_argument("--full", action="store_true", help="기존 파일과 워터마크를 지우고 처음부터 다시 내보내기")
+    p.set_defaults(func=_cmd_export)
+
+    p = subparsers.add_parser("lake", help="로컬 Parquet 레이크 현황")
+    p.set_defaults(func=_cmd_lake)
+
+    p = subparsers.add_parser("sync", help="내장 SQLite/DuckDB 데이터를 Postgres 로 일괄 동기화")
+    p.add_argument("--source", default=None, help="원본 저장소 URL (기본 JTBC_DATABASE_URL)")
+    p.add_argument("--target", default=None, help="대상 저장소 URL (기본 SUPABASE_CONNECTION_STRING)")
+    p.add_argument("--batch-rows", type=int, default=5000, help="한 번에 옮길 행 수")
+    p.set_defaults(func=_cmd_sync)
+
+    p = subparsers.add_parser("migrate", help="스키마 마이그레이션 적용 (인덱스, 고유 키, 선택적 월별 파티셔닝)")
+    p.add_argument("--partition", nargs="+", choices=("comments", "llm_scores"),
+                   help="월별 RANGE 파티션 테이블로 전환하거나 앞으로의 월 파티션을 보충 (PostgreSQL)")
+    p.add_argument("--months-ahead", type=int, default=3, help="미리 만들어 둘 월 파티션 수")
+    p.set_defaults(func=_cmd_migrate)
+
+    p = subparsers.add_parser("bench", help="가짜 YouTube/OpenAI 서버와 합성 데이터로 종단간 벤치마크")
+    p.add_argument("--stages", nargs="+", choices=("comments", "transcribe", "score"),
+                   default=["comments", "transcribe", "score"], help="실행할 단계")
+    p.add_argument("--db", help="벤치마크 DB URL (기본: 임시 SQLite)")
+    p.add_argument("--videos", type=int, default=20, help="영상 수")
+    p.add_argument("--comments", type=int, default=200, help="영상당 댓글 수")
+    p.add_argument("--audio-videos", type=int, default=8, help="전사할 영상 수 (합성 오디오 개수)")
+    p.add_argument("--audio-minutes", type=float, default=10, help="합성 오디오 길이(분, 25MB 미만)")
+    p.add_argument("--score-texts", type=int, default=2000, help="스코어링할 텍스트 수 상한")
+    p.add_argument("--batch-size", type=int, default=10, help="chat 요청당 텍스트 수")
+    p.add_argument("--concurrency", type=int, default=16, help="YouTube 동시 요청 수")
+    p.add_argument("--workers", type=int, default=4, help="전사/스코어링 동시 작업자 수")
+    p.add_argument("--latency", type=float, default=0.02, help="가짜 서버 응답 지연(초)")
+    p.add_argument("--whisper-seconds-per-mb", type=float, default=0.05, help="전사 업로드 MB당 추가 지연(초)")
+    p.add_argument("--error-rate", type=float, default=0.0, help="5xx 주입 비율")
+    p.add_argument("--rate-limit-rate", type=float, default=0.0, help="429/403 rateLimitExceeded 주입 비율")
+    p.add_argument("--seed", type=int, default=0, help="합성 데이터/오류 주입 시드")
+    p.add_argument("--json", help="결과를 JSON 으로 저장할 경로")
+    p.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    p.add_argument("--tolerance", type=float, default=0.2, help="허용 성능 저하 비율 (기본 0.2)")
+    p.set_defaults(func=_cmd_bench)
+
+    p = subparsers.add_parser("usage", help="Whisper/chat 사용량 원장 리포트 (영상당 비용, 1천 건당 비용)")
+    p.add_argument("--since", help="집계 시작일 (YYYY-MM-DD)")
+    p.add_argument("--runs", type=int, default=5, help="표시할 최근 실행 수")
+    p.set_defaults(func=_cmd_usage)
+
+    p = subparsers.add_parser("replay", help="캐시된 Whisper 응답만으로 대본/구간을 다시 만들어 저장")
+    p.add_argument("video_ids", nargs="*", help="영상 ID (생략하면 캐시된 전체)")
+    p.set_defaults(func=_cmd_replay)
+
+    p = subparsers.add_parser("shards", help="샤드 스코어링(llm-ev.py --shards) 작업별/샤드별 진행과 합친 일 단위 시계열")
+    p.add_argument("job_id", nargs="?", help="작업 ID (생략하면 작업 목록)")
+    p.add_argument("--csv", help="합친 일 단위 시계열을 CSV 로 저장")
+    p.add_argument("--reset", action="store_true", help="작업의 샤드/합계 행 삭제 (같은 작업을 처음부터 다시)")
+    p.set_defaults(func=_cmd_shards)
+
+    p = subparsers.add_parser("profiles", help="스코어링 프로필 목록, 재스코어링 계획, A/B 비교")
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--plan", metavar="PROFILE", help="이 프로필로 스코어링해야 할 행 수 (API 호출 없음)")
+    group.add_argument("--compare", nargs=2, metavar=("A", "B"), help="두 프로필이 함께 스코어링한 텍스트의 점수 비교")
+    group.add_argument("--adopt-legacy", metavar="PROFILE", help="profile_id 가 없는 기존 점수 행을 이 프로필로 표시")
+    p.set_defaults(func=_cmd_profiles)
+
+    p = subparsers.add_parser("embed", help="댓글/대본 임베딩(float16 저장소)과 IVF 색인 갱신, 없는 텍스트만 호출")
+    p.add_argument("--from-lake", action="store_true", help="DB 대신 Parquet 레이크에서 텍스트 읽기")
+    p.add_argument("--batch-size", type=int, default=None, help="요청 하나에 넣을 텍스트 수 (기본 JTBC_EMBEDDING_BATCH=256)")
+    _add_budget_arguments(p)
+    p.set_defaults(func=_cmd_embed)
+
+    p = subparsers.add_parser("topics", help="임베딩 k-means 주제 클러스터, 클러스터별 대표 텍스트")
+    p.add_argument("--clusters", type=int, default=30, help="주제 수")
+    p.add_argument("--examples", type=int, default=3, help="주제마다 보여 줄 텍스트 수")
+    p.add_argument("--score", action="store_true", help="주제마다 대표 텍스트 하나만 LLM 으로 스코어링")
+    p.add_argument("--scoring-profile", default=None, help="--score 에 쓸 스코어링 프로필")
+    p.add_argument("--from-lake", action="store_true", help="DB 대신 Parquet 레이크에서 텍스트 읽기")
+    p.add_argument("--csv", help="주제 표를 CSV 로 저장")
+    _add_budget_arguments(p)
+    p.set_defaults(func=_cmd_topics)
+
+    p = subparsers.add_parser("similar", help="질의와 의미가 비슷한 댓글/대본 (IVF 근사 검색)")
+    p.add_argument("query", help="검색할 문장")
+    p.add_argument("-k", type=int, default=10, help="결과 수")
+    p.add_argument("--nprobe", type=int, default=8, help="훑을 IVF 목록 수 (클수록 정확, 느림)")
+    p.add_argument("--from-lake", action="store_true", help="DB 대신 Parquet 레이크의 llm_scores 에서 본문 찾기")
+    p.set_defaults(func=_cmd_similar)
+
+    p = subparsers.add_parser("live", help="새 업로드와 최근 영상 댓글을 계속 폴링하고 새 댓글을 소량 배치로 스코어링")
+    p.add_argument("--playlist", default="PL3Eb1N33oAXhNHGe-ljKHJ5c0gjiZkqDk", help="폴링할 재생목록 ID (업로드 재생목록 UU... 가능)")
+    p.add_argument("--hours", type=float, default=48, help="이 시간 이내 게시된 영상의 댓글만 추적")
+    p.add_argument("--concurrency", type=int, default=8, help="YouTube 동시 요청 수")
+    p.add_argument("--scoring-profile", default=None, help="새 댓글에 쓸 스코어링 프로필")
+    p.add_argument("--no-score", action="store_true", help="댓글만 저장하고 스코어링하지 않음")
+    p.add_argument("--once", action="store_true", help="한 번만 폴링/스코어링하고 종료 (cron 용)")
+    _add_budget_arguments(p)
+    p.set_defaults(func=_cmd_live)
+
+    p = subparsers.add_parser("status", help="대본 수집 진행 현황")
+    p.set_defaults(func=_cmd_status)
+    return parser
+
+
+def main(argv=None):
+    from jtbc import metrics, profiling
+
+    args = build_parser().parse_args(argv)
+    # JTBC_METRICS_PORT / JTBC_METRICS_FILE / JTBC_TRACE_LOG 가 설정된 경우에만 내보내기가 켜짐
+    metrics.setup()
+    enabled = getattr(args, "profile", False) or profiling.requested()
+    with profiling.profile_run(args.command, enabled):
+        args.func(args)
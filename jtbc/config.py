@@ -0,0 +1,89 @@
+"""공용 설정 모듈.
+
+.env 로딩과 환경 변수 해석을 한 번만 수행합니다. 네트워크 호출이나 클라이언트
+생성은 하지 않으므로 import 비용이 거의 없습니다.
+"""
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# .env 파일 로드 (레포 루트 -> 상위 폴더 -> 기본 검색)
+REPO_ROOT = Path(__file__).resolve().parents[1]
+_repo_env = REPO_ROOT / ".env"
+_parent_env = REPO_ROOT.parent / ".env"
+if _repo_env.exists():
+    load_dotenv(dotenv_path=_repo_env)
+    loaded_env_path = str(_repo_env)
+elif _parent_env.exists():
+    load_dotenv(dotenv_path=_parent_env)
+    loaded_env_path = str(_parent_env)
+else:
+    load_dotenv()  # fallback: dotenv 기본 검색
+    loaded_env_path = "default search"
+
+
+def _env_str(name: str) -> str:
+    return (os.getenv(name) or "").strip()
+
+
+def _normalize_key(raw: str) -> str:
+    """앞뒤 공백과 둘러싼 따옴표/backtick을 제거합니다. 내부 공백/따옴표는 검증 단계에서 오류."""
+    key = (raw or "").strip()
+    if len(key) >= 2 and key[0] == key[-1] and key[0] in ('"', "'", "`"):
+        key = key[1:-1].strip()
+    return key
+
+
+# 캐시/체크포인트 등 실행 상태를 보관하는 디렉토리
+STATE_DIR = Path(os.getenv("JTBC_STATE_DIR") or REPO_ROOT / ".jtbc_state")
+
+# 오프라인 분석용 Parquet 스냅샷 디렉토리 (python -m jtbc export)
+LAKE_DIR = Path(os.getenv("JTBC_LAKE_DIR") or REPO_ROOT / "data" / "lake")
+
+# DB
+SUPABASE_CONNECTION_STRING = os.getenv("SUPABASE_CONNECTION_STRING")
+# 저장소 백엔드 (postgresql://, sqlite:///경로, duckdb:///경로). 없으면 Supabase
+DATABASE_URL = _env_str("JTBC_DATABASE_URL") or SUPABASE_CONNECTION_STRING
+
+# YouTube Data API (data_scrape.py 와 같은 변수명)
+GOOGLE_CLOUD_API_KEY = _env_str("google_cloud_api_key") or _env_str("GOOGLE_CLOUD_API_KEY")
+
+# OpenAI (llm-ev.py는 소문자 openai_api_key를 사용해 왔으므로 함께 허용)
+OPENAI_API_KEY = _normalize_key(os.getenv("OPENAI_API_KEY") or os.getenv("openai_api_key") or "")
+OPENAI_BASE_URL = _env_str("OPENAI_BASE_URL")
+OPENAI_ORG_ID = _env_str("OPENAI_ORG_ID")
+OPENAI_PROJECT_ID = _env_str("OPENAI_PROJECT_ID")
+OPENAI_PROXY = _env_str("OPENAI_PROXY")
+# 키 검증(models.list) 결과 캐시 유효 시간(초). 0이면 매 실행마다 검증
+OPENAI_VALIDATION_TTL = int(os.getenv("OPENAI_VALIDATION_TTL", "3600"))
+
+# 네트워크/다운로드 튜닝용 환경 변수
+YTDLP_PROXY = os.getenv("YTDLP_PROXY")  # 예: http://127.0.0.1:7890
+YTDLP_COOKIEFILE = os.getenv("YTDLP_COOKIEFILE")  # 예: c:\path\to\cookies.txt
+YTDLP_MAX_ATTEMPTS = int(os.getenv("YTDLP_MAX_ATTEMPTS", "5"))
+YTDLP_BACKOFF_BASE = float(os.getenv("YTDLP_BACKOFF_BASE", "2"))
+
+# 요청 간 대기 시간. 환경 변수가 없으면 실행 모드별 기본값을 사용합니다.
+# (일반 실행 1~3초, 재개/기간 지정 실행은 봇 차단 회피를 위해 5~10초)
+DEFAULT_SLEEP = (1, 3)
+CAUTIOUS_SLEEP = (5, 10)
+YTDLP_SLEEP_MIN = int(os.environ["YTDLP_SLEEP_MIN"]) if os.getenv("YTDLP_SLEEP_MIN") else None
+YTDLP_SLEEP_MAX = int(os.environ["YTDLP_SLEEP_MAX"]) if os.getenv("YTDLP_SLEEP_MAX") else None
+
+# stt_resume.py 호환: 재개 시작 인덱스
+START_INDEX = int(os.getenv("START_INDEX", "1"))
+
+
+def sleep_range(cautious: bool = False) -> tuple:
+    """요청 간 대기 범위(초)를 반환합니다."""
+    default_min, default_max = CAUTIOUS_SLEEP if cautious else DEFAULT_SLEEP
+    low = YTDLP_SLEEP_MIN if YTDLP_SLEEP_MIN is not None else default_min
+    high = YTDLP_SLEEP_MAX if YTDLP_SLEEP_MAX is not None else default_max
+    return low, max(low, high)
+
+
+def mask_key(k: str) -> str:
+    if not k:
+        return "None"
+    return f"{k[:6]}...{k[-4:]}"
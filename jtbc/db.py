@@ -0,0 +1,1142 @@
+"""저장소 접근 함수.
+
+JTBC_DATABASE_URL(없으면 SUPABASE_CONNECTION_STRING)의 스킴으로 백엔드를 고릅니다.
+
+    postgresql://...                Supabase/PostgreSQL (기본)
+    sqlite:///data/local.db         내장 SQLite (로컬 실행, 벤치마크, 오프라인 테스트)
+    duckdb:///data/local.duckdb     내장 DuckDB (pip install duckdb)
+
+모듈 함수(get_videos_without_transcript, update_transcript ...)는 현재 백엔드로 위임합니다.
+내장 백엔드에서 모은 데이터는 sync_storage(python -m jtbc sync)로 Postgres 에 한 번에 올릴 수 있습니다.
+드라이버(psycopg2, duckdb)는 첫 연결 시점에 import 합니다.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from jtbc import config, metrics, migrations, profiling
+
+_storages = {}
+_storages_lock = threading.Lock()
+
+# 기준(v1) 테이블 정의. {id}/{bigid} 는 백엔드별 자동 증가 기본키로 치환됩니다.
+# 이후 변경(인덱스, 컬럼 추가)은 jtbc.migrations 에 버전으로 추가합니다.
+TABLE_DDL = {
+    "videos": """
+        CREATE TABLE IF NOT EXISTS videos (
+            {id},
+            video_id VARCHAR(50) UNIQUE NOT NULL,
+            title TEXT,
+            published_at TIMESTAMP,
+            url TEXT,
+            transcript TEXT,
+            duration_seconds INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    "comments": """
+        CREATE TABLE IF NOT EXISTS comments (
+            {id},
+            video_id VARCHAR(50) REFERENCES videos(video_id),
+            author VARCHAR(255),
+            text TEXT,
+            published_at TIMESTAMP,
+            like_count INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    "transcript_segments": """
+        CREATE TABLE IF NOT EXISTS transcript_segments (
+            {bigid},
+            video_id VARCHAR(50) NOT NULL REFERENCES videos(video_id),
+            source VARCHAR(20) NOT NULL,
+            seq INTEGER NOT NULL,
+            start_s REAL NOT NULL,
+            end_s REAL NOT NULL,
+            text TEXT NOT NULL,
+            UNIQUE (video_id, source, seq)
+        )
+    """,
+    "transcript_segment_grams": """
+        CREATE TABLE IF NOT EXISTS transcript_segment_grams (
+            gram VARCHAR(8) NOT NULL,
+            published_at TIMESTAMP,
+            segment_id BIGINT NOT NULL
+        )
+    """,
+    "llm_scores": """
+        CREATE TABLE IF NOT EXISTS llm_scores (
+            {id},
+            dt DATE NOT NULL,
+            text TEXT NOT NULL,
+            sentiment DOUBLE PRECISION,
+            fairness DOUBLE PRECISION,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+}
+
+# 대본 구간 검색용 2-gram 색인. (gram, published_at DESC, segment_id) 순서로 읽어 최신 영상부터 LIMIT 개만 확인
+INDEX_DDL = [
+    """CREATE INDEX IF NOT EXISTS transcript_segment_grams_gram_idx
+       ON transcript_segment_grams (gram, published_at DESC, segment_id)""",
+    "CREATE INDEX IF NOT EXISTS transcript_segment_grams_segment_idx ON transcript_segment_grams (segment_id)",
+]
+
+SEGMENT_COLUMNS = ("video_id", "source", "seq", "start_s", "end_s", "text")
+# published_at 은 영상 게시일을 복사해 둔 것 (upsert_videos 가 바뀐 게시일을 반영)
+GRAM_COLUMNS = ("gram", "published_at", "segment_id")
+# 2글자 단어가 없는 검색어(한 글자)는 색인을 못 쓰므로 최근 며칠 영상만 찾음
+SHORT_QUERY_DAYS = int(os.getenv("JTBC_SEARCH_SHORT_DAYS", "30"))
+COMMENT_COLUMNS = ("video_id", "author", "text", "published_at", "like_count", "comment_id")
+# 같은 댓글을 다시 수집하면 좋아요 수만 갱신 (migrations v3 의 comments_comment_key)
+COMMENT_CONFLICT = "ON CONFLICT (comment_id, published_at) DO UPDATE SET like_count = EXCLUDED.like_count"
+SCORE_COLUMNS = ("dt", "text", "sentiment", "fairness", "notes", "profile_id", "text_hash", "score_flags")
+PROFILE_COLUMNS = ("profile_id", "name", "model", "temperature", "system_prompt", "schema_version")
+
+
+def _next_day(day: str) -> str:
+    return (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def segment_grams(text: str) -> set:
+    """검색용 2-gram. 소문자로 바꾸고 공백으로 나눈 단어 안에서만 만듭니다. (한국어 검색어는 대부분 2음절)"""
+    grams = set()
+    for word in (text or "").lower().split():
+        grams.update(word[i:i + 2] for i in range(len(word) - 1))
+    return grams
+
+
+def query_gram(query: str) -> str:
+    """검색어에서 색인을 탈 2-gram 하나 (가장 긴 단어의 첫 2글자). 2글자 단어가 없으면 None."""
+    word = max(query.lower().split() or [""], key=len)
+    return word[:2] if len(word) >= 2 else None
+
+
+def _sql_values(series) -> list:
+    """DataFrame 열 -> DB 에 넘길 Python 값 목록. 실수 열의 NaN 은 None(NULL)."""
+    if series.dtype.kind == "f":
+        values = series.to_numpy(dtype=object)
+        values[series.isna().to_numpy()] = None
+        return values.tolist()
+    if series.dtype.kind in "iu":
+        return series.to_numpy().tolist()
+    return series.tolist()
+
+
+class LeaseLost(RuntimeError):
+    """샤드 임대가 만료되어 다른 노드가 가져감. 이 샤드의 남은 결과는 저장하지 않습니다."""
+
+
+class Storage:
+    """SQL 백엔드 공통 구현. 백엔드마다 연결, 자리표시자, 기본키 DDL, 대량 INSERT 만 다릅니다."""
+
+    name = None
+    placeholder = "%s"
+    like = "ILIKE"
+    secondary_indexes = True
+    partial_indexes = True
+    now = "CURRENT_TIMESTAMP"
+
+    def __init__(self, url: str):
+        self.url = url
+        self._schema_lock = threading.Lock()
+        self._schema_checked = False
+
+    # ---- 연결/실행 ----
+
+    def connect(self):
+        raise NotImplementedError
+
+    @contextmanager
+    def connection(self, conn=None):
+        """conn 을 주면 그대로 쓰고, 없으면 새로 열어 끝나면 닫습니다."""
+        if conn is not None:
+            yield conn
+            return
+        conn = self.connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def cursor(self, conn):
+        cur = conn.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+    def sql(self, text: str) -> str:
+        return text if self.placeholder == "%s" else text.replace("%s", self.placeholder)
+
+    def execute(self, cur, text: str, params=()):
+        cur.execute(self.sql(text), params)
+
+    @staticmethod
+    def fetch_dicts(cur) -> list:
+        columns = [d[0] for d in cur.description]
+        return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def insert_many(self, cur, table: str, columns, rows: list, suffix: str = ""):
+        """여러 행을 한 번에 INSERT 합니다. suffix 에는 ON CONFLICT 절 등을 붙입니다."""
+        if not rows:
+            return
+        marks = ", ".join([self.placeholder] * len(columns))
+        cur.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({marks}) {suffix}", rows)
+
+    # ---- 스키마 ----
+
+    def id_column(self, table: str, big: bool = False) -> str:
+        raise NotImplementedError
+
+    def schema_statements(self) -> list:
+        statements = []
+        for table, ddl in TABLE_DDL.items():
+            statements.append(ddl.format(id=self.id_column(table), bigid=self.id_column(table, big=True)))
+        return statements + INDEX_DDL
+
+    def add_column(self, cur, table: str, column: str, column_type: str):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}")
+
+    def create_table(self, cur, table: str, ddl: str):
+        """마이그레이션에서 새 테이블을 만듭니다. ddl 의 {id} 는 자동 증가 기본키로 치환."""
+        cur.execute(ddl.format(id=self.id_column(table)))
+
+    def lock_migrations(self, cur):
+        """다른 프로세스와 마이그레이션이 겹치지 않도록 잠급니다. (DuckDB 는 파일을 한 프로세스만 열 수 있어 생략)"""
+
+    def create_tables(self, conn=None):
+        """테이블과 인덱스를 최신 스키마 버전으로 맞춥니다. (이미 적용된 버전은 건너뜀)"""
+        with self.connection(conn) as conn:
+            migrations.migrate(self, conn)
+
+    def ensure_schema(self, conn):
+        """엔진이 쓰는 테이블/컬럼을 준비합니다. (인스턴스당 한 번, 미적용 마이그레이션 실행)"""
+        with self._schema_lock:
+            if self._schema_checked:
+                return
+            migrations.migrate(self, conn)
+            self._schema_checked = True
+
+    def ensure_segments_schema(self, conn):
+        self.ensure_schema(conn)
+
+    # ---- 영상/대본 ----
+
+    def get_videos_without_transcript(self, table_name: str = "videos", since: str = None, until: str = None,
+                                      limit: int = None) -> list:
+        conditions = ["v.transcript IS NULL"]
+        params = []
+        if since:
+            conditions.append("v.published_at >= %s")
+            params.append(since)
+        if until:
+            conditions.append("v.published_at < %s")
+            params.append(_next_day(until))
+        limit_sql = ""
+        if limit:
+            limit_sql = "LIMIT %s"
+            params.append(limit)
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                self.execute(
+                    cur,
+                    f"""
+                    SELECT v.id, v.video_id, v.title, v.published_at, v.duration_seconds,
+                           COUNT(c.id) AS comment_count,
+                           COALESCE(SUM(c.like_count), 0) AS comment_likes
+                    FROM {table_name} v
+                    LEFT JOIN comments c ON c.video_id = v.video_id
+                    WHERE {' AND '.join(conditions)}
+                    GROUP BY v.id, v.video_id, v.title, v.published_at, v.duration_seconds
+                    ORDER BY v.id
+                    {limit_sql}
+                    """,
+                    params,
+                )
+                return self.fetch_dicts(cur)
+
+    @metrics.traced("update_transcript")
+    def update_transcript(self, video_id: str, transcript: str, table_name: str = "videos", segments: list = None,
+                          source: str = "whisper"):
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            if segments is not None:
+                self.ensure_segments_schema(conn)
+            with self.cursor(conn) as cur:
+                self.execute(cur, f"UPDATE {table_name} SET transcript = %s, updated_at = {self.now} WHERE video_id = %s",
+                             (transcript, video_id))
+                if segments is not None:
+                    self.replace_segments(cur, video_id, segments, source)
+            conn.commit()
+
+    def _drop_grams(self, cur, video_id: str, source: str):
+        self.execute(cur, """
+            DELETE FROM transcript_segment_grams WHERE segment_id IN
+            (SELECT id FROM transcript_segments WHERE video_id = %s AND source = %s)
+        """, (video_id, source))
+
+    def replace_segments(self, cur, video_id: str, segments: list, source: str):
+        """영상의 source 구간을 새 목록으로 교체합니다. (호출자가 commit)"""
+        self._drop_grams(cur, video_id, source)
+        self.execute(cur, "DELETE FROM transcript_segments WHERE video_id = %s AND source = %s", (video_id, source))
+        rows = [
+            (video_id, source, seq, float(seg["start"]), float(seg["end"]), seg["text"].strip())
+            for seq, seg in enumerate(segments)
+            if seg.get("text") and seg["text"].strip()
+        ]
+        self.insert_many(cur, "transcript_segments", SEGMENT_COLUMNS, rows)
+        self.index_segments(cur, video_id, source)
+
+    def index_segments(self, cur, video_id: str, source: str):
+        """영상의 source 구간으로 2-gram 색인 행을 다시 만듭니다. (호출자가 commit)"""
+        self._drop_grams(cur, video_id, source)
+        self.execute(cur, """
+            SELECT s.id, s.text, v.published_at FROM transcript_segments s
+            JOIN videos v ON v.video_id = s.video_id
+            WHERE s.video_id = %s AND s.source = %s
+        """, (video_id, source))
+        rows = [(gram, published_at, segment_id)
+                for segment_id, text, published_at in cur.fetchall() for gram in segment_grams(text)]
+        self.insert_many(cur, "transcript_segment_grams", GRAM_COLUMNS, rows)
+
+    def refresh_segment_dates(self, cur, videos: list):
+        """영상 게시일이 바뀌면 2-gram 색인에 복사해 둔 published_at 도 맞춥니다. videos = [(video_id, published_at)]"""
+        if videos:
+            cur.executemany(self.sql("""
+                UPDATE transcript_segment_grams SET published_at = %s
+                WHERE segment_id IN (SELECT id FROM transcript_segments WHERE video_id = %s)
+                  AND (published_at IS NULL OR published_at <> %s)
+            """), [(published_at, video_id, published_at) for video_id, published_at in videos])
+
+    def search_segments(self, query: str, limit: int = 50, source: str = None,
+                        short_days: int = SHORT_QUERY_DAYS) -> list:
+        """query 를 포함한 구간 (최근 영상 먼저).
+
+        2글자 이상 단어가 있으면 2-gram 색인의 (gram, published_at DESC, segment_id) 순서대로 훑으면서
+        구간 text 로 부분 일치를 확인하므로, 흔한 검색어도 limit 개를 찾는 즉시 멈춥니다.
+        한 글자 검색어는 색인을 쓸 수 없어 최근 short_days 일 동안 게시된 영상에서만 찾습니다.
+        """
+        gram = query_gram(query)
+        conditions = [f"s.text {self.like} %s"]
+        params = [f"%{query}%"]
+        if gram:
+            conditions.insert(0, "g.gram = %s")
+            params.insert(0, gram)
+            sql = """
+                SELECT s.video_id, v.title, v.published_at, s.source, s.start_s, s.end_s, s.text
+                FROM transcript_segment_grams g
+                JOIN transcript_segments s ON s.id = g.segment_id
+                JOIN videos v ON v.video_id = s.video_id
+                WHERE {where}
+                ORDER BY g.published_at DESC, g.segment_id
+                LIMIT %s
+            """
+        else:
+            conditions.append("v.published_at >= %s")
+            params.append(datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=short_days))
+            sql = """
+                SELECT s.video_id, v.title, v.published_at, s.source, s.start_s, s.end_s, s.text
+                FROM transcript_segments s
+                JOIN videos v ON v.video_id = s.video_id
+                WHERE {where}
+                ORDER BY v.published_at DESC, s.id
+                LIMIT %s
+            """
+        if source:
+            conditions.append("s.source = %s")
+            params.append(source)
+        params.append(limit)
+        with self.connection() as conn:
+            self.ensure_segments_schema(conn)
+            with self.cursor(conn) as cur:
+                self.execute(cur, sql.format(where=" AND ".join(conditions)), params)
+                return self.fetch_dicts(cur)
+
+    def _upsert_video_rows(self, cur, table_name: str, videos: list):
+        """영상 행을 저장합니다. 이미 있는 영상은 게시일을 갱신하고 길이를 채웁니다."""
+        self.insert_many(
+            cur, table_name, ("video_id", "title", "published_at", "url", "transcript", "duration_seconds"),
+            [(v['video_id'], v['title'], v['published_at'], v['url'], v.get('transcript'), v.get('duration_seconds'))
+             for v in videos],
+            f"""ON CONFLICT (video_id) DO UPDATE
+            SET published_at = EXCLUDED.published_at,
+                duration_seconds = COALESCE({table_name}.duration_seconds, EXCLUDED.duration_seconds)""",
+        )
+        if table_name == "videos":
+            self.refresh_segment_dates(cur, [(v['video_id'], v['published_at']) for v in videos])
+
+    def upsert_videos(self, videos: list, table_name: str = "videos", conn=None) -> int:
+        with self.connection(conn) as conn:
+            self.ensure_schema(conn)
+            self.ensure_segments_schema(conn)
+            with self.cursor(conn) as cur:
+                self._upsert_video_rows(cur, table_name, videos)
+            conn.commit()
+        return len(videos)
+
+    def update_duration(self, video_id: str, duration_seconds: int, table_name: str = "videos"):
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                self.execute(cur, f"UPDATE {table_name} SET duration_seconds = %s WHERE video_id = %s",
+                             (duration_seconds, video_id))
+            conn.commit()
+
+    def get_transcript_status(self, table_name: str = "videos") -> dict:
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                cur.execute(
+                    f"""
+                    SELECT
+                        COUNT(*) AS total,
+                        COUNT(transcript) AS done,
+                        COUNT(*) - COUNT(transcript) AS pending,
+                        MIN(CASE WHEN transcript IS NULL THEN published_at END) AS oldest_pending,
+                        MAX(CASE WHEN transcript IS NULL THEN published_at END) AS newest_pending
+                    FROM {table_name}
+                    """
+                )
+                status = self.fetch_dicts(cur)[0]
+        # SQLite 는 집계 결과의 선언 타입을 잃어 문자열로 돌려줌
+        for key in ("oldest_pending", "newest_pending"):
+            if isinstance(status[key], str):
+                status[key] = _parse_timestamp(status[key])
+        return status
+
+    # ---- 수집(data_scrape.py) ----
+
+    def insert_data(self, videos_data: list, conn=None):
+        """영상, 자막 구간, 댓글을 저장합니다. 댓글은 (author, text, published_at, like_count) 튜플."""
+        with self.connection(conn) as conn:
+            self.ensure_schema(conn)
+            self.ensure_segments_schema(conn)
+            with self.cursor(conn) as cur:
+                for video in videos_data:
+                    self._upsert_video_rows(cur, "videos", [video])
+                    if video.get('segments'):
+                        self.replace_segments(cur, video['video_id'], video['segments'], 'caption')
+                    if video.get('comments'):
+                        self._insert_comments(cur, video['video_id'], video['comments'])
+            conn.commit()
+
+    def _insert_comments(self, cur, video_id: str, comments: list):
+        # 한 문장 안에 같은 키가 두 번 있으면 upsert 가 실패하므로 댓글 ID 로 중복 제거
+        rows = {(c[-1] or i): (video_id, *c) for i, c in enumerate(comments)}
+        self.insert_many(cur, "comments", COMMENT_COLUMNS, list(rows.values()), COMMENT_CONFLICT)
+
+    def insert_comments(self, comments_by_video: dict, conn=None) -> int:
+        """{video_id: [Comment]} 를 저장합니다. 이미 있는 댓글은 좋아요 수만 갱신."""
+        with self.connection(conn) as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                for video_id, comments in comments_by_video.items():
+                    if comments:
+                        self._insert_comments(cur, video_id, comments)
+            conn.commit()
+        return sum(len(comments) for comments in comments_by_video.values())
+
+    def recent_videos(self, since: datetime, table_name: str = "videos") -> list:
+        """since 이후 게시된 영상 [{"video_id", "title", "published_at"}] (최신순)."""
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                self.execute(cur, f"""
+                    SELECT video_id, title, published_at FROM {table_name}
+                    WHERE published_at >= %s ORDER BY published_at DESC
+                """, (since,))
+                return self.fetch_dicts(cur)
+
+    def comment_ids(self, video_ids: list, batch: int = 500) -> dict:
+        """{video_id: {comment_id, ...}}. 본문 없이 댓글 ID 만 읽습니다."""
+        found = {}
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                for i in range(0, len(video_ids), batch):
+                    chunk = list(video_ids[i:i + batch])
+                    self.execute(cur, f"""
+                        SELECT video_id, comment_id FROM comments
+                        WHERE video_id IN ({", ".join(["%s"] * len(chunk))}) AND comment_id IS NOT NULL
+                    """, chunk)
+                    for video_id, comment_id in cur.fetchall():
+                        found.setdefault(video_id, set()).add(comment_id)
+        return found
+
+    def video_comments(self, video_ids: list, batch: int = 500) -> list:
+        """영상들의 댓글 [{"video_id", "comment_id", "text", "published_at"}]."""
+        found = []
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                for i in range(0, len(video_ids), batch):
+                    chunk = list(video_ids[i:i + batch])
+                    self.execute(cur, f"""
+                        SELECT video_id, comment_id, text, published_at FROM comments
+                        WHERE video_id IN ({", ".join(["%s"] * len(chunk))})
+                    """, chunk)
+                    found.extend(self.fetch_dicts(cur))
+        return found
+
+    # ---- 스코어링(llm-ev.py) ----
+
+    @profiling.track_memory("fetch_data")
+    @metrics.traced("fetch_data")
+    def fetch_data(self, conn=None):
+        """댓글과 대본을 (text, dt) DataFrame 으로 반환합니다."""
+        import pandas as pd
+
+        frames = []
+        with self.connection(conn) as conn:
+            with self.cursor(conn) as cur:
+                for query in ("SELECT text, published_at FROM comments WHERE text IS NOT NULL",
+                              "SELECT transcript AS text, published_at FROM videos WHERE transcript IS NOT NULL"):
+                    cur.execute(query)
+                    frames.append(pd.DataFrame(cur.fetchall(), columns=["text", "published_at"]))
+        df = pd.concat(frames, ignore_index=True)
+        df["dt"] = pd.to_datetime(df.pop("published_at")).dt.date
+        return df.dropna()
+
+    @metrics.traced("insert_scores")
+    def insert_scores(self, scored_df, batch_size: int = 500, conn=None):
+        # 열 단위로 Python 값 목록을 만든 뒤 묶음 (검증에서 NaN 이 된 점수는 NULL)
+        rows = list(zip(*(_sql_values(scored_df[column]) for column in SCORE_COLUMNS)))
+        metrics.inc("jtbc_scores_inserted_total", len(rows))
+        with self.connection(conn) as conn:
+            with self.cursor(conn) as cur:
+                for i in range(0, len(rows), batch_size):
+                    self.insert_many(cur, "llm_scores", SCORE_COLUMNS, rows[i:i + batch_size])
+            conn.commit()
+
+    # ---- 스코어링 프로필(jtbc.profiles) ----
+
+    def save_profile(self, profile, conn=None):
+        with self.connection(conn) as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                self.insert_many(cur, "scoring_profiles", PROFILE_COLUMNS,
+                                 [(profile.profile_id, profile.name, profile.model, float(profile.temperature),
+                                   profile.system_prompt, profile.schema_version)],
+                                 "ON CONFLICT (profile_id) DO NOTHING")
+            conn.commit()
+
+    def score_index(self, profile_id: str, conn=None) -> tuple:
+        """({text_hash: 이 프로필의 점수 행 수}, {다른 프로필로만 점수가 있는 text_hash})."""
+        current, other = {}, set()
+        with self.connection(conn) as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                cur.execute("""
+                    SELECT text_hash, profile_id, COUNT(*) FROM llm_scores
+                    WHERE text_hash IS NOT NULL GROUP BY text_hash, profile_id
+                """)
+                while True:
+                    rows = cur.fetchmany(10000)
+                    if not rows:
+                        break
+                    for text_hash, pid, n in rows:
+                        if pid == profile_id:
+                            current[text_hash] = n
+                        else:
+                            other.add(text_hash)
+        return current, other
+
+    def legacy_score_count(self, conn=None) -> int:
+        """profile_id 가 없는 (v6 이전) 점수 행 수."""
+        with self.connection(conn) as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                cur.execute("SELECT COUNT(*) FROM llm_scores WHERE profile_id IS NULL")
+                return cur.fetchone()[0]
+
+    def profile_counts(self) -> list:
+        """profile_id 별 점수 행 수와 마지막 저장 시각. profile_id 가 없는 행은 None 으로 묶임."""
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                cur.execute("""
+                    SELECT s.profile_id, MAX(p.name) AS name, COUNT(*) AS rows, MAX(s.created_at) AS last_scored
+                    FROM llm_scores s LEFT JOIN scoring_profiles p ON p.profile_id = s.profile_id
+                    GROUP BY s.profile_id ORDER BY COUNT(*) DESC
+                """)
+                return self.fetch_dicts(cur)
+
+    def profile_pairs(self, profile_a: str, profile_b: str) -> list:
+        """두 프로필 모두 점수가 있는 text_hash 별 평균 점수 [(sentiment_a, fairness_a, sentiment_b, fairness_b)]."""
+        per_profile = """
+            SELECT text_hash, AVG(sentiment) AS sentiment, AVG(fairness) AS fairness
+            FROM llm_scores WHERE profile_id = %s GROUP BY text_hash
+        """
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                self.execute(cur, f"""
+                    SELECT a.sentiment, a.fairness, b.sentiment, b.fairness
+                    FROM ({per_profile}) a JOIN ({per_profile}) b ON a.text_hash = b.text_hash
+                """, (profile_a, profile_b))
+                return cur.fetchall()
+
+    def scores_for(self, profile_id: str, text_hashes: list, conn=None, batch: int = 500) -> dict:
+        """{text_hash: {"sentiment", "fairness", "notes", "score_flags"}} (이 프로필로 저장된 점수 중 하나)."""
+        found = {}
+        with self.connection(conn) as conn:
+            with self.cursor(conn) as cur:
+                for i in range(0, len(text_hashes), batch):
+                    chunk = list(text_hashes[i:i + batch])
+                    self.execute(cur, f"""
+                        SELECT text_hash, sentiment, fairness, notes, score_flags FROM llm_scores
+                        WHERE profile_id = %s AND text_hash IN ({", ".join(["%s"] * len(chunk))})
+                    """, [profile_id] + chunk)
+                    for row in self.fetch_dicts(cur):
+                        found.setdefault(row.pop("text_hash"), row)
+            conn.commit()
+        return found
+
+    def texts_for(self, text_hashes: list, conn=None, batch: int = 500) -> dict:
+        """{text_hash: {"dt", "text"}}. llm_scores 의 text_hash 색인으로 주어진 지문만 찾습니다."""
+        found = {}
+        with self.connection(conn) as conn:
+            with self.cursor(conn) as cur:
+                for i in range(0, len(text_hashes), batch):
+                    chunk = list(text_hashes[i:i + batch])
+                    self.execute(cur, f"""
+                        SELECT text_hash, dt, text FROM llm_scores
+                        WHERE text_hash IN ({", ".join(["%s"] * len(chunk))})
+                    """, chunk)
+                    for row in self.fetch_dicts(cur):
+                        found.setdefault(row.pop("text_hash"), row)
+            conn.commit()
+        return found
+
+    def adopt_legacy_scores(self, profile_id: str, batch_rows: int = 5000) -> int:
+        """profile_id 가 없는 기존 점수 행에 profile_id 와 text_hash 를 채웁니다."""
+        from jtbc.profiles import row_digest
+
+        updated = 0
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                cur.execute("SELECT id, dt, text FROM llm_scores WHERE profile_id IS NULL ORDER BY id")
+                rows = cur.fetchall()
+            for i in range(0, len(rows), batch_rows):
+                with self.cursor(conn) as cur:
+                    cur.executemany(self.sql("UPDATE llm_scores SET profile_id = %s, text_hash = %s WHERE id = %s"),
+                                    [(profile_id, row_digest(dt, text), row_id) for row_id, dt, text in rows[i:i + batch_rows]])
+                conn.commit()
+                updated += len(rows[i:i + batch_rows])
+        return updated
+
+    # ---- 사용량 원장(jtbc.usage) ----
+
+    def insert_usage(self, rows: list, conn=None):
+        from jtbc.usage import USAGE_COLUMNS
+
+        with self.connection(conn) as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                self.insert_many(cur, "api_usage", USAGE_COLUMNS, rows)
+            conn.commit()
+
+    def usage_report(self, since: datetime = None) -> dict:
+        """모델별 합계, 영상별 Whisper 비용, 최근 실행별 비용."""
+        since = since or datetime(1970, 1, 1)
+        queries = {
+            "models": """
+                SELECT kind, model, COUNT(*) AS calls,
+                       SUM(CASE WHEN outcome = 'ok' THEN 0 ELSE 1 END) AS errors,
+                       SUM(retries) AS retries, SUM(items) AS items,
+                       SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens,
+                       SUM(audio_seconds) AS audio_seconds, AVG(latency_ms) AS latency_ms, SUM(cost_usd) AS cost_usd
+                FROM api_usage WHERE created_at >= %s
+                GROUP BY kind, model ORDER BY kind, model
+            """,
+            "videos": """
+                SELECT video_id, COUNT(*) AS calls, SUM(audio_seconds) AS audio_seconds, SUM(cost_usd) AS cost_usd
+                FROM api_usage WHERE created_at >= %s AND kind = 'whisper' AND video_id IS NOT NULL
+                GROUP BY video_id ORDER BY SUM(cost_usd) DESC
+            """,
+            "runs": """
+                SELECT run_id, MIN(created_at) AS started, MAX(created_at) AS finished,
+                       COUNT(*) AS calls, SUM(cost_usd) AS cost_usd
+                FROM api_usage WHERE created_at >= %s
+                GROUP BY run_id ORDER BY MIN(created_at) DESC LIMIT 10
+            """,
+        }
+        report = {}
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                for name, query in queries.items():
+                    self.execute(cur, query, (since,))
+                    report[name] = self.fetch_dicts(cur)
+        return report
+
+    # ---- 샤드 스코어링 임대(jtbc.sharding) ----
+    # 샤드 행의 owner/lease_until 을 조건부 UPDATE 로 잡고, 같은 트랜잭션에서 다시 읽어 누가 잡았는지 확인합니다.
+    # (rowcount 는 DuckDB 래퍼에 없고, Postgres 는 경합한 UPDATE 가 커밋된 행 기준으로 조건을 다시 평가함)
+
+    def init_shards(self, job_id: str, shards: int, shard_by: str, conn=None, reopen: bool = False):
+        """작업의 샤드 행을 만듭니다. 이미 있으면 샤드 수/기준이 같은지만 확인합니다.
+
+        reopen 이면 모든 샤드가 끝난 작업을 다시 pending 으로 돌립니다. (같은 프로필로 새로 들어온 행)
+        진행 행 수와 일 단위 합계는 그대로 누적됩니다.
+        """
+        with self.connection(conn) as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                self.execute(cur, "SELECT shards, shard_by FROM scoring_shards WHERE job_id = %s LIMIT 1", (job_id,))
+                row = cur.fetchone()
+                if row is not None and (row[0], row[1]) != (shards, shard_by):
+                    raise ValueError(f"작업 {job_id} 은 이미 샤드 {row[0]}개({row[1]} 기준)로 시작되었습니다.")
+                if row is None:
+                    self.insert_many(cur, "scoring_shards", ("job_id", "shard", "shards", "shard_by"),
+                                     [(job_id, i, shards, shard_by) for i in range(shards)],
+                                     "ON CONFLICT (job_id, shard) DO NOTHING")
+                elif reopen:
+                    self.execute(cur, """
+                        UPDATE scoring_shards SET status = 'pending', owner = NULL, last_key = NULL, finished_at = NULL
+                        WHERE job_id = %s AND status = 'done'
+                          AND NOT EXISTS (SELECT 1 FROM scoring_shards s WHERE s.job_id = %s AND s.status <> 'done')
+                    """, (job_id, job_id))
+            conn.commit()
+
+    def _shard_row(self, cur, job_id: str, shard: int) -> dict:
+        self.execute(cur, "SELECT * FROM scoring_shards WHERE job_id = %s AND shard = %s", (job_id, shard))
+        return self.fetch_dicts(cur)[0]
+
+    def claim_shard(self, job_id: str, owner: str, lease_seconds: float, conn=None):
+        """비어 있거나 임대가 만료된 샤드 하나를 owner 로 잡고 그 행을 반환합니다. 없으면 None."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        claimable = "(status = 'pending' OR (status = 'running' AND lease_until < %s))"
+        with self.connection(conn) as conn:
+            with self.cursor(conn) as cur:
+                self.execute(cur, f"SELECT shard FROM scoring_shards WHERE job_id = %s AND {claimable} ORDER BY shard",
+                             (job_id, now))
+                candidates = [row[0] for row in cur.fetchall()]
+            conn.commit()
+            # 동시에 시작한 노드들이 같은 샤드부터 다투지 않도록 owner 별로 시작 위치를 돌림
+            start = sum(owner.encode()) % len(candidates) if candidates else 0
+            for shard in candidates[start:] + candidates[:start]:
+                with self.cursor(conn) as cur:
+                    self.execute(cur, f"""
+                        UPDATE scoring_shards
+                        SET status = 'running', owner = %s, lease_until = %s, attempts = attempts + 1,
+                            started_at = COALESCE(started_at, %s), updated_at = %s
+                        WHERE job_id = %s AND shard = %s AND {claimable}
+                    """, (owner, now + timedelta(seconds=lease_seconds), now, now, job_id, shard, now))
+                    row = self._shard_row(cur, job_id, shard)
+                conn.commit()
+                if row["owner"] == owner and row["status"] == "running":
+                    return row
+        return None
+
+    def renew_shard(self, job_id: str, shard: int, owner: str, lease_seconds: float, rows_total: int = None,
+                    conn=None) -> bool:
+        """임대를 연장합니다. 이미 다른 owner 에게 넘어갔으면 False."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        with self.connection(conn) as conn:
+            with self.cursor(conn) as cur:
+                self.execute(cur, """
+                    UPDATE scoring_shards SET lease_until = %s, updated_at = %s, rows_total = COALESCE(%s, rows_total)
+                    WHERE job_id = %s AND shard = %s AND owner = %s AND status = 'running'
+                """, (now + timedelta(seconds=lease_seconds), now, rows_total, job_id, shard, owner))
+                row = self._shard_row(cur, job_id, shard)
+            conn.commit()
+        return row["owner"] == owner and row["status"] == "running"
+
+    def commit_shard_chunk(self, job_id: str, shard: int, owner: str, scored_df, last_key: str,
+                           lease_seconds: float, conn=None):
+        """점수 조각, 샤드 진행 위치(last_key), 일 단위 합계를 한 트랜잭션으로 저장합니다.
+
+        임대를 잃었으면 아무것도 쓰지 않고 LeaseLost 를 던집니다.
+        """
+        import pandas as pd
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        # 점수가 NULL 인 행(검증 실패)은 합계와 n 에서 모두 뺌
+        rollup = (scored_df.assign(sentiment=pd.to_numeric(scored_df["sentiment"], errors="coerce"),
+                                   fairness=pd.to_numeric(scored_df["fairness"], errors="coerce"))
+                  .dropna(subset=["sentiment", "fairness"])
+                  .groupby("dt").agg(n=("text", "size"), sentiment_sum=("sentiment", "sum"),
+                                     fairness_sum=("fairness", "sum")))
+        rows = [(job_id, shard, dt, int(n), float(s), float(f)) for dt, n, s, f in rollup.itertuples()]
+        with self.connection(conn) as conn:
+            with self.cursor(conn) as cur:
+                self.execute(cur, """
+                    UPDATE scoring_shards SET rows_done = rows_done + %s, last_key = %s, lease_until = %s, updated_at = %s
+                    WHERE job_id = %s AND shard = %s AND owner = %s AND status = 'running'
+                """, (len(scored_df), last_key, now + timedelta(seconds=lease_seconds), now, job_id, shard, owner))
+                row = self._shard_row(cur, job_id, shard)
+                if row["owner"] != owner or row["status"] != "running":
+                    conn.rollback()
+                    raise LeaseLost(f"샤드 {shard} 임대를 잃었습니다 (현재 owner: {row['owner']}).")
+                self.insert_many(cur, "scoring_rollups",
+                                 ("job_id", "shard", "dt", "n", "sentiment_sum", "fairness_sum"), rows,
+                                 "ON CONFLICT (job_id, shard, dt) DO UPDATE SET n = scoring_rollups.n + EXCLUDED.n, "
+                                 "sentiment_sum = scoring_rollups.sentiment_sum + EXCLUDED.sentiment_sum, "
+                                 "fairness_sum = scoring_rollups.fairness_sum + EXCLUDED.fairness_sum")
+            # llm_scores INSERT 후 커밋까지 같은 트랜잭션
+            self.insert_scores(scored_df, conn=conn)
+
+    def end_shard(self, job_id: str, shard: int, owner: str, done: bool, conn=None):
+        """done 이면 완료로, 아니면(중단/예산) 다른 노드가 바로 이어받도록 임대를 풉니다."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        status, finished_at = ("done", now) if done else ("pending", None)
+        with self.connection(conn) as conn:
+            with self.cursor(conn) as cur:
+                self.execute(cur, """
+                    UPDATE scoring_shards SET status = %s, owner = %s, lease_until = NULL, finished_at = %s, updated_at = %s
+                    WHERE job_id = %s AND shard = %s AND owner = %s AND status = 'running'
+                """, (status, owner if done else None, finished_at, now, job_id, shard, owner))
+            conn.commit()
+
+    def shard_jobs(self) -> list:
+        """작업별 샤드 수, 완료 샤드 수, 처리 행 수."""
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                cur.execute("""
+                    SELECT job_id, MAX(shards) AS shards, MAX(shard_by) AS shard_by,
+                           SUM(CASE WHEN status = 'done' THEN 1 ELSE 0 END) AS done,
+                           SUM(rows_done) AS rows_done, SUM(rows_total) AS rows_total, MAX(updated_at) AS updated_at
+                    FROM scoring_shards GROUP BY job_id ORDER BY MAX(updated_at) DESC
+                """)
+                return self.fetch_dicts(cur)
+
+    def shard_status(self, job_id: str) -> list:
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                self.execute(cur, "SELECT * FROM scoring_shards WHERE job_id = %s ORDER BY shard", (job_id,))
+                return self.fetch_dicts(cur)
+
+    def shard_rollup(self, job_id: str) -> list:
+        """샤드별 합계를 합친 일 단위 시계열 [{"dt", "sentiment_avg", "fairness_avg", "n"}]."""
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                self.execute(cur, """
+                    SELECT dt, SUM(sentiment_sum) / SUM(n) AS sentiment_avg, SUM(fairness_sum) / SUM(n) AS fairness_avg,
+                           SUM(n) AS n
+                    FROM scoring_rollups WHERE job_id = %s GROUP BY dt ORDER BY dt
+                """, (job_id,))
+                return self.fetch_dicts(cur)
+
+    def drop_shard_job(self, job_id: str):
+        """작업의 샤드/합계 행을 지웁니다. (llm_scores 는 그대로)"""
+        with self.connection() as conn:
+            self.ensure_schema(conn)
+            with self.cursor(conn) as cur:
+                self.execute(cur, "DELETE FROM scoring_rollups WHERE job_id = %s", (job_id,))
+                self.execute(cur, "DELETE FROM scoring_shards WHERE job_id = %s", (job_id,))
+            conn.commit()
+
+
+class PostgresStorage(Storage):
+    name = "postgres"
+
+    def connect(self):
+        import psycopg2
+
+        return psycopg2.connect(self.url)
+
+    def insert_many(self, cur, table, columns, rows, suffix=""):
+        from psycopg2.extras import execute_values
+
+        if rows:
+            execute_values(cur, f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s {suffix}", rows, page_size=1000)
+
+    def id_column(self, table, big=False):
+        return "id BIGSERIAL PRIMARY KEY" if big else "id SERIAL PRIMARY KEY"
+
+    def schema_statements(self):
+        return super().schema_statements() + [
+            "ALTER TABLE videos ADD COLUMN IF NOT EXISTS duration_seconds INTEGER",
+        ]
+
+    def lock_migrations(self, cur):
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (migrations.ADVISORY_LOCK_KEY,))
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """API 값('2025-05-01T00:00:00Z')과 저장된 datetime 문자열을 naive UTC datetime 으로."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class SQLiteStorage(Storage):
+    name = "sqlite"
+    placeholder = "?"
+    like = "LIKE"  # SQLite LIKE 는 ASCII 대소문자를 구분하지 않음
+
+    def __init__(self, url):
+        super().__init__(url)
+        self.path = url.split("://", 1)[1][1:] or ":memory:"
+
+    def connect(self):
+        import sqlite3
+
+        sqlite3.register_adapter(datetime, lambda v: v.isoformat(sep=" "))
+        sqlite3.register_converter("TIMESTAMP", lambda v: _parse_timestamp(v.decode()))
+        sqlite3.register_converter("DATE", lambda v: datetime.strptime(v.decode()[:10], "%Y-%m-%d").date())
+        conn = sqlite3.connect(self.path, timeout=30, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        # 작업자 스레드가 동시에 쓰므로 WAL 로 읽기/쓰기 잠금 충돌을 줄임
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def id_column(self, table, big=False):
+        return "id INTEGER PRIMARY KEY AUTOINCREMENT"
+
+    def lock_migrations(self, cur):
+        # 쓰기 잠금을 먼저 잡아 동시에 시작한 프로세스(샤드 작업자 등)가 같은 버전을 두 번 적용하지 않게 함
+        cur.execute("BEGIN IMMEDIATE")
+
+    def add_column(self, cur, table, column, column_type):
+        # SQLite 는 ADD COLUMN IF NOT EXISTS 를 지원하지 않음
+        cur.execute(f"PRAGMA table_info({table})")
+        if column not in {row[1] for row in cur.fetchall()}:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+
+class _DuckDBConnection:
+    """DB-API 처럼 쓰도록 감싼 DuckDB 연결. (cursor 가 같은 트랜잭션을 공유, commit 후 새 트랜잭션)"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._conn.begin()
+
+    def cursor(self):
+        return _DuckDBCursor(self._conn)
+
+    def commit(self):
+        self._conn.commit()
+        self._conn.begin()
+
+    def rollback(self):
+        self._conn.rollback()
+        self._conn.begin()
+
+    def close(self):
+        self._conn.close()
+
+
+class _DuckDBCursor:
+    def __init__(self, conn):
+        self._conn = conn
+
+    @property
+    def description(self):
+        return self._conn.description
+
+    def execute(self, sql, params=()):
+        self._conn.execute(sql, list(params))
+
+    def executemany(self, sql, rows):
+        self._conn.executemany(sql, rows)
+
+    def fetchone(self):
+        return self._conn.fetchone()
+
+    def fetchmany(self, size):
+        return self._conn.fetchmany(size)
+
+    def fetchall(self):
+        return self._conn.fetchall()
+
+    def close(self):
+        pass
+
+
+class DuckDBStorage(Storage):
+    name = "duckdb"
+    placeholder = "?"
+    # 범위 조회는 DuckDB 의 min-max 존 맵으로 충분하고, ART 인덱스는 대량 적재를 느리게 하며
+    # 인덱스가 걸린 테이블은 ALTER 가 막히므로 고유 키만 만듭니다. (부분 인덱스는 미지원)
+    secondary_indexes = False
+    partial_indexes = False
+    # ON CONFLICT ... SET 안에서는 CURRENT_TIMESTAMP 를 컬럼 이름으로 해석함
+    now = "now()"
+
+    def __init__(self, url):
+        super().__init__(url)
+        self.path = url.split("://", 1)[1][1:] or ":memory:"
+
+    def connect(self):
+        try:
+            import duckdb
+        except ImportError:
+            raise RuntimeError("duckdb 패키지가 필요합니다. 설치: pip install duckdb")
+        return _DuckDBConnection(duckdb.connect(self.path))
+
+    def id_column(self, table, big=False):
+        return f"id BIGINT PRIMARY KEY DEFAULT nextval('{table}_id_seq')"
+
+    def create_table(self, cur, table, ddl):
+        cur.execute(f"CREATE SEQUENCE IF NOT EXISTS {table}_id_seq")
+        super().create_table(cur, table, ddl)
+
+    def schema_statements(self):
+        return [f"CREATE SEQUENCE IF NOT EXISTS {table}_id_seq" for table, ddl in TABLE_DDL.items() if "id}" in ddl] \
+            + super().schema_statements()
+
+
+_BACKENDS = {"sqlite": SQLiteStorage, "duckdb": DuckDBStorage}
+
+
+def get_storage(url: str = None) -> Storage:
+    """URL 스킴에 맞는 저장소를 반환합니다. (URL 별로 하나만 생성)"""
+    url = url or config.DATABASE_URL
+    if not url:
+        raise RuntimeError("JTBC_DATABASE_URL 또는 SUPABASE_CONNECTION_STRING 이 설정되지 않았습니다.")
+    with _storages_lock:
+        if url not in _storages:
+            backend = _BACKENDS.get(url.split("://", 1)[0], PostgresStorage)
+            _storages[url] = backend(url)
+        return _storages[url]
+
+
+# ---- 현재 백엔드로 위임하는 모듈 함수 ----
+
+def get_db_connection():
+    """현재 백엔드의 새 연결을 반환합니다."""
+    return get_storage().connect()
+
+
+def create_tables(conn=None):
+    get_storage().create_tables(conn)
+
+
+def get_videos_without_transcript(table_name: str = "videos", since: str = None, until: str = None, limit: int = None):
+    """대본이 없는 영상 목록을 가져옵니다.
+
+    since/until(YYYY-MM-DD)을 주면 published_at 기준으로 범위를 제한합니다. until은 당일 포함.
+    스케줄러가 쓰는 comment_count/comment_likes/duration_seconds 를 함께 반환합니다.
+    결과는 id 순이며, 처리 순서는 jtbc.scheduler.order_videos 가 정합니다.
+    """
+    return get_storage().get_videos_without_transcript(table_name, since, until, limit)
+
+
+def update_transcript(video_id: str, transcript: str, table_name: str = "videos", segments: list = None, source: str = "whisper"):
+    """영상의 대본을 업데이트합니다.
+
+    segments([{"start", "end", "text"}])를 주면 같은 트랜잭션에서 transcript_segments 도 교체합니다.
+    """
+    get_storage().update_transcript(video_id, transcript, table_name, segments, source)
+
+
+def search_segments(query: str, limit: int = 50, source: str = None, short_days: int = SHORT_QUERY_DAYS) -> list:
+    """대본 구간에서 query 를 포함하는 위치를 (영상, 시작/끝 초, 문장) 목록으로 반환합니다. (최근 영상 먼저)"""
+    return get_storage().search_segments(query, limit, source, short_days)
+
+
+def upsert_videos(videos: list, table_name: str = "videos") -> int:
+    """조회한 영상 목록을 저장합니다. 이미 있는 영상은 게시일을 갱신하고 길이를 채웁니다."""
+    return get_storage().upsert_videos(videos, table_name)
+
+
+def update_duration(video_id: str, duration_seconds: int, table_name: str = "videos"):
+    """사전 조회(probe)로 얻은 영상 길이를 저장합니다."""
+    get_storage().update_duration(video_id, duration_seconds, table_name)
+
+
+def get_transcript_status(table_name: str = "videos") -> dict:
+    """대본 수집 진행 현황(전체/완료/대기, 대기 중 최초·최종 게시일)을 집계합니다."""
+    return get_storage().get_transcript_status(table_name)
+
+
+def insert_data(videos_data: list, conn=None):
+    get_storage().insert_data(videos_data, conn)
+
+
+def fetch_data(conn=None):
+    return get_storage().fetch_data(conn)
+
+
+def insert_scores(scored_df, batch_size: int = 500, conn=None):
+    get_storage().insert_scores(scored_df, batch_size, conn)
+
+
+# ---- 대량 동기화 ----
+
+SYNC_STATE_FILE = "sync_state.json"
+
+
+def _sync_key(source: Storage, target: Storage) -> str:
+    import hashlib
+
+    return hashlib.sha256(f"{source.url}\n{target.url}".encode()).hexdigest()[:16]
+
+
+def sync_storage(source_url: str = None, target_url: str = None, batch_rows: int = 5000) -> dict:
+    """내장 백엔드의 데이터를 대상(기본 Supabase)으로 한 번에 올립니다.
+
+    - videos: video_id 기준 upsert (대본/길이는 비어 있는 쪽만 채움)
+    - transcript_segments: (video_id, source, seq) 기준 upsert, 옮긴 영상의 2-gram 색인은 대상에서 다시 생성
+    - comments, llm_scores: 원본 id 워터마크 이후 행만 추가 (.jtbc_state/sync_state.json)
+    """
+    source = get_storage(source_url)
+    target = get_storage(target_url or config.SUPABASE_CONNECTION_STRING)
+    if source.url == target.url:
+        raise RuntimeError("원본과 대상 저장소가 같습니다.")
+
+    state_path = config.STATE_DIR / SYNC_STATE_FILE
+    try:
+        all_state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        all_state = {}
+    key = _sync_key(source, target)
+    state = all_state.setdefault(key, {})
+
+    plans = [
+        ("videos", ("video_id", "title", "published_at", "url", "transcript", "duration_seconds"), False,
+         """ON CONFLICT (video_id) DO UPDATE
+         SET transcript = COALESCE(videos.transcript, EXCLUDED.transcript),
+             updated_at = CASE WHEN videos.transcript IS NULL AND EXCLUDED.transcript IS NOT NULL
+                               THEN {now} ELSE videos.updated_at END,
+             duration_seconds = COALESCE(videos.duration_seconds, EXCLUDED.duration_seconds)"""),
+        ("transcript_segments", SEGMENT_COLUMNS, True,
+         """ON CONFLICT (video_id, source, seq) DO UPDATE
+         SET start_s = EXCLUDED.start_s, end_s = EXCLUDED.end_s, text = EXCLUDED.text"""),
+        ("comments", COMMENT_COLUMNS, True, "ON CONFLICT (comment_id, published_at) DO NOTHING"),
+        ("scoring_profiles", PROFILE_COLUMNS, False, "ON CONFLICT (profile_id) DO NOTHING"),
+        ("llm_scores", SCORE_COLUMNS, True, ""),
+    ]
+    counts = {}
+    touched = set()  # 대상에서 2-gram 색인을 다시 만들 (video_id, source)
+    with source.connection() as src, target.connection() as dst:
+        source.ensure_schema(src)
+        target.create_tables(dst)
+        for table, columns, by_id, suffix in plans:
+            last_id = state.get(table, 0) if by_id else 0
+            counts[table] = 0
+            with source.cursor(src) as read, target.cursor(dst) as write:
+                source.execute(read, f"SELECT id, {', '.join(columns)} FROM {table} WHERE id > %s ORDER BY id", (last_id,))
+                while True:
+                    rows = read.fetchmany(batch_rows)
+                    if not rows:
+                        break
+                    target.insert_many(write, table, columns, [row[1:] for row in rows], suffix.format(now=target.now))
+                    if table == "transcript_segments":
+                        touched.update((row[1], row[2]) for row in rows)
+                    dst.commit()
+                    counts[table] += len(rows)
+                    if by_id:
+                        state[table] = rows[-1][0]
+                        state_path.parent.mkdir(parents=True, exist_ok=True)
+                        state_path.write_text(json.dumps(all_state, indent=2), encoding="utf-8")
+            print(f"  - {table}: {counts[table]}행")
+        with target.cursor(dst) as write:
+            for video_id, source_name in sorted(touched):
+                target.index_segments(write, video_id, source_name)
+        dst.commit()
+    return counts
@@ -0,0 +1,218 @@
+"""재생목록/채널 영상 목록 조회 (YouTube Data API v3).
+
+- 업로드 재생목록(UU...)처럼 최신순으로 정렬된 목록은 기간 밖으로 벗어나는 즉시 중단
+- 채널은 search(publishedAfter/publishedBefore)로 기간을 서버에서 제한 (월 단위 분할, 호출당 100 quota)
+- 길이/통계는 videos().list 에 50개씩 묶어 조회
+- 여러 재생목록을 동시에 조회 (googleapiclient 는 스레드 안전하지 않아 스레드별 클라이언트 사용)
+"""
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from jtbc import config
+from jtbc.ytapi import PLAYLIST_ITEM_FIELDS, SEARCH_FIELDS, VIDEO_FIELDS
+
+API_PAGE_SIZE = 50
+# 정렬 여부를 모르는 재생목록에서 기간 밖 페이지가 연속 몇 번 나오면 중단할지
+STALE_PAGES = int(os.getenv("DISCOVERY_STALE_PAGES", "2"))
+
+_local = threading.local()
+_DURATION_RE = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+
+
+def get_youtube():
+    """스레드별 YouTube API 클라이언트."""
+    if getattr(_local, "youtube", None) is None:
+        from googleapiclient.discovery import build
+
+        _local.youtube = build("youtube", "v3", developerKey=config.GOOGLE_CLOUD_API_KEY, cache_discovery=False)
+    return _local.youtube
+
+
+def parse_published(value: str) -> datetime:
+    """'2025-01-01T12:34:56Z' -> naive UTC datetime (소수점 초 허용)."""
+    return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S')
+
+
+def parse_duration(value: str) -> int:
+    """ISO 8601 길이(PT1H2M3S)를 초로 변환합니다."""
+    match = _DURATION_RE.fullmatch(value or "")
+    if not match:
+        return None
+    days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def _video_row(video_id: str, title: str, published_at: datetime) -> dict:
+    return {
+        'video_id': video_id,
+        'title': title,
+        'published_at': published_at,
+        'url': f"https://www.youtube.com/watch?v={video_id}",
+    }
+
+
+def playlist_item_row(item: dict) -> dict:
+    """playlistItems 항목 -> 영상 행. 게시일은 업로드 시각(videoPublishedAt), 비공개/삭제 영상은 None."""
+    details = item['contentDetails']
+    if not details.get('videoPublishedAt'):
+        return None
+    return _video_row(details['videoId'], item['snippet']['title'], parse_published(details['videoPublishedAt']))
+
+
+def iter_playlist_videos(playlist_id: str, start: datetime, end: datetime, sorted_desc: bool = None):
+    """재생목록에서 [start, end] 기간의 영상을 순서대로 내보냅니다.
+
+    기간과 조기 중단은 영상 업로드 시각 기준입니다. (재생목록 추가 시각 아님)
+    sorted_desc=True 면 start 보다 오래된 항목을 만나는 즉시 중단합니다.
+    None 이면 업로드 재생목록(UU...)은 True 로 보고, 그 외에는 지금까지 본 항목이
+    최신순이었고 기간 밖 페이지가 STALE_PAGES 번 연속되면 중단합니다.
+    """
+    if sorted_desc is None and playlist_id.startswith("UU"):
+        sorted_desc = True
+    next_page_token = None
+    stale_pages = 0
+    monotonic = True
+    last_seen = None
+    pages = 0
+
+    while True:
+        response = get_youtube().playlistItems().list(
+            part="snippet,contentDetails",
+            playlistId=playlist_id,
+            maxResults=API_PAGE_SIZE,
+            pageToken=next_page_token,
+            fields=PLAYLIST_ITEM_FIELDS,
+        ).execute()
+        pages += 1
+
+        in_window = 0
+        for item in response.get('items', ()):
+            row = playlist_item_row(item)
+            if row is None:
+                continue
+            published_at = row['published_at']
+            if last_seen is not None and published_at > last_seen:
+                monotonic = False
+            last_seen = published_at
+
+            if published_at < start and sorted_desc:
+                print(f"  - {playlist_id}: {pages}페이지에서 기간 시작일 이전 도달, 조회 중단")
+                return
+            if start <= published_at <= end:
+                in_window += 1
+                yield row
+
+        stale_pages = stale_pages + 1 if in_window == 0 and last_seen is not None and last_seen < start else 0
+        if sorted_desc is None and monotonic and stale_pages >= STALE_PAGES:
+            print(f"  - {playlist_id}: 최신순 목록에서 기간 밖 페이지 {stale_pages}개 연속, 조회 중단")
+            return
+
+        next_page_token = response.get('nextPageToken')
+        if not next_page_token:
+            return
+
+
+def _month_windows(start: datetime, end: datetime):
+    cursor = start
+    while cursor <= end:
+        following = (cursor.replace(day=1) + timedelta(days=32)).replace(day=1)
+        yield cursor, min(following - timedelta(seconds=1), end)
+        cursor = following
+
+
+def iter_channel_videos(channel_id: str, start: datetime, end: datetime):
+    """search API 로 채널의 [start, end] 업로드를 조회합니다.
+
+    search 는 요청당 최대 500건만 돌려주므로 월 단위로 나눠 조회합니다.
+    """
+    for window_start, window_end in _month_windows(start, end):
+        next_page_token = None
+        while True:
+            response = get_youtube().search().list(
+                part="snippet",
+                channelId=channel_id,
+                type="video",
+                order="date",
+                publishedAfter=window_start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                publishedBefore=window_end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                maxResults=API_PAGE_SIZE,
+                pageToken=next_page_token,
+                fields=SEARCH_FIELDS,
+            ).execute()
+            for item in response.get('items', ()):
+                yield _video_row(item['id']['videoId'], item['snippet']['title'], parse_published(item['snippet']['publishedAt']))
+            next_page_token = response.get('nextPageToken')
+            if not next_page_token:
+                break
+
+
+def uploads_playlist_id(channel_id: str) -> str:
+    """채널의 업로드 재생목록 ID (UC... -> UU...)."""
+    if channel_id.startswith("UC"):
+        return "UU" + channel_id[2:]
+    response = get_youtube().channels().list(
+        part="contentDetails", id=channel_id, fields="items/contentDetails/relatedPlaylists/uploads"
+    ).execute()
+    return response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+
+
+def fetch_video_details(video_ids: list, workers: int = 4) -> dict:
+    """videos().list 를 50개씩 묶어 길이/조회수/댓글수를 가져옵니다."""
+    def fetch(batch):
+        response = get_youtube().videos().list(
+            part="contentDetails,statistics",
+            id=",".join(batch),
+            maxResults=API_PAGE_SIZE,
+            fields=VIDEO_FIELDS,
+        ).execute()
+        return {
+            item['id']: {
+                'duration_seconds': parse_duration(item['contentDetails'].get('duration')),
+                'view_count': int(item.get('statistics', {}).get('viewCount', 0)),
+                'comment_count': int(item.get('statistics', {}).get('commentCount', 0)),
+            }
+            for item in response.get('items', ())
+        }
+
+    batches = [video_ids[i:i + API_PAGE_SIZE] for i in range(0, len(video_ids), API_PAGE_SIZE)]
+    details = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for result in pool.map(fetch, batches):
+            details.update(result)
+    return details
+
+
+def enumerate_videos(start: datetime, end: datetime, playlist_ids=(), channel_ids=(), use_search: bool = False,
+                     workers: int = 4, with_details: bool = True) -> list:
+    """여러 재생목록/채널의 기간 내 영상을 동시에 조회해 중복 없이 게시일순으로 반환합니다.
+
+    채널은 기본적으로 업로드 재생목록(조기 중단 가능)으로 조회하고, use_search=True 면 search API 를 씁니다.
+    """
+    sources = [("playlist", pid) for pid in playlist_ids]
+    for channel_id in channel_ids:
+        if use_search:
+            sources.append(("search", channel_id))
+        else:
+            sources.append(("playlist", uploads_playlist_id(channel_id)))
+
+    def collect(source):
+        kind, source_id = source
+        if kind == "search":
+            return list(iter_channel_videos(source_id, start, end))
+        return list(iter_playlist_videos(source_id, start, end))
+
+    videos = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for rows in pool.map(collect, sources):
+            for row in rows:
+                videos.setdefault(row['video_id'], row)
+
+    if with_details and videos:
+        details = fetch_video_details(list(videos), workers)
+        for video_id, extra in details.items():
+            videos[video_id].update(extra)
+
+    return sorted(videos.values(), key=lambda v: v['published_at'])
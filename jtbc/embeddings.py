@@ -0,0 +1,433 @@
+"""댓글/대본 임베딩 저장소, 근사 최근접 이웃(IVF) 색인, 클러스터링, 근사 중복 점수 전파.
+
+    python -m jtbc embed                         # 아직 임베딩이 없는 텍스트만 임베딩해 저장
+    python -m jtbc topics --clusters 40 --score  # 주제 클러스터, 클러스터마다 대표 텍스트 하나만 스코어링
+    python -m jtbc similar "특검 수사" -k 20       # 의미가 비슷한 댓글/대본
+    python llm-ev.py --dedup 0.95                # 거의 같은 텍스트는 대표 하나만 스코어링하고 점수를 복사
+
+임베딩은 text_hash((dt, text) 지문)마다 한 번만 계산해 .jtbc_state/embeddings/<모델>-<차원>/ 에 저장합니다.
+vectors.f16 은 L2 정규화한 float16 행을 이어 붙인 파일(텍스트 하나에 차원 x 2 바이트), keys.bin 은 같은 순서의
+text_hash 입니다. 둘 다 덧붙이기만 하고 memmap 으로 읽으므로 수십만 건도 통째로 메모리에 올리지 않습니다.
+(중간에 죽으면 짧은 쪽 길이까지만 유효)
+
+IVF 색인은 구면 k-means 중심(nlist 개)과 중심별 행 목록입니다. 검색은 질의와 가까운 nprobe 개 목록만 훑고,
+근사 중복 묶음은 목록 안에서 대표(먼저 저장된 행)와의 코사인 유사도가 threshold 이상인 행을 묶습니다.
+목록 경계에 걸친 중복은 놓칠 수 있지만, 그런 행은 따로 스코어링될 뿐 잘못 복사되지는 않습니다.
+
+    JTBC_EMBEDDING_BACKEND=openai      openai 또는 local (sentence-transformers)
+    JTBC_EMBEDDING_MODEL=text-embedding-3-small
+    JTBC_EMBEDDING_DIMS=256            openai text-embedding-3-* 의 출력 차원 (local 은 모델 고정)
+"""
+import json
+import os
+import re
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from jtbc import config, metrics, profiles, shutdown, usage
+
+BACKEND = os.getenv("JTBC_EMBEDDING_BACKEND", "openai")
+MODEL = os.getenv("JTBC_EMBEDDING_MODEL", "text-embedding-3-small")
+DIMS = int(os.getenv("JTBC_EMBEDDING_DIMS", "256"))
+BATCH_SIZE = int(os.getenv("JTBC_EMBEDDING_BATCH", "256"))
+KEY_DTYPE = "S20"
+# 큰 행렬 연산을 이 행 수씩 나눠 float32 로 올림
+CHUNK_ROWS = 65536
+# 근사 중복 묶기에서 한 번에 비교할 행 수 (유사도 행렬은 최대 DEDUP_CHUNK x DEDUP_CHUNK float32 = 64MB)
+DEDUP_CHUNK = int(os.getenv("JTBC_DEDUP_CHUNK", "4096"))
+
+
+# ---- 임베딩 계산 ----
+
+_local_models = {}
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+@metrics.traced("embed_batch")
+def embed_batch(texts: list, model: str = None, dims: int = None, backend: str = None):
+    """texts 의 L2 정규화된 임베딩 (len(texts) x dims, float32)."""
+    model, dims, backend = model or MODEL, dims or DIMS, backend or BACKEND
+    if backend == "local":
+        if model not in _local_models:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                raise RuntimeError("sentence-transformers 패키지가 필요합니다. 설치: pip install sentence-transformers")
+            _local_models[model] = SentenceTransformer(model)
+        return _normalize(_local_models[model].encode(texts, batch_size=len(texts), show_progress_bar=False))
+    if backend != "openai":
+        raise ValueError(f"알 수 없는 임베딩 백엔드: {backend} (가능: openai, local)")
+
+    from jtbc.openai_client import get_openai_client
+
+    usage.check_budget()
+    started = time.perf_counter()
+    try:
+        resp = get_openai_client().embeddings.create(model=model, input=texts, dimensions=dims)
+    except Exception as e:
+        usage.record("embedding", model, time.perf_counter() - started, outcome=type(e).__name__, items=len(texts))
+        raise
+    usage.record("embedding", model, time.perf_counter() - started, items=len(texts),
+                 prompt_tokens=getattr(resp.usage, "prompt_tokens", 0) or 0)
+    metrics.inc("jtbc_texts_embedded_total", len(texts))
+    data = sorted(resp.data, key=lambda item: item.index)
+    return _normalize([item.embedding for item in data])
+
+
+# ---- 저장소 ----
+
+def _store_dir(model: str, dims: int, backend: str):
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model)
+    return config.STATE_DIR / "embeddings" / (f"{name}-{dims}" if backend == "openai" else f"local-{name}")
+
+
+class EmbeddingStore:
+    """text_hash -> float16 단위 벡터. 덧붙이기 전용, memmap 으로 읽습니다."""
+
+    def __init__(self, model: str = None, dims: int = None, backend: str = None, path=None):
+        self.model, self.dims, self.backend = model or MODEL, dims or DIMS, backend or BACKEND
+        self.path = path or _store_dir(self.model, self.dims, self.backend)
+        meta = self.path / "meta.json"
+        if meta.exists():
+            # local 모델은 실제 출력 차원이 저장되어 있음
+            self.dims = json.loads(meta.read_text(encoding="utf-8"))["dims"]
+        self._index = None
+
+    def __len__(self) -> int:
+        vectors, keys = self.path / "vectors.f16", self.path / "keys.bin"
+        if not vectors.exists() or not keys.exists():
+            return 0
+        return min(vectors.stat().st_size // (2 * self.dims), keys.stat().st_size // 20)
+
+    def vectors(self):
+        """(n x dims) float16 읽기 전용 memmap."""
+        n = len(self)
+        if not n:
+            return np.zeros((0, self.dims), dtype=np.float16)
+        return np.memmap(self.path / "vectors.f16", dtype=np.float16, mode="r", shape=(n, self.dims))
+
+    def keys(self):
+        n = len(self)
+        if not n:
+            return np.zeros(0, dtype=KEY_DTYPE)
+        return np.memmap(self.path / "keys.bin", dtype=KEY_DTYPE, mode="r", shape=(n,))
+
+    def index_of(self) -> dict:
+        """{text_hash: 행 번호}."""
+        if self._index is None or len(self._index) != len(self):
+            self._index = {key.decode(): row for row, key in enumerate(self.keys())}
+        return self._index
+
+    def rows(self, hashes) -> np.ndarray:
+        """hashes 의 행 번호 (없으면 -1)."""
+        index = self.index_of()
+        return np.fromiter((index.get(h, -1) for h in hashes), dtype=np.int64, count=len(hashes))
+
+    def append(self, hashes: list, vectors):
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta = self.path / "meta.json"
+        if not meta.exists():
+            self.dims = int(vectors.shape[1])
+            meta.write_text(json.dumps({"model": self.model, "backend": self.backend, "dims": self.dims}),
+                            encoding="utf-8")
+        # 이전 실행이 쓰다 만 꼬리는 잘라 두 파일의 행 수를 맞춤
+        n = len(self)
+        for name, width in (("vectors.f16", 2 * self.dims), ("keys.bin", 20)):
+            target = self.path / name
+            if target.exists() and target.stat().st_size != n * width:
+                with open(target, "r+b") as f:
+                    f.truncate(n * width)
+        with open(self.path / "vectors.f16", "ab") as f:
+            f.write(np.asarray(vectors, dtype=np.float16).tobytes())
+        with open(self.path / "keys.bin", "ab") as f:
+            f.write(np.asarray(hashes, dtype=KEY_DTYPE).tobytes())
+
+    def nbytes(self) -> int:
+        return len(self) * (2 * self.dims + 20)
+
+
+def embed_frame(df, store: EmbeddingStore = None, batch_size: int = BATCH_SIZE) -> int:
+    """df 의 텍스트 중 저장소에 없는 것만 임베딩해 덧붙이고, 새로 임베딩한 수를 반환합니다."""
+    store = store or EmbeddingStore()
+    df = profiles.with_hashes(df).drop_duplicates("text_hash")
+    index = store.index_of()
+    todo = df[[h not in index for h in df["text_hash"]]]
+    if todo.empty:
+        return 0
+    print(f"🧭 임베딩 {len(todo):,}건 ({store.backend}:{store.model}, 저장소 {len(store):,}건)")
+    done = 0
+    for i in range(0, len(todo), batch_size):
+        if shutdown.requested():
+            print(f"🛑 종료 요청: 임베딩 {done:,}/{len(todo):,}건에서 멈춥니다.")
+            break
+        batch = todo.iloc[i:i + batch_size]
+        try:
+            vectors = embed_batch(batch["text"].tolist(), store.model, store.dims, store.backend)
+        except (usage.BudgetExceeded, shutdown.Interrupted) as e:
+            print(f"💸 {e}. 임베딩을 중단합니다.")
+            break
+        store.append(batch["text_hash"].tolist(), vectors)
+        done += len(batch)
+    usage.flush()
+    return done
+
+
+# ---- 클러스터링 ----
+
+def assign(vectors, centroids, chunk: int = CHUNK_ROWS):
+    """각 행과 가장 가까운(내적이 가장 큰) 중심 번호와 그 유사도."""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    best = np.empty(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), chunk):
+        sims = np.asarray(vectors[start:start + chunk], dtype=np.float32) @ centroids.T
+        labels[start:start + chunk] = sims.argmax(axis=1)
+        best[start:start + chunk] = sims[np.arange(len(sims)), labels[start:start + chunk]]
+    return labels, best
+
+
+def kmeans(vectors, k: int, iterations: int = 20, sample: int = 50_000, seed: int = 0):
+    """구면 k-means. 최대 sample 행으로 학습한 (k x dims) 단위 중심 행렬을 반환합니다."""
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    k = max(1, min(k, n))
+    picked = np.sort(rng.choice(n, size=min(n, max(sample, k)), replace=False))
+    train = np.asarray(vectors[picked], dtype=np.float32)
+    centroids = train[rng.choice(len(train), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        labels, _ = assign(train, centroids)
+        counts = np.bincount(labels, minlength=k)
+        order = np.argsort(labels, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        filled = counts > 0
+        sums = np.empty_like(centroids)
+        sums[filled] = np.add.reduceat(train[order], starts[filled], axis=0)
+        # 빈 클러스터는 임의의 학습 행으로 다시 시작
+        sums[~filled] = train[rng.choice(len(train), size=int((~filled).sum()))]
+        updated = _normalize(sums)
+        if np.allclose(updated, centroids, atol=1e-4):
+            break
+        centroids = updated
+    return centroids
+
+
+class Topic(NamedTuple):
+    cluster: int
+    size: int
+    examples: list   # 중심과 가까운 순서의 저장소 행 번호 (첫 번째가 대표 텍스트)
+
+
+def topics(store: EmbeddingStore, k: int, examples: int = 3, seed: int = 0) -> list:
+    """저장소 전체를 k 개 주제로 묶어 크기 순 Topic 목록을 반환합니다."""
+    vectors = store.vectors()
+    centroids = kmeans(vectors, k, seed=seed)
+    labels, sims = assign(vectors, centroids)
+    order = np.lexsort((-sims, labels))
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(centroids)))])
+    found = [Topic(c, int(offsets[c + 1] - offsets[c]), order[offsets[c]:offsets[c] + examples].tolist())
+             for c in range(len(centroids)) if offsets[c + 1] > offsets[c]]
+    return sorted(found, key=lambda topic: -topic.size)
+
+
+# ---- IVF 색인 ----
+
+class IVFIndex(NamedTuple):
+    centroids: np.ndarray   # (nlist x dims) float32
+    order: np.ndarray       # 목록 순서로 정렬한 저장소 행 번호
+    offsets: np.ndarray     # 목록 l 의 행은 order[offsets[l]:offsets[l + 1]]
+    size: int               # 색인에 들어간 저장소 행 수
+    trained: int            # 중심을 학습할 때의 행 수
+
+    def members(self, l: int) -> np.ndarray:
+        return self.order[self.offsets[l]:self.offsets[l + 1]]
+
+
+def _lists(labels, nlist: int, base: int = 0) -> tuple:
+    order = np.argsort(labels, kind="stable").astype(np.int64) + base
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=nlist))]).astype(np.int64)
+    return order, offsets
+
+
+def build_index(store: EmbeddingStore, nlist: int = None) -> IVFIndex:
+    vectors = store.vectors()
+    n = len(vectors)
+    nlist = nlist or max(1, int(4 * np.sqrt(n)))
+    started = time.perf_counter()
+    centroids = kmeans(vectors, nlist, iterations=10)
+    labels, _ = assign(vectors, centroids)
+    order, offsets = _lists(labels, len(centroids))
+    print(f"🗂️ IVF 색인: {n:,}행, 목록 {len(centroids):,}개 ({time.perf_counter() - started:.1f}s)")
+    return IVFIndex(centroids, order, offsets, n, n)
+
+
+def load_index(store: EmbeddingStore) -> IVFIndex:
+    """저장된 색인을 읽고, 그 뒤에 늘어난 행은 기존 중심에 배정해 합칩니다.
+
+    학습 때보다 두 배 넘게 커졌으면 중심부터 다시 학습합니다.
+    """
+    path = store.path / "ivf.npz"
+    n = len(store)
+    index = None
+    if path.exists():
+        with np.load(path) as saved:
+            index = IVFIndex(saved["centroids"], saved["order"], saved["offsets"], int(saved["size"]),
+                             int(saved["trained"]))
+        if index.size > n or n > 2 * index.trained:
+            index = None
+    if index is None:
+        index = build_index(store)
+    elif index.size < n:
+        labels, _ = assign(store.vectors()[index.size:], index.centroids)
+        new_order, new_offsets = _lists(labels, len(index.centroids), base=index.size)
+        parts = []
+        for l in range(len(index.centroids)):
+            parts.append(index.members(l))
+            parts.append(new_order[new_offsets[l]:new_offsets[l + 1]])
+        index = IVFIndex(index.centroids, np.concatenate(parts), index.offsets + new_offsets, n, index.trained)
+    else:
+        return index
+    np.savez(path, centroids=index.centroids, order=index.order, offsets=index.offsets, size=index.size,
+             trained=index.trained)
+    return index
+
+
+def search(store: EmbeddingStore, index: IVFIndex, queries, k: int = 10, nprobe: int = 8) -> list:
+    """질의 벡터마다 [(저장소 행 번호, 코사인 유사도)] 상위 k 개."""
+    vectors = store.vectors()
+    queries = _normalize(np.atleast_2d(queries))
+    nprobe = min(nprobe, len(index.centroids))
+    probes = np.argsort(-(queries @ index.centroids.T), axis=1)[:, :nprobe]
+    results = []
+    for query, lists in zip(queries, probes):
+        candidates = np.sort(np.concatenate([index.members(l) for l in lists]))
+        if not len(candidates):
+            results.append([])
+            continue
+        sims = np.asarray(vectors[candidates], dtype=np.float32) @ query
+        top = np.argpartition(-sims, min(k, len(sims)) - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        results.append(list(zip(candidates[top].tolist(), sims[top].tolist())))
+    return results
+
+
+def _greedy_leaders(block, threshold: float) -> np.ndarray:
+    """block 행마다 block 안 대표의 위치. 앞에서부터 가까운 대표가 없는 행이 새 대표가 됩니다."""
+    close = (block @ block.T) >= threshold
+    leader = np.full(len(block), -1)
+    # 대표가 될 행에서만 돌고, 그 행과 가까운 나머지 행을 한 번에 묶음
+    for i in range(len(block)):
+        if leader[i] < 0:
+            leader[close[i] & (leader < 0)] = i
+    return leader
+
+
+def duplicate_leaders(store: EmbeddingStore, index: IVFIndex, threshold: float = 0.95,
+                      chunk: int = DEDUP_CHUNK) -> np.ndarray:
+    """저장소 행마다 대표 행 번호. 같은 IVF 목록 안에서 먼저 저장된 대표와의 유사도가 threshold 이상이면 그 대표.
+
+    짧은 반복 댓글이 한 목록에 몰려도 메모리가 목록 크기의 제곱으로 늘지 않도록, 목록을 chunk 행씩 나눠
+    지금까지의 대표들(chunk 개씩)과 먼저 비교하고, 남은 행끼리만 묶습니다. (chunk x chunk 행렬까지만 만듦)
+    """
+    vectors = store.vectors()
+    leaders = np.arange(index.size, dtype=np.int64)
+    for l in range(len(index.centroids)):
+        rows = index.members(l)
+        if len(rows) < 2:
+            continue
+        rows = np.sort(rows)
+        heads = []  # 이 목록의 대표 행 번호 (저장 순)
+        for start in range(0, len(rows), chunk):
+            part = rows[start:start + chunk]
+            block = np.asarray(vectors[part], dtype=np.float32)
+            found = np.full(len(part), -1, dtype=np.int64)
+            for h in range(0, len(heads), chunk):
+                open_ = np.flatnonzero(found < 0)
+                if not len(open_):
+                    break
+                ids = np.asarray(heads[h:h + chunk])
+                close = (block[open_] @ np.asarray(vectors[ids], dtype=np.float32).T) >= threshold
+                hit = close.any(axis=1)
+                # 가장 먼저 저장된 대표
+                found[open_[hit]] = ids[close[hit].argmax(axis=1)]
+            rest = np.flatnonzero(found < 0)
+            if len(rest):
+                local = _greedy_leaders(block[rest], threshold)
+                found[rest] = part[rest][local]
+                heads.extend(part[rest][local == np.arange(len(rest))].tolist())
+            leaders[part] = found
+    return leaders
+
+
+# ---- 근사 중복 점수 전파 (llm-ev.py --dedup) ----
+
+def split_duplicates(frame, pending, profile, threshold: float = 0.95, store: EmbeddingStore = None,
+                     storage=None) -> tuple:
+    """pending 을 (스코어링할 행, 점수를 복사할 행) 으로 나눕니다.
+
+    같은 묶음에 이 프로필로 이미 점수가 있는 텍스트가 있으면 그 점수를, 없으면 묶음에서 먼저 나온
+    pending 행 하나만 스코어링해 나머지에 복사합니다. 복사할 행에는 source_hash 열이 붙습니다.
+    """
+    from jtbc import db
+
+    store = store or EmbeddingStore()
+    embed_frame(frame, store)
+    index = load_index(store)
+    leaders = duplicate_leaders(store, index, threshold)
+    pending = profiles.with_hashes(pending)
+    rows = store.rows(pending["text_hash"].tolist())
+    group = np.where(rows >= 0, leaders[np.maximum(rows, 0)], -1 - np.arange(len(rows)))
+
+    # 묶음 대표 행 -> 이 프로필로 이미 점수가 있는 같은 묶음의 text_hash
+    current, _ = (storage or db.get_storage()).score_index(profile.profile_id)
+    current = list(current)
+    current_rows = store.rows(current)
+    scored = {}
+    for key, row in zip(current, current_rows.tolist()):
+        if row >= 0:
+            scored.setdefault(int(leaders[row]), key)
+
+    first = {}
+    score_mask = np.ones(len(pending), dtype=bool)
+    sources = np.empty(len(pending), dtype=object)
+    for i, (key, g) in enumerate(zip(pending["text_hash"], group.tolist())):
+        source = scored.get(g) or first.get(g)
+        if source is None:
+            first[g] = key
+        else:
+            score_mask[i] = False
+            sources[i] = source
+    copies = pending[~score_mask].assign(source_hash=sources[~score_mask])
+    return pending[score_mask], copies
+
+
+def copy_scores(copies, profile, storage=None, conn=None) -> int:
+    """source_hash 의 이 프로필 점수를 copies 행에 복사해 저장합니다. 아직 점수가 없는 행은 건너뜁니다."""
+    from jtbc import db
+    from jtbc.scoring import FLAG_PROPAGATED
+
+    if copies.empty:
+        return 0
+    storage = storage or db.get_storage()
+    found = storage.scores_for(profile.profile_id, sorted(set(copies["source_hash"])), conn)
+    copies = copies[copies["source_hash"].isin(list(found))]
+    if copies.empty:
+        return 0
+    values = [found[h] for h in copies["source_hash"]]
+    scored = copies.drop(columns=["source_hash"]).assign(
+        sentiment=[v["sentiment"] for v in values], fairness=[v["fairness"] for v in values],
+        notes=[f"≈{h} {v['notes'] or ''}".strip() for h, v in zip(copies["source_hash"], values)],
+        score_flags=[(v["score_flags"] or 0) | FLAG_PROPAGATED for v in values],
+        profile_id=profile.profile_id)
+    storage.insert_scores(scored, conn=conn)
+    metrics.inc("jtbc_scores_propagated_total", len(scored))
+    return len(scored)
+
+
+metrics.describe("jtbc_texts_embedded_total", "Texts embedded through the embeddings API")
+metrics.describe("jtbc_scores_propagated_total", "Scores copied from a near-duplicate instead of calling the LLM")
@@ -0,0 +1,392 @@
+"""테스트/벤치마크용 가짜 로컬 API 서버 (표준 라이브러리만 사용).
+
+FakeYouTubeServer 는 YouTube Data API v3 의 playlistItems, commentThreads, comments, videos 를
+결정적인 합성 데이터로 흉내 냅니다. 지연과 오류(5xx, 403 rateLimitExceeded)를 주입할 수 있어
+jtbc.ytapi 의 재시도/동시성 동작을 실제 API 할당량 없이 확인할 수 있습니다.
+
+    with FakeYouTubeServer(latency=0.05, error_rate=0.1) as server:
+        comments = harvest_comments(["vid0", "vid1"], base_url=server.base_url, api_key="test")
+
+FakeOpenAIServer 는 Whisper(audio/transcriptions, verbose_json), chat completions, embeddings 를 흉내 냅니다.
+오류는 500 과 429(retry-after-ms 헤더)로 주입되어 openai SDK 의 재시도 경로를 그대로 탑니다.
+"""
+import base64
+import gzip
+import json
+import math
+import random
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _parse_fields(mask: str) -> dict:
+    """'a,b(c,d/e),f/g' -> {"a": {}, "b": {"c": {}, "d": {"e": {}}}, "f": {"g": {}}} (빈 dict = 전체)."""
+    pos = 0
+
+    def merge(tree, other):
+        for key, sub in other.items():
+            merge(tree.setdefault(key, {}), sub)
+
+    def parse_list():
+        nonlocal pos
+        tree = {}
+        while pos < len(mask) and mask[pos] != ")":
+            merge(tree, parse_path())
+            if pos < len(mask) and mask[pos] == ",":
+                pos += 1
+        return tree
+
+    def parse_path():
+        nonlocal pos
+        start = pos
+        while pos < len(mask) and mask[pos] not in ",()/":
+            pos += 1
+        name, sub = mask[start:pos], {}
+        if pos < len(mask) and mask[pos] == "/":
+            pos += 1
+            sub = parse_path()
+        elif pos < len(mask) and mask[pos] == "(":
+            pos += 1
+            sub = parse_list()
+            pos += 1  # ")"
+        return {name: sub}
+
+    return parse_list()
+
+
+def apply_fields(value, tree: dict):
+    """fields 마스크를 응답에 적용합니다. 리스트는 원소마다 적용."""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(v, tree) for v in value]
+    if not isinstance(value, dict):
+        return value
+    return {k: apply_fields(value[k], sub) for k, sub in tree.items() if k in value}
+
+
+class _FakeServer:
+    """지연/오류 주입과 스레드 HTTP 서버를 담당하는 공통 부분. 하위 클래스는 route() 만 구현합니다."""
+
+    path_prefix = ""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    def _roll(self) -> str:
+        """이번 요청에 주입할 오류 종류 ("error", "rate_limit") 또는 None."""
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.rate_limit_rate:
+            return "rate_limit"
+        return None
+
+    def route(self, method: str, path: str, params: dict, body: bytes):
+        """(status, body, 추가 헤더) 를 반환합니다."""
+        raise NotImplementedError
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _read_body(self) -> bytes:
+                if "chunked" in self.headers.get("Transfer-Encoding", ""):
+                    parts = []
+                    while True:
+                        size = int(self.rfile.readline().strip() or b"0", 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            return b"".join(parts)
+                        parts.append(self.rfile.read(size))
+                        self.rfile.readline()
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def _serve(self, method: str):
+                body = self._read_body() if method == "POST" else b""
+                if server.latency:
+                    time.sleep(server.latency)
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                status, payload, headers = server.route(method, url.path, params, body)
+                payload = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    payload = gzip.compress(payload)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{self.path_prefix}"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeYouTubeServer(_FakeServer):
+    path_prefix = "/youtube/v3"
+
+    def __init__(self, videos: int = 20, comments_per_video: int = 150,
+                 latency: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 first_published: datetime = datetime(2025, 4, 1), seed: int = 0):
+        super().__init__(latency, error_rate, rate_limit_rate, seed)
+        self.video_ids = [f"vid{i}" for i in range(videos)]
+        self.comments_per_video = comments_per_video
+        self.first_published = first_published
+
+    # ---- 합성 데이터 ----
+
+    def _published(self, index: int) -> str:
+        # 재생목록은 최신순 (index 0 이 가장 최근)
+        return (self.first_published + timedelta(days=len(self.video_ids) - index)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def _page(self, items: list, params: dict, limit: int) -> dict:
+        offset = int(params.get("pageToken") or 0)
+        size = min(limit, int(params.get("maxResults") or limit))
+        body = {"items": items[offset:offset + size]}
+        if offset + size < len(items):
+            body["nextPageToken"] = str(offset + size)
+        return body
+
+    def playlist_items(self, params: dict) -> dict:
+        items = [
+            {"snippet": {"publishedAt": self._published(i), "title": f"뉴스룸 {vid}"},
+             "contentDetails": {"videoId": vid, "videoPublishedAt": self._published(i)}}
+            for i, vid in enumerate(self.video_ids)
+        ]
+        return self._page(items, params, 50)
+
+    def comment_threads(self, params: dict) -> dict:
+        video_id = params.get("videoId", "")
+        # 실제 응답처럼 마스크로 걸러질 부가 필드(kind, etag, 프로필 URL 등)를 포함
+        items = [
+            {"kind": "youtube#commentThread", "etag": f"etag-{video_id}-{i}", "id": f"{video_id}.c{i}",
+             "snippet": {"channelId": "UCfake", "videoId": video_id, "canReply": True, "isPublic": True,
+                         "totalReplyCount": i % 3, "topLevelComment": {
+                             "kind": "youtube#comment", "etag": f"etag-c-{video_id}-{i}", "id": f"{video_id}.c{i}",
+                             "snippet": {
+                                 "channelId": "UCfake", "videoId": video_id,
+                                 "authorDisplayName": f"user{i}",
+                                 "authorProfileImageUrl": f"https://yt3.ggpht.com/fake-profile-image/user{i}=s48-c-k",
+                                 "authorChannelUrl": f"http://www.youtube.com/channel/UCuser{i}",
+                                 "authorChannelId": {"value": f"UCuser{i}"},
+                                 "textDisplay": f"{video_id} 댓글 {i}", "textOriginal": f"{video_id} 댓글 {i}",
+                                 "canRate": True, "viewerRating": "none", "likeCount": (i * 7) % 50,
+                                 "publishedAt": "2025-05-01T00:00:00Z", "updatedAt": "2025-05-01T00:00:00Z"}}}}
+            for i in range(self.comments_per_video)
+        ]
+        return self._page(items, params, 100)
+
+    def comments(self, params: dict) -> dict:
+        parent_id = params.get("parentId", "")
+        items = [
+            {"id": f"{parent_id}.r{i}", "snippet": {
+                "parentId": parent_id, "authorDisplayName": f"replier{i}", "textDisplay": f"답글 {i}",
+                "publishedAt": "2025-05-01T00:00:00Z", "likeCount": i}}
+            for i in range(3)
+        ]
+        return self._page(items, params, 100)
+
+    def videos(self, params: dict) -> dict:
+        ids = [v for v in (params.get("id") or "").split(",") if v]
+        return {"items": [
+            {"id": vid, "contentDetails": {"duration": "PT45M12S"},
+             "statistics": {"viewCount": "1000", "commentCount": str(self.comments_per_video), "likeCount": "10"}}
+            for vid in ids
+        ]}
+
+    def route(self, method, path, params, body):
+        fault = self._roll()
+        if fault == "error":
+            return 503, {"error": {"code": 503, "message": "Backend Error", "errors": [{"reason": "backendError"}]}}, {}
+        if fault == "rate_limit":
+            return 403, {"error": {"code": 403, "message": "Rate limit", "errors": [{"reason": "rateLimitExceeded"}]}}, {}
+
+        handler = {
+            "playlistItems": self.playlist_items,
+            "commentThreads": self.comment_threads,
+            "comments": self.comments,
+            "videos": self.videos,
+        }.get(path.rsplit("/", 1)[-1])
+        if handler is None:
+            return 404, {"error": {"code": 404, "message": "Not Found", "errors": [{"reason": "notFound"}]}}, {}
+        response = handler(params)
+        if params.get("fields"):
+            response = apply_fields(response, _parse_fields(params["fields"]))
+        return 200, response, {}
+
+
+def _text_vector(text: str, dims: int) -> list:
+    """글자 3-gram 을 해시해 더한 단위 벡터. 겹치는 3-gram 이 많을수록 내적이 큼."""
+    vector = [0.0] * dims
+    padded = f"  {text}  "
+    for i in range(len(padded) - 2):
+        h = zlib.crc32(padded[i:i + 3].encode("utf-8"))
+        vector[h % dims] += 1.0 if h & 0x80000000 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class FakeOpenAIServer(_FakeServer):
+    """Whisper 와 chat completions 의 로컬 대역.
+
+    - 전사 소요 시간은 latency + seconds_per_mb x 업로드 크기(MB)
+    - 오디오 길이는 업로드 크기 / audio_bytes_per_second 로 추정 (bench 의 합성 WAV 는 8kHz 16bit 모노)
+    - chat 응답은 프롬프트의 --- 구분 텍스트 수만큼 점수 JSON 배열을 돌려줌
+    - 임베딩은 글자 3-gram 해시 벡터라 비슷한 텍스트끼리 코사인 유사도가 높음
+    """
+
+    path_prefix = "/v1"
+
+    def __init__(self, latency: float = 0.0, seconds_per_mb: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, audio_bytes_per_second: int = 16000, segment_seconds: float = 10.0,
+                 seed: int = 0):
+        super().__init__(latency, error_rate, rate_limit_rate, seed)
+        self.seconds_per_mb = seconds_per_mb
+        self.audio_bytes_per_second = audio_bytes_per_second
+        self.segment_seconds = segment_seconds
+        self.transcriptions = 0
+        self.completions = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.embedded_texts = 0
+
+    def transcription(self, body: bytes) -> dict:
+        # multipart 필드 timestamp_granularities[]=word 가 있으면 단어 타임스탬프도 포함
+        with_words = b"\r\n\r\nword\r\n" in body
+        if self.seconds_per_mb:
+            time.sleep(self.seconds_per_mb * len(body) / (1024 * 1024))
+        duration = round(len(body) / self.audio_bytes_per_second, 2)
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(duration, start + self.segment_seconds)
+            segments.append({"id": len(segments), "seek": int(start * 100), "start": start, "end": end,
+                             "text": f" 합성 구간 {len(segments)} 뉴스룸 보도 내용입니다.", "tokens": [],
+                             "temperature": 0.0, "avg_logprob": -0.2, "compression_ratio": 1.3,
+                             "no_speech_prob": 0.01})
+            start = end
+        response = {"task": "transcribe", "language": "korean", "duration": duration,
+                    "text": "".join(seg["text"] for seg in segments).strip(), "segments": segments}
+        if with_words:
+            response["words"] = [
+                {"word": word, "start": round(seg["start"] + i, 2), "end": round(seg["start"] + i + 0.8, 2)}
+                for seg in segments for i, word in enumerate(seg["text"].split())
+            ]
+        with self._lock:
+            self.transcriptions += 1
+        return response
+
+    def chat_completion(self, body: bytes) -> dict:
+        request = json.loads(body or b"{}")
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        count = prompt.count("\n---\n") + 1
+        rng = random.Random(len(prompt))
+        content = json.dumps([
+            {"sentiment": round(rng.uniform(-1, 1), 2), "fairness": round(rng.uniform(0, 1), 2), "notes": "합성 점수"}
+            for _ in range(count)
+        ], ensure_ascii=False)
+        # 토큰 수는 글자 수로 대강 추정
+        prompt_tokens = sum(len(m.get("content", "")) for m in request.get("messages", [])) // 2
+        completion_tokens = len(content) // 2
+        with self._lock:
+            self.completions += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        return {
+            "id": f"chatcmpl-fake{self.completions}", "object": "chat.completion", "created": int(time.time()),
+            "model": request.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def embedding(self, body: bytes) -> dict:
+        request = json.loads(body or b"{}")
+        inputs = request.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dims = int(request.get("dimensions") or 256)
+        data = []
+        for i, text in enumerate(inputs):
+            vector = _text_vector(text, dims)
+            if request.get("encoding_format") == "base64":
+                vector = base64.b64encode(struct.pack(f"<{dims}f", *vector)).decode()
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+        tokens = sum(len(text) for text in inputs) // 2
+        with self._lock:
+            self.embedded_texts += len(inputs)
+            self.prompt_tokens += tokens
+        return {"object": "list", "data": data, "model": request.get("model", "text-embedding-3-small"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}}
+
+    def route(self, method, path, params, body):
+        endpoint = path[len(self.path_prefix):] if path.startswith(self.path_prefix) else path
+        if method == "GET" and endpoint == "/models":
+            return 200, {"object": "list", "data": [{"id": "whisper-1", "object": "model"},
+                                                    {"id": "gpt-4o-mini", "object": "model"},
+                                                    {"id": "text-embedding-3-small", "object": "model"}]}, {}
+        fault = self._roll()
+        if fault == "error":
+            return 500, {"error": {"message": "The server had an error", "type": "server_error"}}, {}
+        if fault == "rate_limit":
+            return 429, {"error": {"message": "Rate limit reached", "type": "requests",
+                                   "code": "rate_limit_exceeded"}}, {"retry-after-ms": "50"}
+        if method == "POST" and endpoint == "/audio/transcriptions":
+            return 200, self.transcription(body), {}
+        if method == "POST" and endpoint == "/chat/completions":
+            return 200, self.chat_completion(body), {}
+        if method == "POST" and endpoint == "/embeddings":
+            return 200, self.embedding(body), {}
+        return 404, {"error": {"message": f"Unknown endpoint {endpoint}", "type": "invalid_request_error"}}, {}
@@ -0,0 +1,254 @@
+"""Parquet 로컬 데이터 레이크 (오프라인 분석용 스냅샷).
+
+videos, comments, 대본(transcripts), llm_scores 를 월별 파티션 Parquet(zstd)로 내보내고,
+분석/스코어링 코드는 DB 대신 로컬 파일을 메모리 맵으로 읽습니다.
+
+    data/lake/<table>/month=2025-05/part-<실행시각>-<배치>-0.parquet
+    data/lake/_state.json          테이블별 (created_at 또는 updated_at, id) 워터마크
+
+- 증분: 워터마크 이후 행만 (시각, id) 순으로 batch_rows 씩 키셋 페이지로 가져와 추가
+- transcripts 는 videos.updated_at(대본 저장 시각, 없으면 created_at) 기준이라 나중에 채우거나
+  다시 받은 대본도 내보내며, 같은 video_id 의 이전 대본은 scoring_frame 이 최신 것으로 정리
+- 쿼리는 공통 SQL 이라 db.get_storage() 의 모든 백엔드(PostgreSQL/SQLite/DuckDB)에서 동작
+- 배치 파일은 스테이징 디렉토리에 쓴 뒤 옮기고 워터마크를 저장하므로 중단돼도 깨진 파일이 남지 않음
+- 기존 행의 수정(예: duration_seconds 보정)은 반영되지 않으니 필요하면 --full 로 다시 만듭니다.
+"""
+import json
+import os
+import shutil
+from datetime import date, datetime, timezone
+
+from jtbc import config
+
+ZSTD_LEVEL = int(os.getenv("JTBC_LAKE_ZSTD_LEVEL", "3"))
+BATCH_ROWS = int(os.getenv("JTBC_LAKE_BATCH_ROWS", "50000"))
+STATE_FILE = "_state.json"
+EPOCH = "1970-01-01 00:00:00"
+
+_CREATED = f"COALESCE(created_at, '{EPOCH}')"
+
+# 테이블별 (원본 테이블, SELECT 컬럼, 추가 조건, 워터마크 식, 워터마크 컬럼 이름, 월 파티션 컬럼)
+_SOURCES = {
+    "videos": ("videos", "id, video_id, title, published_at, url, duration_seconds", None,
+               _CREATED, "created_at", "published_at"),
+    "comments": ("comments", "id, comment_id, video_id, author, text, published_at, like_count", None,
+                 _CREATED, "created_at", "published_at"),
+    "llm_scores": ("llm_scores", "id, dt, text, sentiment, fairness, notes, profile_id, text_hash, score_flags", None,
+                   _CREATED, "created_at", "dt"),
+    "transcripts": ("videos", "id, video_id, published_at, transcript", "transcript IS NOT NULL",
+                    f"COALESCE(updated_at, created_at, '{EPOCH}')", "updated_at", "published_at"),
+}
+TABLES = tuple(_SOURCES)
+
+
+def _schema(name: str):
+    import pyarrow as pa
+
+    ts = pa.timestamp("us")
+    fields = {
+        "videos": [("id", pa.int64()), ("video_id", pa.string()), ("title", pa.string()), ("published_at", ts),
+                   ("url", pa.string()), ("duration_seconds", pa.int32()), ("created_at", ts)],
+        "comments": [("id", pa.int64()), ("comment_id", pa.string()), ("video_id", pa.string()),
+                     ("author", pa.string()), ("text", pa.string()), ("published_at", ts),
+                     ("like_count", pa.int32()), ("created_at", ts)],
+        "llm_scores": [("id", pa.int64()), ("dt", pa.date32()), ("text", pa.string()), ("sentiment", pa.float64()),
+                       ("fairness", pa.float64()), ("notes", pa.string()), ("profile_id", pa.string()),
+                       ("text_hash", pa.string()), ("score_flags", pa.int16()), ("created_at", ts)],
+        "transcripts": [("video_id", pa.string()), ("published_at", ts), ("transcript", pa.string()),
+                        ("updated_at", ts)],
+    }[name]
+    return pa.schema(fields + [("month", pa.string())])
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise RuntimeError("pyarrow 패키지가 필요합니다. 설치: pip install pyarrow")
+
+
+def table_dir(name: str):
+    return config.LAKE_DIR / name
+
+
+def _load_state() -> dict:
+    try:
+        with open(config.LAKE_DIR / STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state: dict):
+    path = config.LAKE_DIR / STATE_FILE
+    tmp = str(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _to_arrow(rows: list, schema):
+    import pyarrow as pa
+
+    columns = list(zip(*rows))
+    return pa.Table.from_arrays([pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema)
+
+
+def _write_partitioned(name: str, table, tag: str) -> int:
+    """month 파티션별로 zstd Parquet 파일을 씁니다. 스테이징에 쓴 뒤 제자리로 옮깁니다."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    staging = config.LAKE_DIR / ".staging" / f"{name}-{tag}"
+    shutil.rmtree(staging, ignore_errors=True)
+    ds.write_dataset(
+        table, staging, format="parquet",
+        partitioning=ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive"),
+        basename_template=f"part-{tag}-{{i}}.parquet",
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd", compression_level=ZSTD_LEVEL),
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    files = 0
+    for partition in staging.iterdir():
+        target = table_dir(name) / partition.name
+        target.mkdir(parents=True, exist_ok=True)
+        for part in partition.iterdir():
+            os.replace(part, target / part.name)
+            files += 1
+    shutil.rmtree(staging, ignore_errors=True)
+    return files
+
+
+def _coerce(value, type_):
+    """백엔드마다 다른 시각/날짜 표현(SQLite 는 계산식 결과가 문자열)을 파이썬 값으로 맞춥니다."""
+    import pyarrow as pa
+
+    if not isinstance(value, str):
+        return value
+    if pa.types.is_timestamp(type_):
+        return datetime.fromisoformat(value)
+    if pa.types.is_date(type_):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _to_row(row: dict, schema, month_col: str) -> tuple:
+    values = {field.name: _coerce(row.get(field.name), field.type) for field in schema if field.name != "month"}
+    month = values[month_col].strftime("%Y-%m") if values[month_col] else "unknown"
+    return tuple(values.values()) + (month,)
+
+
+def _page_query(name: str) -> str:
+    table, columns, where, mark, mark_col, _ = _SOURCES[name]
+    condition = f"{where} AND " if where else ""
+    return f"""
+        SELECT {columns}, {mark} AS {mark_col}
+        FROM {table}
+        WHERE {condition}({mark} > %s OR ({mark} = %s AND id > %s))
+        ORDER BY {mark}, id
+        LIMIT %s
+    """
+
+
+def export(tables=TABLES, full: bool = False, batch_rows: int = BATCH_ROWS) -> dict:
+    """DB 테이블을 레이크로 내보냅니다. 테이블별 새로 추가한 행 수를 반환합니다."""
+    _require_pyarrow()
+    from jtbc import db
+
+    storage = db.get_storage()
+    config.LAKE_DIR.mkdir(parents=True, exist_ok=True)
+    state = _load_state()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    counts = {}
+
+    with storage.connection() as conn:
+        storage.ensure_schema(conn)
+        for name in tables:
+            if full:
+                shutil.rmtree(table_dir(name), ignore_errors=True)
+                state.pop(name, None)
+            schema = _schema(name)
+            mark_col, month_col = _SOURCES[name][4:]
+            query = _page_query(name)
+            mark = state.get(name, {})
+            last_mark, last_id = mark.get(mark_col, EPOCH), mark.get("id", 0)
+
+            counts[name] = 0
+            batch_no = 0
+            # 키셋 페이지: (시각, id) 가 워터마크보다 큰 행을 batch_rows 씩 (전체를 메모리에 올리지 않음)
+            while True:
+                with storage.cursor(conn) as cur:
+                    storage.execute(cur, query, (last_mark, last_mark, last_id, batch_rows))
+                    rows = storage.fetch_dicts(cur)
+                conn.commit()
+                if not rows:
+                    break
+                _write_partitioned(name, _to_arrow([_to_row(row, schema, month_col) for row in rows], schema),
+                                   f"{stamp}-{batch_no:04d}")
+                batch_no += 1
+                counts[name] += len(rows)
+                last = rows[-1]
+                last_mark, last_id = _coerce(last[mark_col], schema.field(mark_col).type).isoformat(sep=" "), last["id"]
+                state[name] = {mark_col: last_mark, "id": last_id}
+                _save_state(state)
+                if len(rows) < batch_rows:
+                    break
+            print(f"  - {name}: {counts[name]}행 추가")
+    return counts
+
+
+def read_table(name: str, columns: list = None, months: list = None, filters=None):
+    """레이크 테이블을 pyarrow.Table 로 읽습니다. (파일은 메모리 맵으로 열림)
+
+    months=["2025-05", ...] 로 월 파티션만 골라 읽을 수 있습니다.
+    컬럼이 추가되기 전에 쓴 파일은 현재 스키마로 맞춰 읽으며, 없는 컬럼은 null 입니다.
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    if months:
+        month_filter = [("month", "in", list(months))]
+        filters = month_filter + list(filters or [])
+    return pq.read_table(table_dir(name), columns=columns, filters=filters, memory_map=True,
+                         partitioning="hive", schema=_schema(name))
+
+
+def read_pandas(name: str, **kwargs):
+    """read_table 결과를 pandas DataFrame 으로 반환합니다."""
+    return read_table(name, **kwargs).to_pandas()
+
+
+def scoring_frame():
+    """llm-ev.py fetch_data 와 같은 (text, dt) DataFrame 을 레이크에서 만듭니다. (대본은 영상별 최신 것만)"""
+    import pandas as pd
+
+    frames = []
+    if table_dir("comments").exists():
+        frames.append(read_pandas("comments", columns=["text", "published_at"]))
+    if table_dir("transcripts").exists():
+        df = read_pandas("transcripts", columns=["video_id", "transcript", "published_at", "updated_at"])
+        # 대본을 다시 받으면 같은 video_id 가 여러 번 내보내지므로 가장 최근 대본만 남김
+        df = df.sort_values("updated_at", na_position="first", kind="stable").drop_duplicates("video_id", keep="last")
+        frames.append(df[["transcript", "published_at"]].rename(columns={"transcript": "text"}))
+    for df in frames:
+        df["dt"] = df.pop("published_at").dt.date
+    if not frames:
+        return pd.DataFrame(columns=["text", "dt"])
+    return pd.concat(frames, ignore_index=True).dropna()
+
+
+def summary() -> list:
+    """테이블별 (이름, 파티션 수, 파일 수, 행 수, 바이트) 목록. 파일 메타데이터만 읽습니다."""
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    rows = []
+    for name in TABLES:
+        root = table_dir(name)
+        if not root.exists():
+            continue
+        files = sorted(root.glob("month=*/*.parquet"))
+        partitions = {f.parent.name for f in files}
+        num_rows = sum(pq.ParquetFile(f).metadata.num_rows for f in files)
+        rows.append((name, len(partitions), len(files), num_rows, sum(f.stat().st_size for f in files)))
+    return rows
@@ -0,0 +1,303 @@
+"""새 업로드 실시간 수집: 재생목록 폴링 + 최근 영상 댓글 재폴링 + 소량 배치 스코어링.
+
+    python -m jtbc live --playlist PL3Eb1N33oAXhNHGe-ljKHJ5c0gjiZkqDk --hours 48
+
+data_scrape.py 의 기간 일괄 수집과 달리, 멈출 때까지 돌면서 새로 올라온 영상과 댓글만 가져옵니다.
+
+- 재생목록은 첫 페이지(최신 50개, 1 quota)만 PLAYLIST_INTERVAL 초마다 조회해 새 영상을 videos 에 저장
+- 추적 중인 영상은 commentThreads(order=time) 를 최신부터 읽다가 이미 본 댓글 ID 가 나오면 멈춤.
+  새 댓글이 없으면 요청 1회(1 quota)로 끝나고, 한 번에 MAX_PAGES 페이지까지만 읽음
+- 다음 폴링 간격은 영상 나이에 따라 늘어남: 게시 직후 MIN_INTERVAL, HALF_LIFE_HOURS 마다 두 배, 최대 MAX_INTERVAL.
+  새 댓글이 없으면 한 단계씩 더 늘리고, 새 댓글이 오면 나이 기준 간격으로 되돌림
+- 최근 1시간 요청 수가 QUOTA_PER_DAY / 24 를 넘으면 그 비율만큼 모든 간격을 늘림
+- 새 댓글은 바로 comments 에 저장하고, MICRO_BATCH 행이 모이거나 가장 오래된 댓글이 MAX_WAIT 초를 기다리면
+  스코어링해 llm_scores 에 저장 (profile_id/text_hash 포함이라 llm-ev.py 가 같은 행을 다시 스코어링하지 않음)
+
+상태 파일은 없습니다. 재시작하면 DB 의 최근 영상과 댓글 ID 로 추적 목록을 다시 만들고,
+저장은 됐지만 아직 점수가 없는 최근 댓글부터 스코어링합니다.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from jtbc import db, discovery, metrics, profiles, shutdown, usage
+from jtbc.ytapi import AsyncYouTubeClient, YouTubeAPIError, parse_comment_threads
+
+PLAYLIST_INTERVAL = float(os.getenv("JTBC_LIVE_PLAYLIST_INTERVAL", "300"))
+MIN_INTERVAL = float(os.getenv("JTBC_LIVE_MIN_INTERVAL", "120"))
+MAX_INTERVAL = float(os.getenv("JTBC_LIVE_MAX_INTERVAL", "7200"))
+HALF_LIFE_HOURS = float(os.getenv("JTBC_LIVE_HALF_LIFE_HOURS", "6"))
+MAX_PAGES = int(os.getenv("JTBC_LIVE_MAX_PAGES", "3"))
+# YouTube Data API 하루 한도 중 이 모드가 쓸 몫 (list 호출 1회 = 1 quota)
+QUOTA_PER_DAY = int(os.getenv("JTBC_LIVE_QUOTA", "5000"))
+MICRO_BATCH = int(os.getenv("JTBC_LIVE_MICRO_BATCH", "50"))
+MAX_WAIT = float(os.getenv("JTBC_LIVE_MAX_WAIT", "60"))
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return discovery.parse_published(str(value).replace(" ", "T"))
+
+
+def poll_interval(age_hours: float, misses: int = 0) -> float:
+    """다음 댓글 폴링까지의 간격(초). 오래된 영상일수록, 빈 폴링이 이어질수록 길어집니다."""
+    steps = max(0.0, age_hours) / HALF_LIFE_HOURS + min(misses, 10)
+    return min(MAX_INTERVAL, MIN_INTERVAL * 2 ** steps)
+
+
+class TrackedVideo:
+    """댓글을 다시 폴링할 영상 하나. seen 은 이미 저장한 댓글 ID."""
+    __slots__ = ("video_id", "title", "published_at", "seen", "next_poll", "misses")
+
+    def __init__(self, video_id: str, title: str, published_at: datetime, seen=()):
+        self.video_id = video_id
+        self.title = title
+        self.published_at = published_at
+        self.seen = set(seen)
+        self.next_poll = 0.0
+        self.misses = 0
+
+    def age_hours(self, now: datetime) -> float:
+        return (now - self.published_at).total_seconds() / 3600
+
+    def reschedule(self, now: datetime, found: int, pace: float = 1.0):
+        self.misses = 0 if found else self.misses + 1
+        self.next_poll = time.monotonic() + poll_interval(self.age_hours(now), self.misses) * pace
+
+
+class QuotaPacer:
+    """최근 1시간 요청 수로 폴링 간격 배율을 정합니다. (하루 몫을 24시간에 고르게)"""
+
+    def __init__(self, per_day: int = QUOTA_PER_DAY):
+        self.per_hour = max(1.0, per_day / 24)
+        self.calls = deque()
+        self.total = 0
+
+    def add(self, calls: int):
+        now = time.monotonic()
+        self.calls.extend([now] * calls)
+        self.total += calls
+
+    def pace(self) -> float:
+        cutoff = time.monotonic() - 3600
+        while self.calls and self.calls[0] < cutoff:
+            self.calls.popleft()
+        return max(1.0, len(self.calls) / self.per_hour)
+
+
+class ScoreBuffer:
+    """새 댓글을 모았다가 MICRO_BATCH 행 또는 MAX_WAIT 초마다 스코어링합니다. 영상별 누적 평균도 보관."""
+
+    def __init__(self, storage, profile, batch_rows: int = MICRO_BATCH, max_wait: float = MAX_WAIT):
+        self.storage = storage
+        self.profile = profile
+        self.batch_rows = batch_rows
+        self.max_wait = max_wait
+        self.rows = []
+        self.oldest = None
+        self.totals = {}  # video_id -> [n, sentiment 합, fairness 합]
+
+    def add(self, video_id: str, comments: list):
+        if comments and self.oldest is None:
+            self.oldest = time.monotonic()
+        self.rows.extend((video_id, c.text, c.published_at) for c in comments if c.text)
+
+    def due(self) -> bool:
+        return bool(self.rows) and (len(self.rows) >= self.batch_rows
+                                    or time.monotonic() - self.oldest >= self.max_wait)
+
+    def flush(self) -> int:
+        """쌓인 댓글을 스코어링해 저장하고 저장한 행 수를 반환합니다."""
+        import pandas as pd
+
+        from jtbc.scoring import score_dataframe
+
+        if not self.rows:
+            return 0
+        rows, self.rows, self.oldest = self.rows, [], None
+        df = pd.DataFrame(rows, columns=["video_id", "text", "published_at"])
+        df["dt"] = pd.to_datetime(df.pop("published_at"), utc=True).dt.date
+        with metrics.span("live_score", rows=len(df)):
+            scored = score_dataframe(profiles.with_hashes(df), sink=self.storage.insert_scores, profile=self.profile)
+        usage.flush()
+        for video_id, group in scored.groupby("video_id"):
+            total = self.totals.setdefault(video_id, [0, 0.0, 0.0])
+            total[0] += int(group["sentiment"].notna().sum())
+            total[1] += float(group["sentiment"].sum())
+            total[2] += float(group["fairness"].sum())
+        if len(scored) < len(df):
+            # 예산 상한/종료 요청으로 남은 행은 댓글만 저장된 상태 -> 다음 시작 때 스코어링
+            print(f"  - 스코어링 {len(scored)}/{len(df)}행에서 중단 (나머지는 재시작 시 처리)")
+        return len(scored)
+
+    def summary(self, video_id: str) -> str:
+        n, sentiment, fairness = self.totals.get(video_id, (0, 0.0, 0.0))
+        return f"감성 {sentiment / n:+.2f} 공정 {fairness / n:.2f} ({n}건)" if n else "점수 없음"
+
+
+def restore(storage, since: datetime) -> dict:
+    """DB 의 since 이후 영상과 그 댓글 ID 로 {video_id: TrackedVideo} 를 만듭니다."""
+    videos = storage.recent_videos(since)
+    seen = storage.comment_ids([v["video_id"] for v in videos]) if videos else {}
+    return {
+        v["video_id"]: TrackedVideo(v["video_id"], v["title"], _as_datetime(v["published_at"]), seen.get(v["video_id"], ()))
+        for v in videos
+    }
+
+
+def unscored(storage, video_ids: list, profile):
+    """추적 중인 영상의 저장된 댓글 중 profile 로 점수가 없는 행 (video_id, text, dt, text_hash)."""
+    import pandas as pd
+
+    comments = storage.video_comments(video_ids) if video_ids else []
+    if not comments:
+        return None
+    df = pd.DataFrame(comments, columns=["video_id", "comment_id", "text", "published_at"]).dropna(subset=["text"])
+    df["dt"] = pd.to_datetime(df.pop("published_at"), utc=True).dt.date
+    df = profiles.with_hashes(df)
+    scored = storage.scores_for(profile.profile_id, df["text_hash"].unique().tolist())
+    return df[~df["text_hash"].isin(list(scored))]
+
+
+async def poll_playlist(yt, storage, playlist_id: str, since: datetime, tracked: dict) -> list:
+    """재생목록 첫 페이지에서 추적하지 않던 since 이후 영상을 저장하고 추적 목록에 추가합니다."""
+    response = await yt.playlist_items(playlist_id)
+    fresh = []
+    for item in response.get("items", ()):
+        row = discovery.playlist_item_row(item)
+        if row is not None and row["published_at"] >= since and row["video_id"] not in tracked:
+            fresh.append(row)
+    if fresh:
+        details = await yt.videos([v["video_id"] for v in fresh])
+        for item in details.get("items", ()):
+            row = next(v for v in fresh if v["video_id"] == item["id"])
+            row["duration_seconds"] = discovery.parse_duration(item["contentDetails"].get("duration"))
+        storage.upsert_videos(fresh)
+        for row in fresh:
+            tracked[row["video_id"]] = TrackedVideo(row["video_id"], row["title"], row["published_at"])
+    return fresh
+
+
+async def poll_comments(yt, video: TrackedVideo, max_pages: int = MAX_PAGES) -> list:
+    """최신순 댓글을 이미 본 ID 가 나올 때까지 읽어 새 [Comment] 를 반환합니다."""
+    fresh = []
+    page_token = None
+    for _ in range(max_pages):
+        response = await yt.comment_threads(video.video_id, page_token, order="time")
+        page = parse_comment_threads(response)
+        known = False
+        for comment in page:
+            if comment.comment_id in video.seen:
+                known = True
+                continue
+            fresh.append(comment)
+        page_token = response.get("nextPageToken")
+        if known or not page_token:
+            break
+    video.seen.update(c.comment_id for c in fresh)
+    return fresh
+
+
+async def _sleep(seconds: float):
+    """seconds 동안 자되 종료 요청이 오면 1초 안에 깨어납니다."""
+    deadline = time.monotonic() + seconds
+    while not shutdown.requested() and time.monotonic() < deadline:
+        await asyncio.sleep(min(1.0, deadline - time.monotonic()))
+
+
+async def run_async(playlist_id: str, hours: float = 48, profile=None, score: bool = True,
+                    concurrency: int = 8, base_url: str = None, api_key: str = None, once: bool = False):
+    storage = db.get_storage()
+    profile = profile or profiles.get()
+    if score:
+        profiles.register(profile, storage)
+    buffer = ScoreBuffer(storage, profile)
+    pacer = QuotaPacer()
+
+    tracked = restore(storage, _utcnow() - timedelta(hours=hours))
+    print(f"추적 시작: 최근 {hours:g}시간 영상 {len(tracked)}개, "
+          f"저장된 댓글 {sum(len(v.seen) for v in tracked.values()):,}개")
+    if score:
+        backlog = unscored(storage, list(tracked), profile)
+        if backlog is not None and not backlog.empty:
+            print(f"  - 점수가 없는 저장된 댓글 {len(backlog):,}개부터 스코어링")
+            buffer.rows.extend(zip(backlog["video_id"], backlog["text"], backlog["dt"].astype(str)))
+            buffer.oldest = time.monotonic() - buffer.max_wait
+
+    next_playlist = 0.0
+    async with AsyncYouTubeClient(api_key, base_url, concurrency) as yt:
+        while not shutdown.requested():
+            now = _utcnow()
+            since = now - timedelta(hours=hours)
+            pace = pacer.pace()
+            before = yt.requests
+
+            if time.monotonic() >= next_playlist:
+                try:
+                    with metrics.span("live_poll_playlist"):
+                        for row in await poll_playlist(yt, storage, playlist_id, since, tracked):
+                            print(f"🆕 {row['video_id']} {row['published_at']} {row['title'][:50]}")
+                except YouTubeAPIError as e:
+                    print(f"재생목록 조회 실패: {e}")
+                next_playlist = time.monotonic() + PLAYLIST_INTERVAL * pace
+
+            for video_id in [v for v, video in tracked.items() if video.published_at < since]:
+                del tracked[video_id]
+            due = [video for video in tracked.values() if video.next_poll <= time.monotonic()]
+
+            async def one(video):
+                try:
+                    return video, await poll_comments(yt, video)
+                except YouTubeAPIError as e:
+                    print(f"댓글 조회 실패 {video.video_id}: {e}")
+                    return video, []
+
+            found = {}
+            if due:
+                with metrics.span("live_poll_comments", videos=len(due)):
+                    for video, comments in await asyncio.gather(*(one(v) for v in due)):
+                        video.reschedule(now, len(comments), pace)
+                        if comments:
+                            found[video.video_id] = comments
+            if found:
+                storage.insert_comments(found)
+                for video_id, comments in found.items():
+                    metrics.inc("jtbc_live_comments_total", len(comments))
+                    if score:
+                        buffer.add(video_id, comments)
+            pacer.add(yt.requests - before)
+            metrics.inc("jtbc_live_youtube_requests_total", yt.requests - before)
+
+            if score and (buffer.due() or once):
+                # chat 호출과 DB 저장은 동기 코드라 스레드에서 돌려 이벤트 루프를 막지 않음
+                await asyncio.to_thread(buffer.flush)
+            for video_id, comments in found.items():
+                video = tracked[video_id]
+                print(f"💬 {video_id} +{len(comments)} | {buffer.summary(video_id)} | 다음"
+                      f" {poll_interval(video.age_hours(now), video.misses) * pace / 60:.0f}분 | {video.title[:40]}")
+            if once:
+                break
+
+            waits = [video.next_poll for video in tracked.values()] + [next_playlist]
+            if score and buffer.rows:
+                waits.append(buffer.oldest + buffer.max_wait)
+            await _sleep(max(1.0, min(waits) - time.monotonic()))
+
+    if buffer.rows:
+        print(f"  - 스코어링하지 못한 댓글 {len(buffer.rows)}개는 저장돼 있어 다음 시작 때 처리합니다")
+    print(f"YouTube 요청 {pacer.total}회 (= quota) | 추적 영상 {len(tracked)}개")
+
+
+def run(playlist_id: str, **kwargs):
+    """run_async 의 동기 래퍼. Ctrl-C/SIGTERM 이면 진행 중인 폴링/배치를 마치고 끝냅니다."""
+    with shutdown.graceful(on_force=(usage.flush, metrics.flush)):
+        asyncio.run(run_async(playlist_id, **kwargs))
+    usage.flush()
+    metrics.flush()
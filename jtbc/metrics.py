@@ -0,0 +1,254 @@
+"""파이프라인 단계별 메트릭(카운터, 히스토그램)과 트레이싱 스팬 (표준 라이브러리만 사용).
+
+    with metrics.span("download_audio", video_id=video_id):
+        ...
+    @metrics.traced("analyze_batch")
+    def analyze_batch(texts): ...
+    metrics.inc("jtbc_whisper_upload_bytes_total", size)
+
+스팬이 끝나면 jtbc_stage_seconds{stage=...} 히스토그램에 소요 시간이, jtbc_stage_cpu_seconds_total 에
+그 스레드의 CPU 시간이 (벽시계와 비교하면 I/O 대기 비중이 보임), 예외로 끝나면
+jtbc_stage_errors_total{stage=...,error=...} 에 1 이 더해집니다.
+
+내보내기 (setup() 이 환경변수를 읽어 켭니다):
+    JTBC_METRICS_PORT=9464        Prometheus 텍스트 엔드포인트 http://0.0.0.0:9464/metrics
+    JTBC_METRICS_FILE=path.prom   종료 시(그리고 flush() 마다) 텍스트 파일로 저장 (node_exporter textfile 용)
+    JTBC_TRACE_LOG=trace.jsonl    스팬마다 JSON 한 줄 기록 ("-" 면 stderr)
+"""
+import atexit
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+METRICS_PORT = int(os.getenv("JTBC_METRICS_PORT", "0"))
+METRICS_FILE = os.getenv("JTBC_METRICS_FILE")
+TRACE_LOG = os.getenv("JTBC_TRACE_LOG")
+
+# 초 단위. yt-dlp/Whisper 처럼 분 단위로 걸리는 단계까지 담도록 넓게 잡음
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> float
+_histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+_help = {}
+_current_span = contextvars.ContextVar("jtbc_span", default=None)
+_trace_file = None
+_server = None
+_setup_done = False
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def describe(name: str, text: str):
+    """# HELP 줄에 쓸 설명을 등록합니다."""
+    _help[name] = text
+
+
+def inc(name: str, value: float = 1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels):
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(DEFAULT_BUCKETS) + 2)
+        for i, bound in enumerate(DEFAULT_BUCKETS):
+            if value <= bound:
+                hist[i] += 1
+        hist[-2] += value
+        hist[-1] += 1
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+# ---- 트레이싱 ----
+
+def _log_span(record: dict):
+    global _trace_file
+    if not TRACE_LOG:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _lock:
+        if TRACE_LOG == "-":
+            print(line, file=sys.stderr)
+            return
+        if _trace_file is None:
+            _trace_file = open(TRACE_LOG, "a", encoding="utf-8", buffering=1)
+        _trace_file.write(line + "\n")
+
+
+@contextmanager
+def span(stage: str, **attrs):
+    """단계 하나의 소요 시간/성공 여부를 기록합니다. 중첩되면 같은 trace_id 와 parent_id 로 이어집니다."""
+    parent = _current_span.get()
+    trace_id = parent[0] if parent else uuid.uuid4().hex
+    span_id = uuid.uuid4().hex[:16]
+    token = _current_span.set((trace_id, span_id))
+    started_at = time.time()
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        cpu = time.thread_time() - cpu_started
+        _current_span.reset(token)
+        observe("jtbc_stage_seconds", elapsed, stage=stage)
+        inc("jtbc_stage_cpu_seconds_total", cpu, stage=stage)
+        if error:
+            inc("jtbc_stage_errors_total", stage=stage, error=error)
+        _log_span({
+            "ts": started_at, "event": "span", "stage": stage, "trace_id": trace_id, "span_id": span_id,
+            "parent_id": parent[1] if parent else None, "duration_ms": round(elapsed * 1000, 2),
+            "cpu_ms": round(cpu * 1000, 2),
+            "status": "error" if error else "ok", "error": error, **attrs,
+        })
+
+
+def traced(stage: str):
+    """함수 호출 전체를 span(stage) 로 감싸는 데코레이터."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---- 내보내기 ----
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render() -> str:
+    """Prometheus 텍스트 형식(0.0.4)."""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(hist)) for key, hist in _histograms.items())
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name not in seen:
+            seen.add(name)
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in counters:
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {int(value) if value == int(value) else value}")
+    for (name, labels), hist in histograms:
+        header(name, "histogram")
+        for bound, count in zip(DEFAULT_BUCKETS, hist):
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {count}")
+        lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {hist[-1]}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {hist[-2]:.6f}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def summary() -> list:
+    """단계별 (stage, 호출 수, 합계 초, 평균 초, 오류 수, CPU 초). 합계 시간 내림차순."""
+    with _lock:
+        histograms = {dict(labels).get("stage"): hist for (name, labels), hist in _histograms.items()
+                      if name == "jtbc_stage_seconds"}
+        errors, cpu = {}, {}
+        for (name, labels), value in _counters.items():
+            stage = dict(labels).get("stage")
+            if name == "jtbc_stage_errors_total":
+                errors[stage] = errors.get(stage, 0) + value
+            elif name == "jtbc_stage_cpu_seconds_total":
+                cpu[stage] = cpu.get(stage, 0) + value
+    rows = [(stage, hist[-1], hist[-2], hist[-2] / hist[-1] if hist[-1] else 0.0, int(errors.get(stage, 0)),
+             cpu.get(stage, 0.0))
+            for stage, hist in histograms.items()]
+    return sorted(rows, key=lambda row: -row[2])
+
+
+def flush(path: str = None):
+    """텍스트 파일로 저장합니다. (임시 파일에 쓴 뒤 교체해 수집기가 반쯤 쓴 파일을 읽지 않게 함)"""
+    path = path or METRICS_FILE
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp, path)
+
+
+def serve(port: int, host: str = "0.0.0.0"):
+    """/metrics 를 제공하는 HTTP 서버를 백그라운드 스레드로 띄웁니다."""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            payload = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    _server = ThreadingHTTPServer((host, port), Handler)
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def setup():
+    """환경변수에 따라 엔드포인트/파일 내보내기를 켭니다. 여러 번 불러도 한 번만 적용됩니다."""
+    global _setup_done
+    if _setup_done:
+        return
+    _setup_done = True
+    if METRICS_PORT:
+        serve(METRICS_PORT)
+        print(f"📈 메트릭: http://localhost:{METRICS_PORT}/metrics")
+    if METRICS_FILE:
+        atexit.register(flush)
+
+
+describe("jtbc_stage_seconds", "Wall time per pipeline stage call")
+describe("jtbc_stage_cpu_seconds_total", "CPU time of the calling thread per pipeline stage")
+describe("jtbc_stage_errors_total", "Pipeline stage calls that raised, by exception type")
+describe("jtbc_whisper_upload_bytes_total", "Audio bytes sent to the Whisper API")
+describe("jtbc_texts_scored_total", "Texts sent to the LLM for scoring")
+describe("jtbc_scores_inserted_total", "Rows written to llm_scores")
+describe("jtbc_videos_processed_total", "Videos finished by the transcription engine, by result")
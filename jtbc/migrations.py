@@ -0,0 +1,341 @@
+"""버전 관리되는 스키마 마이그레이션.
+
+schema_migrations 테이블에 적용한 버전을 기록하고, 아직 적용되지 않은 마이그레이션만 순서대로 실행합니다.
+각 마이그레이션은 IF NOT EXISTS 등으로 멱등하게 작성해 중간에 실패해도 다시 실행할 수 있습니다.
+저장소의 ensure_schema(첫 DB 접근 시)와 python -m jtbc migrate 가 migrate() 를 호출합니다.
+
+월별 파티셔닝(PostgreSQL 전용)은 테이블을 다시 만드는 작업이라 자동으로 하지 않고
+python -m jtbc migrate --partition comments llm_scores 로 명시적으로 실행합니다.
+"""
+import threading
+from datetime import date
+
+_lock = threading.Lock()
+# 여러 프로세스가 동시에 마이그레이션하지 않도록 잡는 Postgres advisory lock 키
+ADVISORY_LOCK_KEY = 727039
+
+
+def _baseline(storage, cur):
+    """v1: 파이프라인 테이블 (videos, comments, transcript_segments, llm_scores)과 구간 검색 2-gram 색인."""
+    for statement in storage.schema_statements():
+        cur.execute(statement)
+
+
+def _query_indexes(storage, cur):
+    """v2: 대기열/기간/시계열 조회용 인덱스."""
+    statements = []
+    if storage.secondary_indexes:
+        statements += [
+            # 댓글 집계(LEFT JOIN comments)와 영상별 댓글 조회
+            "CREATE INDEX IF NOT EXISTS comments_video_id_idx ON comments (video_id)",
+            "CREATE INDEX IF NOT EXISTS comments_published_at_idx ON comments (published_at)",
+            # --since/--until 기간 조회
+            "CREATE INDEX IF NOT EXISTS videos_published_at_idx ON videos (published_at)",
+            # 일별 시계열 집계
+            "CREATE INDEX IF NOT EXISTS llm_scores_dt_idx ON llm_scores (dt)",
+            # Parquet 증분 내보내기의 (created_at, id) 워터마크
+            "CREATE INDEX IF NOT EXISTS videos_created_idx ON videos (created_at, id)",
+            "CREATE INDEX IF NOT EXISTS comments_created_idx ON comments (created_at, id)",
+            "CREATE INDEX IF NOT EXISTS llm_scores_created_idx ON llm_scores (created_at, id)",
+        ]
+    if storage.partial_indexes:
+        # 대본 없는 영상만 담는 부분 인덱스: 대부분 완료된 뒤에도 대기열 조회가 작게 유지됨
+        statements.append("CREATE INDEX IF NOT EXISTS videos_pending_idx ON videos (id) WHERE transcript IS NULL")
+    for statement in statements:
+        cur.execute(statement)
+
+
+def _comment_key(storage, cur):
+    """v3: YouTube 댓글 ID 컬럼과 upsert 용 고유 키.
+
+    고유 키에 published_at 을 포함하는 것은 Postgres 파티션 테이블의 고유 인덱스가
+    파티션 키를 포함해야 하기 때문입니다. (댓글의 게시 시각은 바뀌지 않으므로 의미는 같음)
+    """
+    storage.add_column(cur, "comments", "comment_id", "VARCHAR(64)")
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS comments_comment_key ON comments (comment_id, published_at)")
+
+
+USAGE_DDL = """
+    CREATE TABLE IF NOT EXISTS api_usage (
+        {id},
+        run_id VARCHAR(32) NOT NULL,
+        kind VARCHAR(20) NOT NULL,
+        model VARCHAR(50),
+        video_id VARCHAR(50),
+        items INTEGER,
+        prompt_tokens INTEGER,
+        completion_tokens INTEGER,
+        audio_seconds DOUBLE PRECISION,
+        latency_ms DOUBLE PRECISION,
+        retries INTEGER,
+        outcome VARCHAR(50),
+        cost_usd DOUBLE PRECISION,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def _usage_ledger(storage, cur):
+    """v4: Whisper/chat 호출 사용량 원장 (jtbc.usage)."""
+    storage.create_table(cur, "api_usage", USAGE_DDL)
+    if storage.secondary_indexes:
+        cur.execute("CREATE INDEX IF NOT EXISTS api_usage_created_idx ON api_usage (created_at)")
+        cur.execute("CREATE INDEX IF NOT EXISTS api_usage_video_idx ON api_usage (video_id)")
+
+
+SHARD_DDL = """
+    CREATE TABLE IF NOT EXISTS scoring_shards (
+        job_id VARCHAR(100) NOT NULL,
+        shard INTEGER NOT NULL,
+        shards INTEGER NOT NULL,
+        shard_by VARCHAR(10) NOT NULL,
+        status VARCHAR(10) NOT NULL DEFAULT 'pending',
+        owner VARCHAR(100),
+        lease_until TIMESTAMP,
+        last_key VARCHAR(40),
+        rows_total INTEGER,
+        rows_done INTEGER NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP,
+        updated_at TIMESTAMP,
+        PRIMARY KEY (job_id, shard)
+    )
+"""
+
+ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS scoring_rollups (
+        job_id VARCHAR(100) NOT NULL,
+        shard INTEGER NOT NULL,
+        dt DATE NOT NULL,
+        n INTEGER NOT NULL,
+        sentiment_sum DOUBLE PRECISION NOT NULL,
+        fairness_sum DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY (job_id, shard, dt)
+    )
+"""
+
+
+def _scoring_shards(storage, cur):
+    """v5: 샤드 스코어링 임대(lease) 행과 샤드별 일 단위 합계 (jtbc.sharding)."""
+    storage.create_table(cur, "scoring_shards", SHARD_DDL)
+    storage.create_table(cur, "scoring_rollups", ROLLUP_DDL)
+
+
+PROFILE_DDL = """
+    CREATE TABLE IF NOT EXISTS scoring_profiles (
+        {id},
+        profile_id VARCHAR(16) UNIQUE NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        model VARCHAR(50) NOT NULL,
+        temperature DOUBLE PRECISION NOT NULL,
+        system_prompt TEXT NOT NULL,
+        schema_version INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def _score_profiles(storage, cur):
+    """v6: 스코어링 프로필 원문과 llm_scores 의 profile_id/text_hash (jtbc.profiles).
+
+    기존 행은 profile_id 가 비어 있으며 python -m jtbc profiles --adopt-legacy v1 로 채웁니다.
+    채우기 전에는 llm-ev.py 가 실행을 거부합니다 (profiles.require_adopted).
+    """
+    storage.create_table(cur, "scoring_profiles", PROFILE_DDL)
+    storage.add_column(cur, "llm_scores", "profile_id", "VARCHAR(16)")
+    storage.add_column(cur, "llm_scores", "text_hash", "VARCHAR(20)")
+    if storage.secondary_indexes:
+        # 재스코어링 계획: 프로필별 점수가 있는 text_hash 조회, A/B 비교 조인
+        cur.execute("CREATE INDEX IF NOT EXISTS llm_scores_profile_hash_idx ON llm_scores (profile_id, text_hash)")
+        cur.execute("CREATE INDEX IF NOT EXISTS llm_scores_text_hash_idx ON llm_scores (text_hash)")
+
+
+def _score_flags(storage, cur):
+    """v7: llm_scores.score_flags (jtbc.scoring 의 검증 비트: 누락/무효/clip/개수 불일치). 기존 행은 NULL."""
+    storage.add_column(cur, "llm_scores", "score_flags", "SMALLINT")
+
+
+def _transcript_updated_at(storage, cur):
+    """v8: videos.updated_at (대본을 저장한 시각, jtbc.lake 의 transcripts 워터마크). 기존 행은 NULL."""
+    storage.add_column(cur, "videos", "updated_at", "TIMESTAMP")
+
+
+MIGRATIONS = [
+    (1, "baseline tables", _baseline),
+    (2, "query indexes", _query_indexes),
+    (3, "comments.comment_id unique key", _comment_key),
+    (4, "api_usage ledger", _usage_ledger),
+    (5, "scoring shard leases and rollups", _scoring_shards),
+    (6, "scoring profiles and llm_scores.profile_id/text_hash", _score_profiles),
+    (7, "llm_scores.score_flags", _score_flags),
+    (8, "videos.updated_at", _transcript_updated_at),
+]
+LATEST = MIGRATIONS[-1][0]
+
+
+def _create_version_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(storage, conn) -> set:
+    with storage.cursor(conn) as cur:
+        _create_version_table(cur)
+        cur.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def migrate(storage, conn, verbose: bool = True) -> list:
+    """적용되지 않은 마이그레이션을 실행하고, 이번에 적용한 버전 목록을 반환합니다."""
+    applied = []
+    with _lock:
+        if LATEST in applied_versions(storage, conn):
+            return applied
+        with storage.cursor(conn) as cur:
+            storage.lock_migrations(cur)
+            cur.execute("SELECT version FROM schema_migrations")
+            done = {row[0] for row in cur.fetchall()}
+            for version, name, apply in MIGRATIONS:
+                if version in done:
+                    continue
+                apply(storage, cur)
+                storage.execute(cur, "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                applied.append(version)
+                if verbose:
+                    print(f"🗄️ 스키마 마이그레이션 v{version} 적용: {name}")
+        conn.commit()
+    return applied
+
+
+def status(storage, conn) -> list:
+    """[(version, name, 적용 여부)]."""
+    done = applied_versions(storage, conn)
+    return [(version, name, version in done) for version, name, _ in MIGRATIONS]
+
+
+# ---- 월별 파티셔닝 (PostgreSQL) ----
+
+PARTITION_KEYS = {"comments": "published_at", "llm_scores": "dt"}
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(cur, table: str) -> bool:
+    cur.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", (table,))
+    return cur.fetchone() is not None
+
+
+def add_month_partition(cur, table: str, month: date):
+    """월 파티션 하나를 붙입니다. 기본 파티션에 그 달 행이 있으면 옮긴 뒤 붙입니다."""
+    key = PARTITION_KEYS[table]
+    name = _partition_name(table, month)
+    cur.execute("SELECT to_regclass(%s)", (name,))
+    if cur.fetchone()[0] is not None:
+        return False
+    start, end = month, _add_months(month, 1)
+    cur.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+    cur.execute(
+        f"""
+        WITH moved AS (DELETE FROM {table}_default WHERE {key} >= %s AND {key} < %s RETURNING *)
+        INSERT INTO {name} SELECT * FROM moved
+        """,
+        (start, end),
+    )
+    cur.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", (start, end))
+    return True
+
+
+def ensure_month_partitions(cur, table: str, months_ahead: int = 3) -> int:
+    """데이터가 있는 달부터 months_ahead 개월 뒤까지 월 파티션을 만듭니다."""
+    key = PARTITION_KEYS[table]
+    cur.execute(f"SELECT MIN({key})::date, MAX({key})::date FROM {table}")
+    first, last = cur.fetchone()
+    today = date.today()
+    month = _month_start(first or today)
+    end = _add_months(_month_start(max(last or today, today)), months_ahead)
+    created = 0
+    while month <= end:
+        created += add_month_partition(cur, table, month)
+        month = _add_months(month, 1)
+    return created
+
+
+def partition_monthly(storage, conn, table: str, months_ahead: int = 3) -> int:
+    """기존 테이블을 월별 RANGE 파티션 테이블로 바꿉니다. (이미 파티션이면 월 파티션만 보충)
+
+    한 트랜잭션에서 이름 변경 -> 파티션 부모/기본 파티션/월 파티션 생성 -> 데이터 복사 ->
+    인덱스·외래키 재생성 -> 시퀀스 소유권 이전 -> 기존 테이블 삭제 순으로 진행합니다.
+    """
+    if storage.name != "postgres":
+        raise RuntimeError(f"월별 파티셔닝은 PostgreSQL 에서만 지원합니다. (현재: {storage.name})")
+    if table not in PARTITION_KEYS:
+        raise ValueError(f"파티셔닝 대상이 아닙니다: {table} (가능: {', '.join(PARTITION_KEYS)})")
+    migrate(storage, conn)
+    key = PARTITION_KEYS[table]
+    old = f"{table}_unpartitioned"
+    with storage.cursor(conn) as cur:
+        storage.lock_migrations(cur)
+        if is_partitioned(cur, table):
+            created = ensure_month_partitions(cur, table, months_ahead)
+            conn.commit()
+            return created
+
+        # 기본키를 뺀 모든 인덱스 정의를 이름 변경 전에 읽어 둠 (인덱스 이름과 대상 테이블이 원래 이름 그대로 들어 있음)
+        cur.execute("""
+            SELECT i.indexname, i.indexdef FROM pg_indexes i
+            WHERE i.schemaname = current_schema() AND i.tablename = %s
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c
+                              WHERE c.contype = 'p' AND c.conindid = to_regclass(quote_ident(i.indexname)))
+        """, (table,))
+        index_defs = [index_def for _name, index_def in cur.fetchall()]
+        cur.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        # 인덱스 이름이 겹치지 않도록 기존 인덱스는 테이블과 함께 삭제되기 전까지 이름을 바꿔 둠
+        cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s", (old,))
+        for (index_name,) in cur.fetchall():
+            cur.execute(f"ALTER INDEX {index_name} RENAME TO {index_name}_old")
+        cur.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})")
+        # 파티션 키가 NULL 인 행도 받을 수 있도록 기본 파티션 사용
+        cur.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        cur.execute(f"SELECT MIN({key})::date, MAX({key})::date FROM {old}")
+        first, last = cur.fetchone()
+        today = date.today()
+        month = _month_start(first or today)
+        end = _add_months(_month_start(max(last or today, today)), months_ahead)
+        created = 0
+        while month <= end:
+            name = _partition_name(table, month)
+            cur.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                        (month, _add_months(month, 1)))
+            created += 1
+            month = _add_months(month, 1)
+        cur.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+
+        for index_def in index_defs:
+            cur.execute(index_def)
+        # 파티션 테이블의 기본키는 파티션 키를 포함해야 하므로 id 는 일반 인덱스로 대신함
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {table}_id_idx ON {table} (id)")
+        if table == "comments":
+            cur.execute("ALTER TABLE comments ADD FOREIGN KEY (video_id) REFERENCES videos(video_id)")
+        cur.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        cur.execute(f"DROP TABLE {old}")
+    conn.commit()
+    return created
@@ -0,0 +1,202 @@
+"""OpenAI 클라이언트와 키 검증을 지연 생성/공유합니다.
+
+스크립트 import 시점에 클라이언트를 만들거나 models.list()를 호출하지 않고,
+처음 필요할 때 한 번만 만들어 모든 작업자가 같은 인스턴스를 사용합니다.
+openai/httpx 모듈도 그때 import 하므로 상태 조회 같은 짧은 명령은 비용을 내지 않습니다.
+키 검증 결과는 TTL 동안 파일에 캐시되어 연속 실행 시 models.list() 호출을 생략합니다.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from jtbc import config, transport
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+_lock = threading.RLock()
+_client = None
+_concurrency = 1
+_validated = False
+
+
+def check_key_format(k: str):
+    """빈값/포맷/내부 공백·따옴표를 점검합니다."""
+    if not k:
+        raise SystemExit("OPENAI_API_KEY 가 비어있습니다. .env 위치/변수명을 확인하세요.")
+    if not (k.startswith("sk-") or k.startswith("sk_proj-") or k.startswith("sk-proj-")):
+        raise SystemExit("OPENAI_API_KEY 포맷이 올바르지 않습니다. sk- 또는 sk-proj- 로 시작하는 키를 사용하세요.")
+    # 내부 공백/따옴표는 허용하지 않음 (둘러싼 따옴표는 config에서 제거됨)
+    for bad in ['"', "'", "`", " "]:
+        if bad in k:
+            raise SystemExit("OPENAI_API_KEY 값에 내부 따옴표/공백이 포함되어 있습니다. .env에서 제거 후 다시 실행하세요.")
+
+
+def _trust_env() -> bool:
+    # 환경 프록시 무시 기본, 명시적 OPENAI_PROXY가 있을 때만 사용
+    return bool(config.OPENAI_PROXY)
+
+
+def configure(concurrency: int):
+    """예상 동시 요청 수를 지정합니다. 클라이언트 생성 전에 호출해야 풀 크기에 반영됩니다."""
+    global _concurrency
+    with _lock:
+        if _client is not None and concurrency > _concurrency:
+            print(f"경고: OpenAI 클라이언트가 이미 생성되어 풀 크기({_concurrency})를 늘릴 수 없습니다.")
+            return
+        _concurrency = max(1, concurrency)
+
+
+def reset():
+    """공유 클라이언트와 검증 상태를 버립니다. config 의 키/엔드포인트를 바꾼 뒤(예: bench 의 가짜 서버) 호출."""
+    global _client, _validated
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _validated = False
+
+
+def _build_http_client():
+    if config.OPENAI_PROXY:
+        # 명시적 프록시가 설정된 경우 환경변수로 전달하고 trust_env 활성화
+        os.environ["HTTPS_PROXY"] = config.OPENAI_PROXY
+        os.environ["HTTP_PROXY"] = config.OPENAI_PROXY
+    return transport.build_http_client(_concurrency, trust_env=_trust_env())
+
+
+def get_openai_client() -> "OpenAI":
+    """공유 OpenAI 클라이언트를 반환합니다. 최초 호출 시에만 생성합니다.
+
+    Whisper(STT)와 chat completions(llm-ev.py)가 같은 클라이언트/커넥션 풀을 사용합니다.
+    """
+    global _client
+    if _client is not None:
+        return _client
+    with _lock:
+        if _client is None:
+            from openai import OpenAI
+
+            check_key_format(config.OPENAI_API_KEY)
+            # sk-proj- 키는 프로젝트 ID가 필수
+            if config.OPENAI_API_KEY.startswith("sk-proj-") and not config.OPENAI_PROJECT_ID:
+                print("경고: sk-proj- 키를 사용 중이지만 OPENAI_PROJECT_ID가 설정되지 않았습니다.")
+                print("OpenAI 대시보드에서 프로젝트 ID를 확인하여 .env에 추가하세요.")
+                print("예: OPENAI_PROJECT_ID=proj_xxxxxxxxxxxx\n")
+            _client = OpenAI(
+                api_key=config.OPENAI_API_KEY,
+                base_url=config.OPENAI_BASE_URL or None,
+                organization=config.OPENAI_ORG_ID or None,
+                project=config.OPENAI_PROJECT_ID or None,
+                http_client=_build_http_client(),
+                timeout=transport.build_timeout(),
+                max_retries=transport.MAX_RETRIES,
+            )
+    return _client
+
+
+def is_auth_error(e: Exception) -> bool:
+    """예외가 401 인증 오류인지 판별합니다."""
+    status_code = getattr(e, "status_code", None)
+    if status_code is None and getattr(getattr(e, "response", None), "status_code", None):
+        status_code = e.response.status_code
+    msg = str(e)
+    return (
+        status_code == 401
+        or "invalid_api_key" in msg
+        or "status': 401" in msg
+        or "Incorrect API key provided" in msg
+        or "HTTP status code: 401" in msg
+    )
+
+
+def _print_auth_checklist():
+    key = config.OPENAI_API_KEY
+    print(f"OpenAI 인증 실패(401). 현재 키: {config.mask_key(key)} | base_url={config.OPENAI_BASE_URL or 'default'} | proxy={config.OPENAI_PROXY or 'none'} | trust_env={'on' if _trust_env() else 'off'}")
+    print("\n=== 401 오류 해결 체크리스트 ===")
+    print(f"1. .env 파일이 올바른 위치에 있는지 확인: {config.loaded_env_path}")
+    print("2. .env에서 OPENAI_API_KEY 값 확인 (위 출력된 전체 키 확인)")
+    print("3. OpenAI 대시보드(https://platform.openai.com/api-keys)에서:")
+    print("   - 키가 활성 상태인지 확인")
+    print("   - 사용 한도(Usage limits)가 설정되어 있는지 확인")
+    print("   - 결제 정보가 등록되어 있는지 확인")
+    if key.startswith("sk-proj-"):
+        print("4. 프로젝트 키(sk-proj-)를 사용 중이므로 OPENAI_PROJECT_ID 필수:")
+        print(f"   현재 값: {config.OPENAI_PROJECT_ID or '(설정 안 됨)'}")
+        print("   대시보드 > Settings > General에서 Project ID 확인")
+    print("5. 시스템 프록시 설정 제거 후 재시도")
+    print("6. 다른 네트워크(모바일 핫스팟 등)에서 시도")
+    print("================================\n")
+    print("- .env 파일 경로/로딩 확인 (레포 루트의 .env 사용)")
+    print("- 키에 공백/줄바꿈/따옴표가 포함되어 있지 않은지 확인")
+    print("- 필요 시 OPENAI_PROXY를 설정, 없다면 시스템 프록시 제거")
+    print("- 최신 openai/httpx로 업데이트 권장 (pip install -U openai httpx)")
+
+
+def _credential_fingerprint() -> str:
+    # 키 원문은 저장하지 않고 키/엔드포인트 조합의 해시만 기록
+    raw = "|".join([config.OPENAI_API_KEY, config.OPENAI_BASE_URL, config.OPENAI_ORG_ID, config.OPENAI_PROJECT_ID])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _credential_cache_path():
+    return config.STATE_DIR / "openai_credentials.json"
+
+
+def _load_cached_validation() -> bool:
+    """TTL 이내에 같은 키로 검증에 성공한 기록이 있으면 True."""
+    if config.OPENAI_VALIDATION_TTL <= 0:
+        return False
+    try:
+        with open(_credential_cache_path(), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (
+        cached.get("fingerprint") == _credential_fingerprint()
+        and time.time() - float(cached.get("validated_at", 0)) < config.OPENAI_VALIDATION_TTL
+    )
+
+
+def _store_cached_validation():
+    try:
+        config.STATE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_credential_cache_path(), "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": _credential_fingerprint(), "validated_at": time.time()}, f)
+    except OSError as e:
+        print(f"경고: 키 검증 캐시 저장 실패: {e}")
+
+
+def validate_openai_credentials(force: bool = False):
+    """키 유효성을 빠르게 점검합니다. 잘못된 키면 즉시 종료.
+
+    프로세스당 한 번, 그리고 OPENAI_VALIDATION_TTL 이내 재실행이면 네트워크 호출 없이 통과합니다.
+    """
+    global _validated
+    if _validated and not force:
+        return
+    with _lock:
+        if _validated and not force:
+            return
+        if not force and _load_cached_validation():
+            check_key_format(config.OPENAI_API_KEY)
+            _validated = True
+            return
+        client = get_openai_client()
+        try:
+            base = config.OPENAI_BASE_URL or "https://api.openai.com/v1 (default)"
+            proxy = config.OPENAI_PROXY or os.getenv("HTTPS_PROXY") or os.getenv("HTTP_PROXY") or "none"
+            # 간단한 호출로 인증 검증
+            client.models.list()
+            print(f"OpenAI 키 확인 완료: {config.mask_key(config.OPENAI_API_KEY)} | base_url={base} | proxy={proxy} | trust_env={'on' if _trust_env() else 'off'} | .env={config.loaded_env_path}")
+            print(f"전송 설정: {transport.describe(_concurrency)}")
+        except Exception as e:
+            if is_auth_error(e):
+                _print_auth_checklist()
+                raise SystemExit(1)
+            raise
+        _store_cached_validation()
+        _validated = True
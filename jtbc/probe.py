@@ -0,0 +1,98 @@
+"""다운로드 전 메타데이터 조회와 청크 계획.
+
+yt-dlp 정보 추출(download=False)로 영상 길이와 오디오 포맷을 먼저 읽어
+분할 여부, 청크 경계, 예상 비용/시간을 다운로드 전에 계산합니다.
+계획된 청크는 구간 다운로드(download_audio 의 start_ms/end_ms)로 하나씩 받을 수 있어,
+앞 청크를 Whisper로 보내는 동안 뒤 청크를 내려받을 수 있습니다.
+"""
+import os
+from typing import NamedTuple
+
+from jtbc.audio import build_ydl_opts
+from jtbc.usage import WHISPER_USD_PER_MINUTE
+
+# Whisper 업로드 한도와 변환 비트레이트(build_ydl_opts 의 32kbps mp3)
+WHISPER_LIMIT_MB = 25
+TARGET_BITRATE_KBPS = 32
+CHUNK_MINUTES = 10
+
+# 비용/시간 추정치 (환경 변수로 조정, 가격은 사용량 원장과 같은 값)
+# 오디오 1분당 Whisper 처리 시간(초)
+WHISPER_SECONDS_PER_MINUTE = float(os.getenv("WHISPER_SECONDS_PER_MINUTE", "3"))
+# 오디오 다운로드/변환 속도 (배속, 오디오 길이 / 소요 시간)
+DOWNLOAD_SPEED_FACTOR = float(os.getenv("DOWNLOAD_SPEED_FACTOR", "60"))
+
+
+class ProbeResult(NamedTuple):
+    video_id: str
+    title: str
+    duration_seconds: int
+    audio_formats: list   # [{"format_id", "ext", "abr", "filesize"}]
+
+
+class ChunkPlan(NamedTuple):
+    duration_seconds: int
+    estimated_mb: float
+    chunks: list          # [(index, start_ms, end_ms)]
+    cost_usd: float
+    estimated_seconds: float
+
+    @property
+    def needs_split(self) -> bool:
+        return len(self.chunks) > 1
+
+
+def probe_video(video_id: str) -> ProbeResult:
+    """영상을 내려받지 않고 길이와 오디오 포맷 목록을 조회합니다."""
+    import yt_dlp
+
+    opts = build_ydl_opts(os.devnull)
+    opts.pop('postprocessors', None)
+    opts.pop('postprocessor_args', None)
+    opts['skip_download'] = True
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+
+    audio_formats = [
+        {
+            "format_id": f.get("format_id"),
+            "ext": f.get("ext"),
+            "abr": f.get("abr"),
+            "filesize": f.get("filesize") or f.get("filesize_approx"),
+        }
+        for f in info.get("formats") or []
+        if f.get("acodec") not in (None, "none") and f.get("vcodec") in (None, "none")
+    ]
+    return ProbeResult(video_id, info.get("title") or "", int(info.get("duration") or 0), audio_formats)
+
+
+def estimate_mb(duration_seconds: float, bitrate_kbps: int = TARGET_BITRATE_KBPS) -> float:
+    """변환 후 mp3 크기(MB) 추정."""
+    return duration_seconds * bitrate_kbps * 1000 / 8 / (1024 * 1024)
+
+
+def plan_chunks(duration_seconds: int, chunk_minutes: int = CHUNK_MINUTES) -> ChunkPlan:
+    """길이만으로 청크 경계와 비용/시간을 계산합니다.
+
+    변환 후 크기가 Whisper 한도 이하면 청크 1개, 넘으면 split_audio_file 과 같은
+    chunk_minutes 경계로 나눕니다. (체크포인트와 호환되도록 경계를 맞춤)
+    """
+    duration_ms = int(duration_seconds * 1000)
+    size_mb = estimate_mb(duration_seconds)
+    if size_mb <= WHISPER_LIMIT_MB or duration_ms <= 0:
+        chunks = [(0, 0, duration_ms)]
+    else:
+        step = chunk_minutes * 60 * 1000
+        chunks = [(i // step, i, min(i + step, duration_ms)) for i in range(0, duration_ms, step)]
+    minutes = duration_seconds / 60
+    estimated_seconds = duration_seconds / DOWNLOAD_SPEED_FACTOR + minutes * WHISPER_SECONDS_PER_MINUTE
+    return ChunkPlan(int(duration_seconds), size_mb, chunks, minutes * WHISPER_USD_PER_MINUTE, estimated_seconds)
+
+
+def describe(plan: ChunkPlan) -> str:
+    """계획 요약 (로그용)."""
+    minutes = plan.duration_seconds / 60
+    return (
+        f"길이 {minutes:.1f}분 | 예상 {plan.estimated_mb:.1f}MB | 청크 {len(plan.chunks)}개 | "
+        f"예상 비용 ${plan.cost_usd:.3f} | 예상 소요 {plan.estimated_seconds / 60:.1f}분"
+    )
@@ -0,0 +1,142 @@
+"""버전 관리되는 스코어링 프로필(모델, 프롬프트, temperature, 출력 스키마)과 재스코어링 계획.
+
+llm_scores 의 각 행에는 profile_id(프로필 내용의 해시)와 text_hash((dt, text) 지문)가 함께 저장되고,
+프로필 원문은 scoring_profiles 테이블에 남습니다. 이름만 바꾼 프로필은 같은 profile_id 입니다.
+plan() 은 대상 프로필로 이미 점수가 있는 행을 빼고 남은 행만 돌려주므로, 같은 명령을 다시 실행하거나
+여러 번에 나눠(--limit) 실행해도 같은 텍스트를 두 번 스코어링하지 않습니다.
+
+    JTBC_SCORING_PROFILE=v1                  기본 프로필 이름
+    JTBC_SCORING_PROFILES=profiles.json      추가 프로필 [{"name", "model", "system_prompt", "temperature", "schema_version"}]
+
+A/B 비교는 text_hash 기준의 고정 표본(in_sample)을 두 번째 프로필로도 스코어링한 뒤
+python -m jtbc profiles --compare A B 로 같은 텍스트의 점수를 비교합니다.
+"""
+import hashlib
+import json
+import os
+from typing import NamedTuple
+
+DEFAULT_PROFILE = os.getenv("JTBC_SCORING_PROFILE", "v1")
+PROFILES_FILE = os.getenv("JTBC_SCORING_PROFILES")
+
+
+class ScoringProfile(NamedTuple):
+    name: str
+    model: str
+    system_prompt: str
+    temperature: float = 0.0
+    # 응답 JSON 형식(sentiment/fairness/notes)이 바뀌면 올림
+    schema_version: int = 1
+
+    @property
+    def profile_id(self) -> str:
+        raw = json.dumps([self.model, float(self.temperature), self.system_prompt, self.schema_version])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+V1 = ScoringProfile(
+    name="v1",
+    model="gpt-4o-mini",
+    system_prompt=(
+        "You are a strict JSON generator. For each input text, return:\n"
+        '{"sentiment": -1.0_to_1.0, "fairness": 0.0_to_1.0, "notes": "very brief reason"}\n'
+        "Sentiment: -1 very negative, 0 neutral, +1 very positive.\n"
+        "Fairness: 0 unfair/biased, 1 fully fair/neutral."
+    ),
+)
+
+BUILTIN = {V1.name: V1}
+
+
+class Plan(NamedTuple):
+    """pending: 스코어링할 행 (text_hash 열 포함). current/stale/new 는 행 수."""
+    profile: ScoringProfile
+    pending: object
+    total: int
+    current: int   # 이 프로필로 이미 점수가 있음
+    stale: int     # 다른 프로필 점수만 있음 (재스코어링 대상)
+    new: int       # 점수가 전혀 없음
+
+
+def load() -> dict:
+    """이름 -> 프로필. 기본 제공 프로필에 JTBC_SCORING_PROFILES 파일의 프로필을 더합니다."""
+    profiles = dict(BUILTIN)
+    if PROFILES_FILE:
+        with open(PROFILES_FILE, "r", encoding="utf-8") as f:
+            for item in json.load(f):
+                profiles[item["name"]] = ScoringProfile(**item)
+    return profiles
+
+
+def get(name: str = None) -> ScoringProfile:
+    profiles = load()
+    name = name or DEFAULT_PROFILE
+    if name not in profiles:
+        raise ValueError(f"알 수 없는 스코어링 프로필: {name} (가능: {', '.join(profiles)})")
+    return profiles[name]
+
+
+def register(profile: ScoringProfile, storage=None):
+    """프로필 원문을 scoring_profiles 에 남깁니다. (이미 있으면 그대로)"""
+    from jtbc import db
+
+    (storage or db.get_storage()).save_profile(profile)
+
+
+def require_adopted(storage=None, conn=None):
+    """profile_id 가 없는 기존 점수 행이 남아 있으면 RuntimeError.
+
+    그 행들은 어떤 프로필의 점수로도 세지 않으므로, 그대로 스코어링하면 이미 점수가 있는 텍스트를 전부 다시 보냅니다.
+    어떤 프롬프트로 매긴 점수인지는 사용자만 알기 때문에 자동으로 채우지 않고 --adopt-legacy 를 안내합니다.
+    """
+    from jtbc import db
+
+    legacy = (storage or db.get_storage()).legacy_score_count(conn)
+    if legacy:
+        raise RuntimeError(f"profile_id 가 없는 기존 점수 {legacy:,}행이 있습니다. 먼저 "
+                           f"python -m jtbc profiles --adopt-legacy {V1.name} 로 프로필을 지정하세요.")
+
+
+def row_digest(dt, text) -> str:
+    """스코어링 행 (dt, text) 의 지문. llm_scores.text_hash 와 샤드 배정(jtbc.sharding)에 씁니다."""
+    return hashlib.blake2b(f"{dt}\x1f{text}".encode("utf-8"), digest_size=10).hexdigest()
+
+
+def with_hashes(df):
+    """text_hash 열을 붙인 DataFrame. (이미 있으면 그대로)"""
+    if "text_hash" in df.columns:
+        return df
+    return df.assign(text_hash=[row_digest(dt, text) for dt, text in zip(df["dt"], df["text"])])
+
+
+def in_sample(text_hash: str, fraction: float) -> bool:
+    """text_hash 로 정해지는 고정 표본. 실행마다, 노드마다 같은 행이 뽑힙니다."""
+    return int(text_hash[:8], 16) < fraction * 0x100000000
+
+
+def sample(df, fraction: float):
+    df = with_hashes(df)
+    return df[[in_sample(h, fraction) for h in df["text_hash"]]]
+
+
+def plan(df, profile: ScoringProfile, storage=None) -> Plan:
+    """profile 로 점수가 없는 행만 남깁니다. 같은 (dt, text) 가 여러 번 있으면 저장된 횟수만큼만 뺍니다."""
+    from jtbc import db
+
+    df = with_hashes(df)
+    current, other = (storage or db.get_storage()).score_index(profile.profile_id)
+    keep, stale = [], 0
+    for key in df["text_hash"]:
+        if current.get(key, 0) > 0:
+            current[key] -= 1
+            keep.append(False)
+        else:
+            keep.append(True)
+            stale += key in other
+    pending = df[keep]
+    return Plan(profile, pending, len(df), len(df) - len(pending), stale, len(pending) - stale)
+
+
+def describe(p: Plan) -> str:
+    return (f"프로필 {p.profile.name} ({p.profile.profile_id}, {p.profile.model}): 전체 {p.total:,}행 | "
+            f"최신 {p.current:,} | 재스코어링 {p.stale:,} | 신규 {p.new:,}")
@@ -0,0 +1,173 @@
+"""--profile 모드: 진입점 전체 프로파일링과 메모리 스냅샷.
+
+    python -m jtbc --profile transcribe --workers 3      (stt.py --profile 도 동일)
+    python llm-ev.py --profile
+    JTBC_PROFILE=1 python -m jtbc ...
+
+실행마다 .jtbc_state/profiles/<이름>-<시각>/ 에 다음을 남깁니다.
+    stacks.folded      모든 스레드의 샘플링 스택 (flamegraph.pl, speedscope, inferno 에 바로 입력)
+    cprofile.pstats    메인 스레드 cProfile 결과 (snakeviz, gprof2dot)
+    cprofile.txt       누적 시간 상위 함수
+    stages.txt         단계별(metrics.span) 호출 수, 벽시계/CPU 시간
+    memory-*.txt       split_audio_file, fetch_data 전후 tracemalloc 차이 상위 항목과 최대 사용량
+
+작업자 스레드는 cProfile 이 따라가지 않으므로 스레드 전체 분포는 stacks.folded 로 봅니다.
+"""
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from jtbc import config
+
+SAMPLE_INTERVAL = float(os.getenv("JTBC_PROFILE_INTERVAL", "0.005"))
+# 할당 위치를 몇 프레임까지 기록할지. 늘리면 호출 경로가 보이지만 추적/스냅샷 비용이 크게 늘어남
+TRACEMALLOC_FRAMES = int(os.getenv("JTBC_PROFILE_TRACEMALLOC_FRAMES", "1"))
+MEMORY_TOP = 15
+
+_active_dir = None
+_memory_lock = threading.Lock()
+_memory_seq = 0
+# track_memory 가 호출마다 reset_peak 하므로, 리셋 직전까지의 최대값을 여기 모아 실행 전체 최대값을 구함
+_run_peak = 0
+
+
+def requested(argv=None) -> bool:
+    return os.getenv("JTBC_PROFILE", "") not in ("", "0") or "--profile" in (argv or ())
+
+
+class StackSampler:
+    """interval 마다 모든 스레드의 스택을 읽어 folded 형식(a;b;c 횟수)으로 모읍니다."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+        return f"{module}:{code.co_name}:{code.co_firstlineno}"
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="jtbc-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_run(name: str, enabled: bool = True):
+    """진입점을 감쌉니다. enabled 가 False 면 아무것도 하지 않습니다."""
+    global _active_dir, _run_peak
+    if not enabled:
+        yield None
+        return
+    from jtbc import metrics
+
+    out = config.STATE_DIR / "profiles" / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    out.mkdir(parents=True, exist_ok=True)
+    _active_dir = out
+    _run_peak = 0
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    sampler = StackSampler().start()
+    profiler = cProfile.Profile()
+    wall, cpu = time.perf_counter(), time.process_time()
+    profiler.enable()
+    try:
+        yield out
+    finally:
+        profiler.disable()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        sampler.stop()
+        _active_dir = None
+        with _memory_lock:
+            peak = max(_run_peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        sampler.write(out / "stacks.folded")
+        profiler.dump_stats(str(out / "cprofile.pstats"))
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(40)
+        (out / "cprofile.txt").write_text(text.getvalue(), encoding="utf-8")
+        lines = [f"{'stage':24s} {'calls':>7s} {'wall_s':>10s} {'cpu_s':>10s} {'cpu%':>6s} {'errors':>6s}"]
+        for stage, calls, total, _, errors, cpu_s in metrics.summary():
+            lines.append(f"{stage:24s} {calls:>7} {total:>10.3f} {cpu_s:>10.3f} "
+                         f"{cpu_s / total * 100 if total else 0:>5.0f}% {errors:>6}")
+        lines.append(f"{'(run)':24s} {'':>7s} {wall:>10.3f} {cpu:>10.3f} {cpu / wall * 100 if wall else 0:>5.0f}%")
+        (out / "stages.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        print(f"🔬 프로파일 저장: {out} (벽시계 {wall:.1f}s, CPU {cpu:.1f}s, 추적 메모리 최대 {peak / 1024 / 1024:.1f}MB, "
+              f"샘플 {sum(sampler.samples.values())}개)")
+        print(f"   플레임그래프: flamegraph.pl {out / 'stacks.folded'} > flame.svg  (또는 speedscope 에 불러오기)")
+
+
+def _reset_peak() -> int:
+    """지금까지의 최대값을 _run_peak 에 반영한 뒤 tracemalloc 최대값을 리셋하고, 리셋 시점의 사용량을 반환합니다."""
+    global _run_peak
+    with _memory_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        _run_peak = max(_run_peak, peak)
+        tracemalloc.reset_peak()
+    return current
+
+
+def track_memory(label: str):
+    """프로파일 중일 때 함수 호출 전후 tracemalloc 스냅샷 차이를 memory-<label>-<n>.txt 로 남기는 데코레이터."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            global _memory_seq
+            out = _active_dir
+            if out is None or not tracemalloc.is_tracing():
+                return func(*args, **kwargs)
+            before = tracemalloc.take_snapshot()
+            current = _reset_peak()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                after = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                with _memory_lock:
+                    _memory_seq += 1
+                    path = out / f"memory-{label}-{_memory_seq:03d}.txt"
+                lines = [f"{label}: 호출 중 최대 {(peak - current) / 1024 / 1024:.1f}MB 증가 (다른 스레드 할당 포함)"]
+                for stat in after.compare_to(before, "lineno")[:MEMORY_TOP]:
+                    lines.append(str(stat))
+                path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return wrapper
+    return decorator
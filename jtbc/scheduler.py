@@ -0,0 +1,92 @@
+"""STT 대기열 정렬 정책.
+
+get_videos_without_transcript 결과를 정책에 따라 정렬해 중요한 영상부터 처리합니다.
+
+    id          기존 방식 (DB id 순, --resume 의 순번과 호환)
+    recency     최신 게시 영상 먼저
+    engagement  댓글 수(+댓글 좋아요) 많은 영상 먼저
+    sjf         길이가 짧은 영상 먼저 (시간당 완료 영상 수 최대화)
+    balanced    (최신성 x 관심도) / 예상 처리 시간 이 큰 영상 먼저 (기본값)
+
+모든 정책(id 제외)에서 boost_hours 이내에 게시된 영상은 맨 앞으로 올립니다.
+길이를 모르는 영상은 길이가 알려진 영상들의 중앙값으로 추정합니다.
+"""
+import math
+import os
+import statistics
+from datetime import datetime, timezone
+
+POLICIES = ("id", "recency", "engagement", "sjf", "balanced")
+DEFAULT_POLICY = os.getenv("TRANSCRIBE_ORDER", "balanced")
+DEFAULT_BOOST_HOURS = float(os.getenv("TRANSCRIBE_BOOST_HOURS", "48"))
+
+# 길이 정보가 하나도 없을 때 가정할 영상 길이 (뉴스 클립 평균 수준)
+FALLBACK_DURATION_SECONDS = 5 * 60
+# balanced 정책의 최신성 반감기
+RECENCY_HALF_LIFE_DAYS = 30.0
+
+
+def _published(video) -> datetime:
+    return video.get('published_at') or datetime.min
+
+
+def engagement(video) -> float:
+    """관심도 점수: 댓글 수 + 댓글 좋아요의 10%."""
+    return float(video.get('comment_count') or 0) + 0.1 * float(video.get('comment_likes') or 0)
+
+
+def _durations(videos) -> dict:
+    known = [v['duration_seconds'] for v in videos if v.get('duration_seconds')]
+    fallback = statistics.median(known) if known else FALLBACK_DURATION_SECONDS
+    return {v['video_id']: float(v.get('duration_seconds') or fallback) for v in videos}
+
+
+def _is_boosted(video, now: datetime, boost_hours: float) -> bool:
+    published_at = video.get('published_at')
+    if not published_at or boost_hours <= 0:
+        return False
+    return (now - published_at).total_seconds() <= boost_hours * 3600
+
+
+def order_videos(videos: list, policy: str = DEFAULT_POLICY, boost_hours: float = DEFAULT_BOOST_HOURS, now: datetime = None) -> list:
+    """정책에 따라 정렬된 새 목록을 반환합니다."""
+    if policy not in POLICIES:
+        raise ValueError(f"알 수 없는 정렬 정책: {policy} (선택: {', '.join(POLICIES)})")
+    videos = list(videos)
+    if policy == "id":
+        return sorted(videos, key=lambda v: v.get('id') or 0)
+
+    # published_at 은 UTC 기준 naive TIMESTAMP 로 저장돼 있음
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    durations = _durations(videos)
+
+    def recency_weight(video) -> float:
+        published_at = video.get('published_at')
+        if not published_at:
+            return 0.0
+        age_days = max(0.0, (now - published_at).total_seconds() / 86400)
+        return 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+    if policy == "recency":
+        key = lambda v: _published(v)
+        reverse = True
+    elif policy == "engagement":
+        key = lambda v: (engagement(v), _published(v))
+        reverse = True
+    elif policy == "sjf":
+        key = lambda v: (-durations[v['video_id']], _published(v))
+        reverse = True
+    else:  # balanced
+        key = lambda v: recency_weight(v) * (1.0 + math.log1p(engagement(v))) / max(durations[v['video_id']], 1.0)
+        reverse = True
+
+    ordered = sorted(videos, key=key, reverse=reverse)
+    # 새로 올라온 영상은 정책과 무관하게 먼저 (그 안에서는 정책 순서 유지)
+    boosted = [v for v in ordered if _is_boosted(v, now, boost_hours)]
+    rest = [v for v in ordered if not _is_boosted(v, now, boost_hours)]
+    return boosted + rest
+
+
+def estimate_hours(videos: list) -> float:
+    """대기열 전체의 오디오 길이 합(시간). 길이 미상은 중앙값 추정."""
+    return sum(_durations(videos).values()) / 3600
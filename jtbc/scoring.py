@@ -0,0 +1,189 @@
+"""LLM 감성/공정성 스코어링 (llm-ev.py 와 벤치마크가 공유).
+
+텍스트를 batch_size 개씩 --- 로 이어 chat completions 한 번에 보내고 JSON 배열로 점수를 받습니다.
+응답은 행 수만큼 미리 잡아 둔 배열(ScoreColumns)에 배치 위치 그대로 채우고, 저장 직전에
+범위 검증/clip 을 배열 단위로 한 번에 합니다. 검증 결과는 score_flags 비트로 남습니다.
+"""
+import json
+import os
+import time
+
+import numpy as np
+from tqdm import tqdm
+
+from jtbc import metrics, profiles, shutdown, usage
+from jtbc.openai_client import get_openai_client
+
+# 기본 프로필(v1) 값. 프로필별 모델/프롬프트는 jtbc.profiles
+MODEL = profiles.V1.model
+SYSTEM_PROMPT = profiles.V1.system_prompt
+# score_dataframe(sink=...) 가 점수를 몇 행마다 넘길지 (중단 시 잃을 수 있는 최대 행 수)
+FLUSH_ROWS = int(os.getenv("JTBC_SCORE_FLUSH_ROWS", "500"))
+
+# llm_scores.score_flags 비트
+FLAG_MISSING = 1      # 응답에 이 행의 결과가 없음 (파싱 실패 포함) -> 점수 NULL
+FLAG_INVALID = 2      # 숫자가 아니거나 NaN/inf -> 해당 점수 NULL
+FLAG_CLIPPED = 4      # 범위를 벗어나 sentiment [-1, 1], fairness [0, 1] 로 잘림
+FLAG_MISALIGNED = 8   # 응답 개수가 배치 크기와 달라 순서 대응을 믿기 어려움
+FLAG_PROPAGATED = 16  # 스코어링하지 않고 근사 중복 텍스트의 점수를 복사함 (jtbc.embeddings)
+FLAG_NAMES = {FLAG_MISSING: "missing", FLAG_INVALID: "invalid", FLAG_CLIPPED: "clipped",
+              FLAG_MISALIGNED: "misaligned", FLAG_PROPAGATED: "propagated"}
+RANGES = {"sentiment": (-1.0, 1.0), "fairness": (0.0, 1.0)}
+
+@metrics.traced("analyze_batch")
+def analyze_batch(texts, profile: "profiles.ScoringProfile" = None):
+    profile = profile or profiles.V1
+    metrics.inc("jtbc_texts_scored_total", len(texts))
+    joined = "\n---\n".join(texts)
+    prompt = (
+        "For each text separated by --- output a JSON array in order. "
+        "Each element follows the schema above.\n"
+        f"{joined}"
+    )
+    usage.check_budget()
+    started = time.perf_counter()
+    try:
+        raw = get_openai_client().chat.completions.with_raw_response.create(
+            model=profile.model,
+            messages=[{"role": "system", "content": profile.system_prompt},
+                      {"role": "user", "content": prompt}],
+            temperature=profile.temperature
+        )
+        resp = raw.parse()
+    except Exception as e:
+        usage.record("chat", profile.model, time.perf_counter() - started, outcome=type(e).__name__, items=len(texts))
+        raise
+    tokens = resp.usage
+    usage.record("chat", profile.model, time.perf_counter() - started, retries=getattr(raw, "retries_taken", 0),
+                 items=len(texts), prompt_tokens=getattr(tokens, "prompt_tokens", 0) or 0,
+                 completion_tokens=getattr(tokens, "completion_tokens", 0) or 0)
+    content = resp.choices[0].message.content.strip()
+    try:
+        data = json.loads(content)
+        if isinstance(data, dict):  # if single object, wrap
+            data = [data]
+        return data
+    except Exception:
+        # 점수 없이 notes 만: ScoreColumns 가 NULL + FLAG_MISSING 으로 남김
+        return [{"notes": "parse_error"} for _ in texts]
+
+class ScoreColumns:
+    """스코어링 결과를 담는 미리 할당된 열 배열. (행 i 의 점수는 항상 df 의 i 번째 행)
+
+    fill() 은 배치 결과를 제자리에 쓰기만 하고, validate() 가 구간 전체를 벡터 연산으로 검증/clip 하며,
+    frame() 은 배열 구간을 복사 없이 그대로 열로 붙인 DataFrame 을 만듭니다.
+    """
+
+    def __init__(self, rows: int):
+        self.sentiment = np.full(rows, np.nan)
+        self.fairness = np.full(rows, np.nan)
+        self.notes = np.full(rows, "", dtype=object)
+        self.flags = np.zeros(rows, dtype=np.uint8)
+
+    def fill(self, start: int, size: int, results) -> int:
+        """df[start:start+size] 배치의 결과를 씁니다. 모자란 행은 FLAG_MISSING, 넘치는 결과는 버립니다."""
+        results = results or []
+        if len(results) != size:
+            self.flags[start:start + size] |= FLAG_MISALIGNED
+        results = [res if isinstance(res, dict) else {} for res in results[:size]]
+        end = start + len(results)
+        for field in RANGES:
+            # 숫자/숫자 문자열만 통과, 나머지는 NaN (validate 에서 FLAG_INVALID)
+            getattr(self, field)[start:end] = [_number(res.get(field)) for res in results]
+        self.notes[start:end] = [str(res.get("notes") or "") for res in results]
+        self.flags[end:start + size] |= FLAG_MISSING
+        absent = np.fromiter(("sentiment" not in res and "fairness" not in res for res in results), bool, len(results))
+        self.flags[start:end][absent] |= FLAG_MISSING
+        return start + size
+
+    def validate(self, start: int, stop: int):
+        """[start, stop) 구간의 NaN/범위를 검사해 플래그를 세우고 범위 밖 값을 clip 합니다."""
+        flags = self.flags[start:stop]
+        missing = (flags & FLAG_MISSING) != 0
+        for field, (low, high) in RANGES.items():
+            values = getattr(self, field)[start:stop]
+            flags[~np.isfinite(values) & ~missing] |= FLAG_INVALID
+            values[~np.isfinite(values)] = np.nan
+            flags[(values < low) | (values > high)] |= FLAG_CLIPPED
+            np.clip(values, low, high, out=values)
+
+    def frame(self, df, start: int, stop: int, profile=None):
+        """df[start:stop] 의 열에 점수 배열 구간(view)을 붙인 DataFrame."""
+        import pandas as pd
+
+        part = profiles.with_hashes(df.iloc[start:stop])
+        columns = {name: part[name] for name in part.columns}
+        columns.update(sentiment=self.sentiment[start:stop], fairness=self.fairness[start:stop],
+                       notes=self.notes[start:stop], score_flags=self.flags[start:stop],
+                       profile_id=(profile or profiles.V1).profile_id)
+        return pd.DataFrame(columns, index=part.index, copy=False)
+
+    def counts(self, stop: int) -> dict:
+        """{플래그 이름: 행 수} (0 인 것은 생략)."""
+        flags = self.flags[:stop]
+        return {name: int(np.count_nonzero(flags & bit)) for bit, name in FLAG_NAMES.items()
+                if np.count_nonzero(flags & bit)}
+
+def _number(value) -> float:
+    if isinstance(value, bool) or value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def assemble_scores(df, results, profile=None):
+    """df 한 배치의 results 를 붙여 검증한 DataFrame. profile_id, text_hash, score_flags 열도 채웁니다."""
+    columns = ScoreColumns(len(df))
+    stop = columns.fill(0, len(df), results)
+    columns.validate(0, stop)
+    return columns.frame(df, 0, stop, profile)
+
+def score_dataframe(df, batch_size=10, sink=None, flush_rows=FLUSH_ROWS, profile=None):
+    """df 의 text 를 profile(기본 v1)로 스코어링해 sentiment/fairness/notes 열을 붙여 반환합니다.
+
+    sink 를 주면 flush_rows 행마다, 그리고 끝날 때 아직 넘기지 않은 점수 조각을 sink(DataFrame) 으로 넘깁니다.
+    예산 상한이나 종료 요청(jtbc.shutdown)이 오면 새 배치를 보내지 않고 받은 점수까지만 반환합니다.
+    """
+    columns = ScoreColumns(len(df))
+    done = flushed = 0
+
+    def flush():
+        nonlocal flushed
+        if done > flushed:
+            columns.validate(flushed, done)
+            if sink is not None:
+                sink(columns.frame(df, flushed, done, profile))
+            flushed = done
+
+    for i in tqdm(range(0, len(df), batch_size)):
+        if shutdown.requested():
+            print(f"🛑 종료 요청: {done}/{len(df)}행에서 스코어링을 멈춥니다.")
+            break
+        batch = df.iloc[i:i+batch_size]
+        try:
+            batch_results = analyze_batch(batch["text"].tolist(), profile)
+        except (usage.BudgetExceeded, shutdown.Interrupted) as e:
+            # 이미 받은 점수까지만 반환
+            print(f"💸 {e}. 스코어링을 중단합니다.")
+            break
+        done = columns.fill(i, len(batch), batch_results)
+        if done - flushed >= flush_rows:
+            flush()
+    flush()
+    flagged = columns.counts(done)
+    for name, count in flagged.items():
+        metrics.inc("jtbc_scores_flagged_total", count, flag=name)
+    if flagged:
+        print("⚠️ 점수 검증: " + ", ".join(f"{name} {count}행" for name, count in flagged.items()))
+    return columns.frame(df, 0, done, profile)
+
+def aggregate_timeseries(scored_df):
+    return (
+        scored_df.groupby("dt")
+        .agg(sentiment_avg=("sentiment", "mean"),
+             fairness_avg=("fairness", "mean"),
+             n=("text", "count"))
+        .reset_index()
+        .sort_values("dt")
+    )
@@ -0,0 +1,125 @@
+"""여러 노드/프로세스로 나눠 돌리는 스코어링 (llm-ev.py --shards N).
+
+    python llm-ev.py --shards 16                 # 노드마다 같은 명령을 띄우면 서로 다른 샤드를 처리
+    python llm-ev.py --shards 16 --shard-by date # 같은 날짜의 행은 같은 샤드로
+    python -m jtbc shards                        # 작업 목록 / 샤드별 진행 / 합친 일 단위 시계열
+
+행은 (dt, text) 지문으로 샤드에 배정됩니다. (row: 행 지문, date: 날짜 지문 기준)
+샤드마다 scoring_shards 에 임대(lease) 행이 하나 있고, 작업자는 비었거나 임대가 만료된 샤드를 잡아
+지문 순서대로 스코어링합니다. 점수 조각은 진행 위치(last_key)와 일 단위 합계(scoring_rollups)와 함께
+한 트랜잭션으로 커밋되므로, 노드가 죽으면 임대 만료 후 다른 노드가 마지막 커밋 위치부터 이어 갑니다.
+작업 ID 의 기본값은 스코어링 프로필(jtbc.profiles)이라 프롬프트/모델을 바꾸면 새 작업이 되고,
+작업자에게는 그 프로필로 아직 점수가 없는 행만 넘어옵니다. (llm-ev.py 가 profiles.plan 으로 거름)
+모든 노드가 전체 데이터를 읽은 뒤 자기 샤드만 고르므로, 작업이 시작된 뒤 들어온 행은 다음 작업 몫입니다.
+"""
+import hashlib
+import os
+import socket
+import threading
+
+from jtbc import db, profiles, shutdown, usage
+
+SHARD_BY = ("row", "date")
+LEASE_SECONDS = float(os.getenv("JTBC_SHARD_LEASE_SECONDS", "300"))
+OWNER = f"{socket.gethostname()}-{os.getpid()}-{usage.RUN_ID}"
+
+
+def default_job_id(profile=None) -> str:
+    profile = profile or profiles.get()
+    return f"{profile.name}-{profile.profile_id}"
+
+
+def assign(df, shards: int, shard_by: str = "row"):
+    """df 에 _key(행 지문:중복 순번)와 _shard 열을 붙여 반환합니다."""
+    if shard_by not in SHARD_BY:
+        raise ValueError(f"알 수 없는 샤드 기준: {shard_by} (가능: {', '.join(SHARD_BY)})")
+    df = profiles.with_hashes(df).copy()
+    # 같은 (dt, text) 가 여러 번 있으면 지문이 같아 last_key 이후 재개 시 누락되므로 순번을 붙여 유일하게 만듦
+    df["_key"] = df["text_hash"] + df.groupby("text_hash").cumcount().map(":{:06d}".format)
+    if shard_by == "row":
+        df["_shard"] = [int(key[:8], 16) % shards for key in df["_key"]]
+    else:
+        df["_shard"] = [int(hashlib.blake2b(str(dt).encode(), digest_size=4).hexdigest(), 16) % shards
+                        for dt in df["dt"]]
+    return df
+
+
+class _Heartbeat:
+    """샤드를 잡고 있는 동안 lease/3 마다 임대를 연장합니다. (별도 연결 사용)"""
+
+    def __init__(self, storage, job_id: str, shard: int, lease_seconds: float):
+        self.storage, self.job_id, self.shard, self.lease_seconds = storage, job_id, shard, lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"jtbc-lease-{shard}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                if not self.storage.renew_shard(self.job_id, self.shard, OWNER, self.lease_seconds):
+                    self.lost = True
+                    return
+            except Exception as e:
+                print(f"  - 경고: 샤드 {self.shard} 임대 연장 실패: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(df, shards: int, shard_by: str = "row", job_id: str = None, lease_seconds: float = LEASE_SECONDS,
+               storage=None, conn=None, profile=None) -> list:
+    """남은 샤드를 하나씩 잡아 스코어링합니다. 잡을 샤드가 없거나 종료/예산 상한이면 끝납니다.
+
+    이번 프로세스가 저장한 점수 DataFrame 목록을 반환합니다.
+    """
+    from jtbc.scoring import score_dataframe
+
+    storage = storage or db.get_storage()
+    profile = profile or profiles.get()
+    job_id = job_id or default_job_id(profile)
+    # 끝난 작업이라도 넘겨받은 행이 있으면 새로 들어온 행이므로 샤드를 다시 엶
+    storage.init_shards(job_id, shards, shard_by, conn, reopen=not df.empty)
+    df = assign(df, shards, shard_by)
+    print(f"🧩 작업 {job_id}: 샤드 {shards}개 ({shard_by} 기준), 작업자 {OWNER}")
+
+    scored_parts = []
+    while not shutdown.requested():
+        claim = storage.claim_shard(job_id, OWNER, lease_seconds, conn)
+        if claim is None:
+            print("잡을 수 있는 샤드가 없습니다. (모두 완료되었거나 다른 작업자가 처리 중)")
+            break
+        shard = claim["shard"]
+        part = df[df["_shard"] == shard].sort_values("_key", kind="stable")
+        if claim["last_key"]:
+            part = part[part["_key"] > claim["last_key"]]
+        # 이어받은 샤드는 이미 저장된 행이 계획에서 빠져 있으므로 진행분 + 남은 행
+        rows_total = claim["rows_done"] + len(part)
+        print(f"\n🧩 샤드 {shard}/{shards} 시작: {len(part)}/{rows_total}행 남음 (시도 {claim['attempts']})")
+        storage.renew_shard(job_id, shard, OWNER, lease_seconds, rows_total=rows_total, conn=conn)
+
+        with _Heartbeat(storage, job_id, shard, lease_seconds) as heartbeat:
+            def save(chunk):
+                if heartbeat.lost:
+                    raise db.LeaseLost(f"샤드 {shard} 임대를 잃었습니다.")
+                storage.commit_shard_chunk(job_id, shard, OWNER, chunk, chunk["_key"].iloc[-1], lease_seconds, conn)
+                usage.flush()
+
+            try:
+                scored = score_dataframe(part, sink=save, profile=profile)
+            except db.LeaseLost as e:
+                print(f"  - ⚠️ {e} 다음 샤드로 넘어갑니다.")
+                continue
+        scored_parts.append(scored)
+        finished = len(scored) == len(part)
+        storage.end_shard(job_id, shard, OWNER, done=finished, conn=conn)
+        if not finished:
+            # 종료 요청 또는 예산 상한: 임대를 풀어 다른 작업자가 바로 이어받게 함
+            print(f"  - ⏸️ 샤드 {shard} 를 {len(scored)}/{len(part)}행에서 멈추고 반납합니다.")
+            break
+        print(f"  - ✅ 샤드 {shard} 완료 ({rows_total}행)")
+    return scored_parts
@@ -0,0 +1,97 @@
+"""SIGINT/SIGTERM 을 받으면 새 작업을 멈추고 진행 중 작업을 마무리한 뒤 종료합니다.
+
+    with shutdown.graceful(on_force=(usage.flush, metrics.flush)):
+        for item in work:
+            if shutdown.requested():
+                break
+            ...
+
+- 첫 신호: requested() 가 True 가 되고 shutdown.wait() 로 자던 작업자가 바로 깨어남.
+  작업 루프는 새 항목을 받지 않고, 진행 중인 요청만 끝낸 뒤 버퍼를 저장하고 정상 종료합니다.
+- DRAIN_SECONDS(JTBC_DRAIN_SECONDS, 기본 120초) 안에 끝나지 않거나 신호를 한 번 더 받으면
+  on_force 콜백(버퍼 저장)만 실행하고 즉시 종료합니다. (청크/스코어 체크포인트는 이미 디스크에 있음)
+"""
+import os
+import signal
+import threading
+from contextlib import contextmanager
+
+DRAIN_SECONDS = float(os.getenv("JTBC_DRAIN_SECONDS", "120"))
+EXIT_CODE = 130
+
+_event = threading.Event()
+_lock = threading.Lock()
+_force_callbacks = []
+_timer = None
+
+
+class Interrupted(RuntimeError):
+    """종료 요청으로 작업을 중간에 멈춤. 체크포인트는 남아 있어 다음 실행에서 이어집니다."""
+
+
+def requested() -> bool:
+    return _event.is_set()
+
+
+def wait(seconds: float) -> bool:
+    """seconds 동안 대기합니다. 도중에 종료 요청이 오면 바로 True 를 반환합니다."""
+    return _event.wait(max(0.0, seconds))
+
+
+def check():
+    """종료 요청이 있으면 Interrupted 를 던집니다. 작업 단위 사이에서 호출."""
+    if _event.is_set():
+        raise Interrupted("종료 요청으로 중단")
+
+
+def _force():
+    print("\n⛔ 마무리 시간 초과 또는 강제 종료: 버퍼만 저장하고 종료합니다.", flush=True)
+    for callback in list(_force_callbacks):
+        try:
+            callback()
+        except Exception as e:
+            print(f"  - 종료 전 저장 실패 ({getattr(callback, '__qualname__', callback)}): {e}", flush=True)
+    os._exit(EXIT_CODE)
+
+
+def request(reason: str = "요청", drain_seconds: float = DRAIN_SECONDS):
+    """종료를 요청합니다. (신호 처리기와 같은 동작, 두 번째 요청은 강제 종료)"""
+    global _timer
+    with _lock:
+        if _event.is_set():
+            force = True
+        else:
+            force = False
+            _event.set()
+            _timer = threading.Timer(drain_seconds, _force)
+            _timer.daemon = True
+            _timer.start()
+    if force:
+        _force()
+    print(f"\n🛑 종료 신호({reason}): 새 작업을 받지 않고 진행 중인 작업을 최대 {drain_seconds:.0f}초 마무리합니다. "
+          f"(한 번 더 보내면 즉시 종료)", flush=True)
+
+
+@contextmanager
+def graceful(drain_seconds: float = DRAIN_SECONDS, on_force=()):
+    """블록 동안 SIGINT/SIGTERM 을 종료 요청으로 바꿉니다. (메인 스레드에서만 설치 가능)"""
+    global _timer
+    installed = {}
+    if threading.current_thread() is threading.main_thread():
+        def handler(signum, frame):
+            request(signal.Signals(signum).name, drain_seconds)
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            installed[sig] = signal.signal(sig, handler)
+    _force_callbacks.extend(on_force)
+    try:
+        yield
+    finally:
+        for sig, previous in installed.items():
+            signal.signal(sig, previous)
+        for callback in on_force:
+            _force_callbacks.remove(callback)
+        with _lock:
+            if _timer is not None:
+                _timer.cancel()
+                _timer = None
@@ -0,0 +1,404 @@
+"""STT 엔진: 다운로드 -> Whisper -> DB 업데이트.
+
+stt.py / stt_resume.py / collect_missing_videos.py 가 공유하는 실행 로직입니다.
+실행 모드(기간 지정, 재개, 동시 작업자 수)는 run()의 인자로만 구분됩니다.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from jtbc import config, db, metrics, openai_client, probe, scheduler, shutdown, usage, whisper_cache
+from jtbc.audio import AudioChunk, download_audio, is_bot_block, split_audio_file
+from jtbc.checkpoint import ChunkCheckpoint
+from jtbc.openai_client import get_openai_client, is_auth_error, validate_openai_credentials
+from jtbc.probe import CHUNK_MINUTES
+
+
+class AuthError(RuntimeError):
+    """OpenAI 401 오류. 추가 시도가 의미 없으므로 전체 실행을 중단합니다."""
+
+
+class Transcript(NamedTuple):
+    """전사 결과. segments 는 원본 오디오 기준 초 단위 [{"start", "end", "text"}]."""
+    text: str
+    segments: list
+
+
+WHISPER_MODEL = "whisper-1"
+# 단어 타임스탬프도 받아 캐시에 남겨 두면 이후 후처리(경계 병합 등)를 API 호출 없이 다시 할 수 있음
+WHISPER_TIMESTAMP_GRANULARITIES = os.getenv("WHISPER_TIMESTAMP_GRANULARITIES", "segment,word").split(",")
+
+
+def _create_transcription(audio_file, video_id: str = None, index: int = 0, total: int = 1, offset_s: float = 0.0):
+    """Whisper 를 호출합니다. 같은 오디오/파라미터의 응답이 캐시에 있으면 그대로 씁니다."""
+    params = {"model": WHISPER_MODEL, "language": "ko", "response_format": "verbose_json",
+              "timestamp_granularities": WHISPER_TIMESTAMP_GRANULARITIES}
+    digest = whisper_cache.audio_digest(audio_file)
+    key = whisper_cache.cache_key(digest, params)
+    cached = whisper_cache.load(key)
+    if cached is not None:
+        print(f"  - ♻️ 캐시된 Whisper 응답 사용 ({key[:12]})")
+        whisper_cache.remember(video_id, key, index, total, offset_s)
+        return cached
+    if whisper_cache.mode() == "replay":
+        raise whisper_cache.CacheMiss(f"replay 모드: 캐시에 없는 오디오입니다 ({video_id or audio_file.name})")
+
+    size = os.fstat(audio_file.fileno()).st_size
+    metrics.inc("jtbc_whisper_upload_bytes_total", size)
+    usage.check_budget()
+    started = time.perf_counter()
+    try:
+        with metrics.span("whisper_request", bytes=size):
+            # with_raw_response: SDK 내부 재시도 횟수(retries_taken)를 사용량 원장에 남기기 위해 사용
+            raw = get_openai_client().audio.transcriptions.with_raw_response.create(
+                model=WHISPER_MODEL,
+                file=audio_file,
+                language="ko",
+                # 구간별 시작/끝 시간을 함께 받아 transcript_segments 에 저장
+                response_format="verbose_json",
+                timestamp_granularities=WHISPER_TIMESTAMP_GRANULARITIES,
+            )
+            response = raw.parse()
+    except Exception as e:
+        usage.record("whisper", WHISPER_MODEL, time.perf_counter() - started, outcome=type(e).__name__)
+        if is_auth_error(e):
+            raise AuthError("OpenAI 401: API 키가 올바르지 않거나 프록시로 인해 손상되었습니다.") from e
+        raise
+    usage.record("whisper", WHISPER_MODEL, time.perf_counter() - started, retries=getattr(raw, "retries_taken", 0),
+                 audio_seconds=float(getattr(response, "duration", 0) or 0))
+    whisper_cache.store(key, params, digest, size, raw.http_response.content)
+    whisper_cache.remember(video_id, key, index, total, offset_s)
+    return response
+
+
+def _segments_of(response, offset_s: float = 0.0) -> list:
+    """verbose_json 응답의 구간을 원본 기준 시간으로 옮겨 dict 목록으로 변환합니다."""
+    return [
+        {"start": round(seg.start + offset_s, 2), "end": round(seg.end + offset_s, 2), "text": seg.text}
+        for seg in getattr(response, "segments", None) or []
+    ]
+
+
+@metrics.traced("transcribe_audio")
+def transcribe_audio(audio_path: str, checkpoint: ChunkCheckpoint = None) -> Transcript:
+    """OpenAI Whisper API를 사용하여 오디오를 텍스트로 변환합니다.
+
+    checkpoint 를 주면 청크별 결과를 기록하고, 이미 전사된 청크는 건너뜁니다.
+    """
+    # Whisper API는 최대 25MB 파일만 지원
+    file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
+
+    # 25MB 초과 시 자동으로 분할 처리
+    if file_size_mb > 25:
+        done = set()
+        if checkpoint is not None and checkpoint.chunk_minutes == CHUNK_MINUTES:
+            done = checkpoint.done_indices()
+        chunk_files = _plan_chunks(audio_path, checkpoint, done)
+        if done:
+            print(f"  - 체크포인트 발견: {len(done)}/{len(chunk_files)}개 청크 완료, 남은 청크만 처리")
+        else:
+            print(f"  - 파일 크기({file_size_mb:.1f}MB)가 25MB 초과, {len(chunk_files)}개 청크로 분할 완료")
+
+        results = {}
+        pending = [c for c in chunk_files if c.index not in done]
+        for n, chunk in enumerate(pending, 1):
+            # 종료 요청 시 남은 청크는 보내지 않음 (완료 청크는 체크포인트에 있어 재시작 시 이어짐)
+            shutdown.check()
+            results[chunk.index] = _transcribe_chunk(chunk, len(chunk_files), checkpoint)
+
+            # 청크 간 짧은 대기
+            if n < len(pending):
+                shutdown.wait(1)
+
+        print("  - 모든 청크 처리 완료, 텍스트 결합 중...")
+        if checkpoint is not None:
+            return Transcript(checkpoint.joined_text(), checkpoint.joined_segments())
+        return Transcript(
+            " ".join(results[c.index].text for c in chunk_files),
+            [seg for c in chunk_files for seg in results[c.index].segments],
+        )
+
+    # 25MB 이하는 일반 처리
+    print(f"  - 파일 크기: {file_size_mb:.1f}MB (직접 처리)")
+    with open(audio_path, "rb") as audio_file:
+        response = _create_transcription(audio_file, checkpoint.video_id if checkpoint is not None else None)
+    return Transcript(response.text, _segments_of(response))
+
+
+def _transcribe_chunk(chunk: AudioChunk, total: int, checkpoint: ChunkCheckpoint = None) -> Transcript:
+    """청크 하나를 전사하고 체크포인트에 기록한 뒤 청크 파일을 삭제합니다."""
+    chunk_size = os.path.getsize(chunk.path)
+    print(f"  - 청크 {chunk.index + 1}/{total} 처리 중 ({chunk_size / (1024 * 1024):.1f}MB)...")
+
+    with open(chunk.path, "rb") as audio_file:
+        response = _create_transcription(audio_file, checkpoint.video_id if checkpoint is not None else None,
+                                         chunk.index, total, chunk.start_ms / 1000)
+    result = Transcript(response.text, _segments_of(response, chunk.start_ms / 1000))
+    if checkpoint is not None:
+        checkpoint.record(chunk.index, result.text, chunk_size, result.segments)
+    # 기록이 끝난 청크만 삭제 (실패한 청크 파일은 재시도용으로 보존)
+    os.remove(chunk.path)
+    return result
+
+
+def transcribe_segmented(video_id: str, checkpoint: ChunkCheckpoint, plan: "probe.ChunkPlan", sleep: tuple = None) -> Transcript:
+    """계획된 구간을 하나씩 내려받으며, 받은 청크는 바로 Whisper로 보냅니다.
+
+    다운로드(메인 스레드)와 전사(백그라운드 스레드 1개)가 겹쳐서 진행됩니다.
+    청크 경계는 split_audio_file 과 같아 파일 분할 방식의 체크포인트와 호환됩니다.
+    """
+    base = os.path.join(checkpoint.dir, video_id)
+    chunks = [AudioChunk(i, f"{base}.mp3_chunk_{i}.mp3", start, end) for i, start, end in plan.chunks]
+    if checkpoint.chunk_minutes != CHUNK_MINUTES or checkpoint.total != len(chunks):
+        checkpoint.plan(CHUNK_MINUTES, chunks)
+    done = checkpoint.done_indices()
+    pending = [c for c in chunks if c.index not in done]
+    if done:
+        print(f"  - 체크포인트 발견: {len(done)}/{len(chunks)}개 청크 완료, 남은 청크만 처리")
+
+    with ThreadPoolExecutor(max_workers=1) as stt:
+        futures = []
+        for chunk in pending:
+            if shutdown.requested():
+                break
+            if not os.path.exists(chunk.path):
+                # yt-dlp 출력 템플릿은 확장자를 제외한 경로
+                download_audio(video_id, chunk.path[:-len(".mp3")], sleep, chunk.start_ms, chunk.end_ms)
+                print(f"  - ✅ 구간 {chunk.index + 1}/{len(chunks)} 다운로드 완료")
+            futures.append(stt.submit(_transcribe_chunk, chunk, len(chunks), checkpoint))
+            # 앞선 전사가 실패했으면 더 내려받지 않음
+            failed = [f for f in futures if f.done() and f.exception()]
+            if failed:
+                break
+        # 이미 보낸 전사는 끝까지 기다림 (과금된 응답을 버리지 않도록)
+        for future in futures:
+            future.result()
+    if len(futures) < len(pending):
+        shutdown.check()
+
+    return Transcript(checkpoint.joined_text(), checkpoint.joined_segments())
+
+
+def _plan_chunks(audio_path: str, checkpoint: ChunkCheckpoint, done: set) -> list:
+    """청크 목록을 만듭니다. 남은 청크 파일이 모두 디스크에 있으면 오디오를 다시 디코딩하지 않습니다."""
+    if checkpoint is not None and checkpoint.chunk_minutes == CHUNK_MINUTES and checkpoint.total:
+        chunks = [
+            AudioChunk(c["index"], f"{audio_path}_chunk_{c['index']}.mp3", c["start_ms"], c["end_ms"])
+            for c in checkpoint.planned_chunks()
+        ]
+        if all(c.index in done or os.path.exists(c.path) for c in chunks):
+            return chunks
+    chunks = split_audio_file(audio_path, chunk_duration_minutes=CHUNK_MINUTES, skip=done)
+    if checkpoint is not None:
+        checkpoint.plan(CHUNK_MINUTES, chunks)
+    return chunks
+
+
+def replay_transcript(video_id: str) -> Transcript:
+    """캐시된 Whisper 응답만으로 대본과 구간을 다시 만듭니다. (다운로드/API 호출 없음)"""
+    chunks = whisper_cache.replay_chunks(video_id)
+    return Transcript(
+        " ".join(response.text for _, response in chunks),
+        [seg for offset_s, response in chunks for seg in _segments_of(response, offset_s)],
+    )
+
+
+def replay(video_ids: list = None) -> int:
+    """캐시된 영상(기본: 전부)의 대본/구간을 다시 만들어 DB 에 저장합니다. 저장한 영상 수를 반환."""
+    video_ids = video_ids or whisper_cache.cached_videos()
+    done = 0
+    for video_id in video_ids:
+        try:
+            transcript = replay_transcript(video_id)
+        except whisper_cache.CacheMiss as e:
+            print(f"  - ⚠️ {e}")
+            continue
+        db.update_transcript(video_id, transcript.text, segments=transcript.segments)
+        done += 1
+    return done
+
+
+def process_video(video_id: str, sleep: tuple = None, segmented: bool = False) -> str:
+    """영상 하나의 오디오를 받아 대본을 추출하고 DB에 저장합니다.
+
+    작업 디렉토리와 청크 체크포인트는 DB 저장이 끝난 뒤에만 삭제합니다.
+    실패하면 그대로 남아 다음 실행에서 다운로드/완료된 청크를 건너뜁니다.
+    segmented=True 이면 먼저 길이를 조회해 청크를 계획하고, 분할이 필요한
+    영상은 구간 다운로드와 전사를 겹쳐서 진행합니다.
+    """
+    checkpoint = ChunkCheckpoint(video_id)
+    audio_path = os.path.join(checkpoint.dir, video_id)
+    downloaded_file = f"{audio_path}.mp3"
+
+    plan = None
+    if whisper_cache.mode() == "replay":
+        transcript = replay_transcript(video_id)
+        db.update_transcript(video_id, transcript.text, segments=transcript.segments)
+        print(f"  - ♻️ 캐시에서 대본 재구성 ({video_id}, {len(transcript.text)} 자)")
+        return transcript.text
+
+    if segmented and not os.path.exists(downloaded_file):
+        info = probe.probe_video(video_id)
+        plan = probe.plan_chunks(info.duration_seconds)
+        print(f"  - 🔎 사전 조회: {probe.describe(plan)}")
+        if info.duration_seconds:
+            db.update_duration(video_id, info.duration_seconds)
+
+    if plan is not None and plan.needs_split:
+        transcript = transcribe_segmented(video_id, checkpoint, plan, sleep)
+    else:
+        if os.path.exists(downloaded_file):
+            print(f"  - ♻️ 이전 실행의 오디오 재사용 ({video_id})")
+        else:
+            downloaded_file = download_audio(video_id, audio_path, sleep)
+            print(f"  - ✅ 오디오 다운로드 완료 ({video_id})")
+        transcript = transcribe_audio(downloaded_file, checkpoint)
+    print(f"  - ✅ 대본 추출 완료 ({video_id}, 길이: {len(transcript.text)} 자, 구간 {len(transcript.segments)}개)")
+
+    db.update_transcript(video_id, transcript.text, segments=transcript.segments)
+    print(f"  - ✅ DB 업데이트 완료 ({video_id})")
+
+    # 임시 파일/체크포인트 삭제
+    checkpoint.clear()
+    return transcript.text
+
+
+def acquire_captions(videos: list, workers: int = 8) -> list:
+    """대기열 전체에 대해 자막을 동시에 조회해 저장하고, 자막으로 해결하지 못한 영상만 반환합니다."""
+    from jtbc import captions
+
+    def fetch(video):
+        if shutdown.requested():
+            return video
+        result = captions.fetch_best_captions(video['video_id'], video.get('duration_seconds'))
+        if result is None:
+            return video
+        db.update_transcript(video['video_id'], result.text, segments=result.segments, source="caption")
+        print(f"  - 📝 {result.kind} 자막으로 대본 저장 ({video['video_id']}, {len(result.text)} 자, coverage={result.coverage:.2f})")
+        return None
+
+    misses = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for video, future in [(v, pool.submit(fetch, v)) for v in videos]:
+            try:
+                miss = future.result()
+            except Exception as e:
+                print(f"  - 자막 처리 오류 ({video['video_id']}): {e}")
+                miss = video
+            if miss is not None:
+                misses.append(miss)
+    print(f"자막으로 {len(videos) - len(misses)}개 해결, STT 필요 {len(misses)}개")
+    return misses
+
+
+def run(since: str = None, until: str = None, start_index: int = 1, workers: int = 1, sleep: tuple = None,
+        order: str = scheduler.DEFAULT_POLICY, boost_hours: float = scheduler.DEFAULT_BOOST_HOURS,
+        segmented: bool = False, captions: str = "first", caption_workers: int = 8):
+    """대본이 없는 영상을 조회해 STT를 수행합니다.
+
+    since/until: 게시일 범위 (YYYY-MM-DD, 양끝 포함)
+    start_index: 정렬된 대기열(자막 처리 전)에서 시작할 순번 (1부터, 재개용). 진행 로그의 [N/전체] 가 같은 순번
+    workers: 동시에 처리할 영상 수
+    sleep: 영상 간 대기 범위(초). None이면 설정값 사용
+    order/boost_hours: 대기열 정렬 정책 (기본 balanced, TRANSCRIBE_ORDER. CLI 의 --resume 은 id 순. jtbc.scheduler 참고)
+    segmented: 사전 조회 후 긴 영상은 구간 다운로드 + 전사 파이프라인 사용
+    captions: "first"(자막 우선, 실패 시 STT) | "only"(자막만) | "off"(항상 STT)
+    """
+    sleep = sleep or config.sleep_range()
+    replaying = whisper_cache.mode() == "replay"
+    if replaying:
+        # 캐시만 읽으므로 YouTube 대기와 자막 조회가 필요 없음
+        sleep, captions = (0, 0), "off"
+    # 작업자 수에 맞춰 커넥션 풀 크기 지정 (클라이언트 생성 전)
+    openai_client.configure(workers)
+
+    videos = db.get_videos_without_transcript(since=since, until=until)
+    if not videos:
+        print("대본이 필요한 영상이 없습니다.")
+        return
+    videos = scheduler.order_videos(videos, order, boost_hours)
+    # 자막으로 해결된 영상이 빠져도 로그 번호가 --start-index 와 같은 기준이 되도록 원래 순번을 기억
+    positions = {video['video_id']: idx for idx, video in enumerate(videos, 1)}
+
+    total = len(videos)
+    if start_index > 1:
+        videos = videos[start_index - 1:]
+        print(f"총 {len(videos)}개의 영상 대본을 추출합니다. (전체 {total}개 중 {start_index}번째부터)")
+    else:
+        print(f"총 {total}개의 영상 대본을 추출합니다.")
+
+    # Ctrl-C/SIGTERM: 새 영상은 받지 않고 진행 중인 영상만 마무리 (완료 청크는 체크포인트에 남음)
+    with shutdown.graceful(on_force=(usage.flush, metrics.flush)):
+        # 1단계: 자막이 있는 영상은 다운로드 없이 처리
+        if captions != "off":
+            videos = acquire_captions(videos, caption_workers)
+            if captions == "only" or not videos or shutdown.requested():
+                return
+
+        # OpenAI 인증을 먼저 검증하여 대량 처리 전에 즉시 실패
+        if not replaying:
+            validate_openai_credentials()
+        print(f"⏱️ 요청 간 대기 시간: {sleep[0]}~{sleep[1]}초 | 작업자: {workers} | 정렬: {order} (신규 {boost_hours:g}시간 우선)")
+        print(f"예상 오디오 총 길이: {scheduler.estimate_hours(videos):.1f}시간")
+
+        stop = threading.Event()
+
+        def worker(idx: int, video: dict):
+            if stop.is_set() or shutdown.requested():
+                return
+            video_id = video['video_id']
+            published_at = video.get('published_at') or 'N/A'
+            print(f"\n[{idx}/{total}] 영상 {video_id} ({published_at}) 처리 중...")
+            try:
+                with metrics.span("process_video", video_id=video_id), usage.tag(video_id=video_id):
+                    process_video(video_id, sleep, segmented)
+                metrics.inc("jtbc_videos_processed_total", result="ok")
+            except shutdown.Interrupted as e:
+                metrics.inc("jtbc_videos_processed_total", result="interrupted")
+                print(f"  - ⏸️ {e} ({video_id}): 완료된 청크는 체크포인트에 남아 다음 실행에서 이어집니다.")
+                return
+            except usage.BudgetExceeded as e:
+                print(f"  - 💸 {e}. 남은 영상은 처리하지 않습니다.")
+                stop.set()
+                return
+            except AuthError as e:
+                metrics.inc("jtbc_videos_processed_total", result="auth_error")
+                print(f"  - ❌ 오류 발생 ({video_id}): {e}")
+                print("  - 인증 오류로 작업을 중단합니다.")
+                stop.set()
+                return
+            except Exception as e:
+                metrics.inc("jtbc_videos_processed_total", result="bot_block" if is_bot_block(e) else "error")
+                print(f"  - ❌ 오류 발생 ({video_id}): {e}")
+                if is_bot_block(e):
+                    # 봇 차단 오류 시 더 긴 대기
+                    wait_time = random.uniform(30, 60)
+                    print(f"  - ⚠️ 봇 차단 감지! {wait_time:.0f}초 대기 후 다음 영상으로...")
+                    shutdown.wait(wait_time)
+                    return
+            # 각 영상 사이 대기 (봇 차단/레이트리밋 방지). 종료 요청 시 바로 깨어남
+            shutdown.wait(random.uniform(*sleep))
+
+        if workers <= 1:
+            for video in videos:
+                worker(positions[video['video_id']], video)
+                if stop.is_set() or shutdown.requested():
+                    break
+        else:
+            # 대기열의 나머지 작업은 종료 요청 후 시작되면 바로 반환되고, 진행 중인 영상만 끝까지 처리됨
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for video in videos:
+                    pool.submit(worker, positions[video['video_id']], video)
+
+        metrics.flush()
+        usage.flush()
+        print(f"사용량: {usage.describe_totals()}")
+        if shutdown.requested():
+            print("\n⏸️ 종료 요청으로 중단되었습니다. 다시 실행하면 남은 영상과 청크부터 이어서 처리합니다.")
+        elif stop.is_set():
+            print("\n⛔ 인증 오류 또는 예산 상한으로 중단되었습니다.")
+        else:
+            print("\n✅ 모든 영상 처리 완료!")
@@ -0,0 +1,75 @@
+"""OpenAI 호출용 공유 HTTP 전송 계층.
+
+Whisper 업로드와 chat completions 가 같은 설정의 httpx 클라이언트를 사용합니다.
+- 연결/읽기/쓰기/풀 대기 타임아웃을 각각 지정 (죽은 소켓에서 105분씩 멈추지 않도록)
+- 작업자 수에 맞춘 커넥션 풀 크기와 keep-alive 재사용
+- h2 패키지가 설치돼 있으면 HTTP/2 멀티플렉싱 사용
+"""
+import importlib.util
+import os
+
+# 타임아웃(초). Whisper 응답은 25MB 청크 기준 수 분이면 충분하므로 읽기 기본 10분
+CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "600"))
+WRITE_TIMEOUT = float(os.getenv("OPENAI_WRITE_TIMEOUT", "120"))
+POOL_TIMEOUT = float(os.getenv("OPENAI_POOL_TIMEOUT", "30"))
+
+# 풀 크기. 미지정 시 동시 작업자 수 기준으로 계산
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "0"))
+KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+HTTP2 = os.getenv("OPENAI_HTTP2", "1").strip().lower() not in ("0", "false", "no", "off")
+
+# SDK 재시도 횟수 (429/5xx/연결 오류)
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+
+
+def http2_available() -> bool:
+    """HTTP/2 사용 가능 여부 (httpx[http2] 의 h2 패키지 필요)."""
+    return HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def build_timeout():
+    import httpx
+
+    return httpx.Timeout(connect=CONNECT_TIMEOUT, read=READ_TIMEOUT, write=WRITE_TIMEOUT, pool=POOL_TIMEOUT)
+
+
+def build_limits(concurrency: int = 1):
+    """동시 요청 수에 맞춘 커넥션 풀 한도를 만듭니다."""
+    import httpx
+
+    # 작업자당 1개 + 키 검증/재시도 여유분. HTTP/2는 한 연결에 여러 스트림을 싣기 때문에 적게 잡아도 됨
+    max_connections = MAX_CONNECTIONS or max(4, concurrency + 2)
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def build_http_client(concurrency: int = 1, trust_env: bool = False):
+    """튜닝된 httpx.Client 를 생성합니다."""
+    import httpx
+
+    kwargs = {
+        "timeout": build_timeout(),
+        "limits": build_limits(concurrency),
+        "http2": http2_available(),
+        "trust_env": trust_env,
+    }
+    try:
+        return httpx.Client(**kwargs)
+    except TypeError:
+        # 일부 오래된/특정 버전은 http2/trust_env 인자를 지원하지 않음
+        kwargs.pop("http2")
+        kwargs.pop("trust_env")
+        return httpx.Client(**kwargs)
+
+
+def describe(concurrency: int = 1) -> str:
+    """현재 전송 설정 요약 (로그용)."""
+    limits = build_limits(concurrency)
+    return (
+        f"http2={'on' if http2_available() else 'off'} | pool={limits.max_connections} | "
+        f"timeout(connect/read/write/pool)={CONNECT_TIMEOUT:g}/{READ_TIMEOUT:g}/{WRITE_TIMEOUT:g}/{POOL_TIMEOUT:g}s"
+    )
@@ -0,0 +1,187 @@
+"""Whisper/chat/임베딩 호출 사용량 원장과 예산 상한.
+
+호출마다 모델, 토큰, 오디오 길이, 지연, 재시도 횟수, 결과, 비용을 기록합니다.
+기록은 프로세스 안에서 바로 합산되고(예산 확인용), api_usage 테이블에는 FLUSH_ROWS 개씩 모아 씁니다.
+
+예산 (환경변수 또는 set_budget):
+    JTBC_BUDGET_USD=5            이번 실행 누적 비용이 넘으면 다음 호출 전에 BudgetExceeded
+    JTBC_BUDGET_USD_PER_HOUR=1   최근 1시간 비용이 넘으면 다음 호출을 그만큼 늦춤 (속도 제한)
+
+가격은 환경변수로 조정합니다. (기본: whisper-1 분당 $0.006, gpt-4o-mini 입력/출력 100만 토큰당 $0.15/$0.60,
+임베딩 100만 토큰당 $0.02)
+"""
+import atexit
+import contextvars
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+from jtbc import metrics, shutdown
+
+WHISPER_USD_PER_MINUTE = float(os.getenv("WHISPER_USD_PER_MINUTE", "0.006"))
+CHAT_USD_PER_1M_INPUT = float(os.getenv("CHAT_USD_PER_1M_INPUT", "0.15"))
+CHAT_USD_PER_1M_OUTPUT = float(os.getenv("CHAT_USD_PER_1M_OUTPUT", "0.60"))
+EMBEDDING_USD_PER_1M = float(os.getenv("EMBEDDING_USD_PER_1M", "0.02"))
+BUDGET_USD = float(os.getenv("JTBC_BUDGET_USD", "0"))
+BUDGET_USD_PER_HOUR = float(os.getenv("JTBC_BUDGET_USD_PER_HOUR", "0"))
+FLUSH_ROWS = 50
+
+USAGE_COLUMNS = ("run_id", "kind", "model", "video_id", "items", "prompt_tokens", "completion_tokens",
+                 "audio_seconds", "latency_ms", "retries", "outcome", "cost_usd")
+
+RUN_ID = uuid.uuid4().hex[:12]
+
+
+class BudgetExceeded(RuntimeError):
+    """예산 상한에 도달. 추가 호출은 비용만 늘리므로 실행을 멈춥니다."""
+
+
+_lock = threading.Lock()
+_pending = []
+_totals = {}          # kind -> {"calls", "errors", "retries", "prompt_tokens", ...}
+_recent = deque()     # (시각, 비용) 최근 1시간
+_spent = 0.0
+_budget_usd = BUDGET_USD
+_budget_per_hour = BUDGET_USD_PER_HOUR
+_tags = contextvars.ContextVar("jtbc_usage_tags", default={})
+_atexit_registered = False
+
+
+def chat_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    return (prompt_tokens * CHAT_USD_PER_1M_INPUT + completion_tokens * CHAT_USD_PER_1M_OUTPUT) / 1_000_000
+
+
+def embedding_cost(tokens: int) -> float:
+    return tokens * EMBEDDING_USD_PER_1M / 1_000_000
+
+
+def whisper_cost(audio_seconds: float) -> float:
+    return audio_seconds / 60 * WHISPER_USD_PER_MINUTE
+
+
+@contextmanager
+def tag(**values):
+    """이 블록 안의 호출 기록에 video_id 등을 붙입니다. (같은 스레드 안에서만 유효)"""
+    token = _tags.set({**_tags.get(), **values})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+def set_budget(total_usd: float = None, per_hour_usd: float = None):
+    global _budget_usd, _budget_per_hour
+    with _lock:
+        if total_usd is not None:
+            _budget_usd = total_usd
+        if per_hour_usd is not None:
+            _budget_per_hour = per_hour_usd
+
+
+def spent() -> float:
+    return _spent
+
+
+def check_budget():
+    """호출 전에 부릅니다. 총액 상한이면 예외, 시간당 상한이면 창이 비워질 때까지 대기합니다."""
+    if _budget_usd and _spent >= _budget_usd:
+        raise BudgetExceeded(f"예산 상한 도달: ${_spent:.4f} / ${_budget_usd:.2f}")
+    while _budget_per_hour:
+        with _lock:
+            now = time.time()
+            while _recent and _recent[0][0] < now - 3600:
+                _recent.popleft()
+            hourly = sum(cost for _, cost in _recent)
+            wait = _recent[0][0] + 3600 - now if hourly >= _budget_per_hour and _recent else 0
+        if wait <= 0:
+            return
+        print(f"  - 💸 시간당 예산 ${_budget_per_hour:.2f} 도달 (최근 1시간 ${hourly:.4f}), {wait:.0f}초 대기")
+        metrics.inc("jtbc_budget_throttle_total")
+        if shutdown.wait(min(wait, 60)):
+            raise shutdown.Interrupted("종료 요청으로 예산 대기 중단")
+
+
+def record(kind: str, model: str, latency_s: float, outcome: str = "ok", retries: int = 0, items: int = 0,
+           prompt_tokens: int = 0, completion_tokens: int = 0, audio_seconds: float = 0.0):
+    """호출 하나를 기록하고 비용을 반환합니다."""
+    global _spent, _atexit_registered
+    if kind == "embedding":
+        cost = embedding_cost(prompt_tokens)
+    else:
+        cost = chat_cost(prompt_tokens, completion_tokens) + whisper_cost(audio_seconds)
+    row = (RUN_ID, kind, model, _tags.get().get("video_id"), items, prompt_tokens, completion_tokens,
+           round(audio_seconds, 2), round(latency_s * 1000, 1), retries, outcome, cost)
+    with _lock:
+        _spent += cost
+        _recent.append((time.time(), cost))
+        t = _totals.setdefault(kind, dict.fromkeys(
+            ("calls", "errors", "retries", "items", "prompt_tokens", "completion_tokens", "audio_seconds",
+             "latency_s", "cost_usd"), 0))
+        t["calls"] += 1
+        t["errors"] += outcome != "ok"
+        t["retries"] += retries
+        t["items"] += items
+        t["prompt_tokens"] += prompt_tokens
+        t["completion_tokens"] += completion_tokens
+        t["audio_seconds"] += audio_seconds
+        t["latency_s"] += latency_s
+        t["cost_usd"] += cost
+        _pending.append(row)
+        flush_now = len(_pending) >= FLUSH_ROWS
+        if not _atexit_registered:
+            atexit.register(flush)
+            _atexit_registered = True
+    metrics.inc("jtbc_api_cost_usd_total", cost, kind=kind)
+    metrics.inc("jtbc_api_calls_total", kind=kind, outcome=outcome)
+    if prompt_tokens or completion_tokens:
+        metrics.inc("jtbc_api_tokens_total", prompt_tokens, kind=kind, type="prompt")
+        metrics.inc("jtbc_api_tokens_total", completion_tokens, kind=kind, type="completion")
+    if audio_seconds:
+        metrics.inc("jtbc_audio_seconds_total", audio_seconds)
+    if flush_now:
+        flush()
+    return cost
+
+
+def totals() -> dict:
+    """이번 프로세스의 kind 별 합계."""
+    with _lock:
+        return {kind: dict(t) for kind, t in _totals.items()}
+
+
+def flush():
+    """쌓인 기록을 api_usage 테이블에 씁니다. DB 가 없거나 실패하면 다음 flush 때 다시 시도합니다."""
+    from jtbc import config, db
+
+    with _lock:
+        rows = list(_pending)
+        _pending.clear()
+    if not rows:
+        return
+    if not config.DATABASE_URL:
+        return
+    try:
+        db.get_storage().insert_usage(rows)
+    except Exception as e:
+        print(f"경고: 사용량 기록 저장 실패 ({len(rows)}건): {e}")
+        with _lock:
+            _pending[:0] = rows
+
+
+def describe_totals() -> str:
+    parts = []
+    for kind, t in sorted(totals().items()):
+        detail = (f"{t['audio_seconds'] / 60:.1f}분" if kind == "whisper"
+                  else f"토큰 {t['prompt_tokens']:,}+{t['completion_tokens']:,}")
+        parts.append(f"{kind} {t['calls']}회 {detail} ${t['cost_usd']:.4f}")
+    return " | ".join(parts) or "호출 없음"
+
+
+metrics.describe("jtbc_api_cost_usd_total", "Estimated OpenAI spend in USD")
+metrics.describe("jtbc_api_calls_total", "OpenAI calls by kind and outcome")
+metrics.describe("jtbc_api_tokens_total", "Chat tokens by kind and type")
+metrics.describe("jtbc_audio_seconds_total", "Audio seconds transcribed by Whisper")
+metrics.describe("jtbc_budget_throttle_total", "Waits caused by the hourly budget cap")
@@ -0,0 +1,161 @@
+"""Whisper 원본 응답 캐시와 재생(replay).
+
+verbose_json 응답(구간, 단어 타임스탬프 포함)을 gzip 으로 저장합니다.
+키는 오디오 바이트의 SHA-256 과 요청 파라미터(모델, 언어, 형식, 타임스탬프 단위)의 해시라서
+같은 청크를 같은 설정으로 다시 보내면 API 를 부르지 않고 저장된 응답을 씁니다.
+
+    .jtbc_state/whisper_cache/ab/<key>.json.gz     응답 원문 + 메타데이터
+    .jtbc_state/whisper_cache/videos/<video_id>.json   영상의 청크 순서와 오프셋 -> 응답 키
+
+영상 목록(manifest)이 있으므로 오디오 없이도 대본과 구간을 다시 만들 수 있습니다. (python -m jtbc replay)
+모드 (JTBC_WHISPER_CACHE 또는 transcribe --whisper-cache):
+    on      캐시에 있으면 재사용, 없으면 호출 후 저장 (기본)
+    off     캐시를 읽지도 쓰지도 않음
+    replay  캐시만 사용. 다운로드/API 호출 없이 manifest 로 대본을 재구성하고, 없으면 CacheMiss
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from jtbc import config, metrics
+
+MODES = ("on", "off", "replay")
+_mode = os.getenv("JTBC_WHISPER_CACHE", "on")
+_lock = threading.Lock()
+
+
+class CacheMiss(RuntimeError):
+    """replay 모드에서 캐시에 없는 청크/영상."""
+
+
+def set_mode(mode: str):
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"알 수 없는 캐시 모드: {mode} (가능: {', '.join(MODES)})")
+    _mode = mode
+
+
+def mode() -> str:
+    return _mode
+
+
+def cache_dir():
+    return config.STATE_DIR / "whisper_cache"
+
+
+def _entry_path(key: str):
+    return cache_dir() / key[:2] / f"{key}.json.gz"
+
+
+def _manifest_path(video_id: str):
+    return cache_dir() / "videos" / f"{video_id}.json"
+
+
+def audio_digest(audio_file) -> str:
+    """열린 오디오 파일의 SHA-256. 읽은 뒤 위치를 처음으로 되돌립니다."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: audio_file.read(1024 * 1024), b""):
+        digest.update(block)
+    audio_file.seek(0)
+    return digest.hexdigest()
+
+
+def cache_key(audio_sha256: str, params: dict) -> str:
+    raw = audio_sha256 + "|" + json.dumps(params, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _as_response(value):
+    # SDK 응답 객체처럼 속성으로 접근 (response.text, seg.start ...)
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _as_response(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_as_response(v) for v in value]
+    return value
+
+
+def _write_atomic(path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load(key: str):
+    """캐시된 응답 객체 또는 None."""
+    if _mode == "off":
+        return None
+    try:
+        with gzip.open(_entry_path(key), "rb") as f:
+            entry = json.loads(f.read())
+    except (OSError, ValueError):
+        metrics.inc("jtbc_whisper_cache_total", result="miss")
+        return None
+    metrics.inc("jtbc_whisper_cache_total", result="hit")
+    return _as_response(entry["response"])
+
+
+def store(key: str, params: dict, audio_sha256: str, audio_bytes: int, response_body: bytes):
+    """API 응답 원문(JSON 바이트)을 저장합니다."""
+    if _mode == "off":
+        return
+    entry = {"key": key, "params": params, "audio_sha256": audio_sha256, "audio_bytes": audio_bytes,
+             "created_at": time.time(), "response": json.loads(response_body)}
+    _write_atomic(_entry_path(key), gzip.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8")))
+
+
+def remember(video_id: str, key: str, index: int, total: int, offset_s: float):
+    """영상의 index 번째 청크가 어떤 응답인지 manifest 에 기록합니다. 청크 수가 바뀌면 새로 시작."""
+    if _mode == "off" or not video_id:
+        return
+    path = _manifest_path(video_id)
+    with _lock:
+        manifest = read_manifest(video_id)
+        if manifest is None or manifest.get("total") != total:
+            manifest = {"video_id": video_id, "total": total, "chunks": {}}
+        manifest["chunks"][str(index)] = {"key": key, "offset_s": offset_s}
+        _write_atomic(path, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+def read_manifest(video_id: str):
+    try:
+        with open(_manifest_path(video_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def cached_videos() -> list:
+    root = cache_dir() / "videos"
+    if not root.exists():
+        return []
+    return sorted(p.stem for p in root.glob("*.json"))
+
+
+def replay_chunks(video_id: str) -> list:
+    """[(offset_s, 응답)] 을 청크 순서대로 반환합니다. 빠진 청크가 있으면 CacheMiss."""
+    manifest = read_manifest(video_id)
+    if manifest is None:
+        raise CacheMiss(f"캐시된 Whisper 응답이 없습니다: {video_id}")
+    chunks = []
+    for index in range(manifest["total"]):
+        item = manifest["chunks"].get(str(index))
+        response = load(item["key"]) if item else None
+        if response is None:
+            raise CacheMiss(f"{video_id} 청크 {index + 1}/{manifest['total']} 응답이 캐시에 없습니다.")
+        chunks.append((item["offset_s"], response))
+    return chunks
+
+
+def stats() -> dict:
+    """캐시 항목 수, 압축 크기, manifest 수."""
+    files = list(cache_dir().glob("??/*.json.gz")) if cache_dir().exists() else []
+    return {"entries": len(files), "bytes": sum(f.stat().st_size for f in files), "videos": len(cached_videos())}
+
+
+metrics.describe("jtbc_whisper_cache_total", "Whisper response cache lookups by result")
@@ -0,0 +1,190 @@
+"""asyncio 기반 YouTube Data API v3 클라이언트.
+
+수집 경로에서 쓰는 엔드포인트(playlistItems, commentThreads, comments, videos)만 다룹니다.
+googleapiclient 의 동기 .execute() 대신 하나의 httpx.AsyncClient 로 요청을 동시에 보냅니다.
+
+- 커넥션 풀 + HTTP/2(h2 설치 시) + gzip 응답
+- fields= 부분 응답으로 필요한 필드만 수신
+- 5xx / 429 / 403(rateLimitExceeded) 는 지수 백오프 + full jitter 로 재시도, quotaExceeded 는 즉시 실패
+- base_url 을 바꿔 jtbc.fakes.FakeYouTubeServer 같은 로컬 서버로 테스트 가능
+"""
+import asyncio
+import os
+import random
+from typing import NamedTuple
+
+from jtbc import config, transport
+
+BASE_URL = os.getenv("YOUTUBE_API_BASE_URL", "https://www.googleapis.com/youtube/v3")
+MAX_RETRIES = int(os.getenv("YOUTUBE_API_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("YOUTUBE_API_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = 30.0
+
+# 재시도하면 풀리는 403 사유 (quotaExceeded 는 하루 한도라 재시도 무의미)
+RETRYABLE_403_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+# fields= 부분 응답 마스크 (googleapiclient 호출에도 그대로 사용)
+COMMENT_THREAD_FIELDS = (
+    "nextPageToken,items/snippet/topLevelComment(id,snippet(authorDisplayName,textDisplay,publishedAt,likeCount))"
+)
+# snippet.publishedAt 은 재생목록에 추가된 시각이라 업로드 시각은 contentDetails.videoPublishedAt 을 씀
+PLAYLIST_ITEM_FIELDS = "nextPageToken,items(snippet/title,contentDetails(videoId,videoPublishedAt))"
+SEARCH_FIELDS = "nextPageToken,items(id/videoId,snippet(publishedAt,title))"
+VIDEO_FIELDS = "items(id,contentDetails/duration,statistics(viewCount,commentCount))"
+COMMENT_FIELDS = "nextPageToken,items(id,snippet(parentId,authorDisplayName,textDisplay,publishedAt,likeCount))"
+
+
+class Comment(NamedTuple):
+    """댓글 1건. 딕셔너리 대신 튜플로 보관해 대량 수집 시 메모리를 줄입니다.
+
+    필드 순서가 comments 테이블 INSERT 컬럼 순서(video_id 제외)와 같습니다.
+    comment_id 는 재수집 시 중복 없이 upsert 하는 데 씁니다.
+    """
+    author: str
+    text: str
+    published_at: str
+    like_count: int
+    comment_id: str = None
+
+
+def parse_comment_threads(response: dict) -> list:
+    """commentThreads 응답 -> [Comment]."""
+    comments = []
+    for item in response.get("items", ()):
+        top = item["snippet"]["topLevelComment"]
+        snippet = top["snippet"]
+        comments.append(Comment(snippet['authorDisplayName'], snippet['textDisplay'],
+                                snippet['publishedAt'], snippet['likeCount'], top.get('id')))
+    return comments
+
+
+class YouTubeAPIError(RuntimeError):
+    def __init__(self, status_code: int, reason: str, message: str):
+        super().__init__(f"YouTube API {status_code} {reason}: {message}")
+        self.status_code = status_code
+        self.reason = reason
+
+
+def _error_reason(payload) -> str:
+    try:
+        return payload["error"]["errors"][0]["reason"]
+    except (KeyError, IndexError, TypeError):
+        return ""
+
+
+def is_retryable(status_code: int, reason: str) -> bool:
+    return status_code >= 500 or status_code == 429 or (status_code == 403 and reason in RETRYABLE_403_REASONS)
+
+
+class AsyncYouTubeClient:
+    """사용법:
+
+        async with AsyncYouTubeClient(api_key) as yt:
+            comments = await yt.video_comments("VIDEO_ID", max_comments=100)
+    """
+
+    def __init__(self, api_key: str = None, base_url: str = None, concurrency: int = 16,
+                 max_retries: int = MAX_RETRIES):
+        self.api_key = api_key or config.GOOGLE_CLOUD_API_KEY
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._concurrency = concurrency
+        self._client = None
+        self.requests = 0
+        self.retries = 0
+
+    async def __aenter__(self):
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            timeout=transport.build_timeout(),
+            limits=transport.build_limits(self._concurrency),
+            http2=transport.http2_available(),
+            # Google API 는 UA 에 "gzip" 이 있어야 압축 응답을 보냄
+            headers={"Accept-Encoding": "gzip", "User-Agent": "jtbc-2025 (gzip)"},
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+
+    async def get(self, endpoint: str, **params) -> dict:
+        """GET 요청 1회 (재시도 포함). None 값 파라미터는 제외합니다."""
+        query = {k: v for k, v in params.items() if v is not None}
+        query["key"] = self.api_key
+        url = f"{self.base_url}/{endpoint}"
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                self.requests += 1
+                try:
+                    response = await self._client.get(url, params=query)
+                except Exception as e:
+                    # 연결 오류/타임아웃도 재시도 대상
+                    status_code, reason, payload = 0, type(e).__name__, None
+                else:
+                    if response.status_code == 200:
+                        return response.json()
+                    try:
+                        payload = response.json()
+                    except ValueError:
+                        payload = None
+                    status_code, reason = response.status_code, _error_reason(payload)
+
+            if (status_code and not is_retryable(status_code, reason)) or attempt >= self.max_retries:
+                message = (payload or {}).get("error", {}).get("message", "") if isinstance(payload, dict) else ""
+                raise YouTubeAPIError(status_code, reason, message)
+            attempt += 1
+            self.retries += 1
+            # full jitter: [0, min(cap, base * 2^attempt)]
+            await asyncio.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt))))
+
+    async def playlist_items(self, playlist_id: str, page_token: str = None, fields: str = PLAYLIST_ITEM_FIELDS) -> dict:
+        return await self.get("playlistItems", part="snippet,contentDetails", playlistId=playlist_id,
+                              maxResults=50, pageToken=page_token, fields=fields)
+
+    async def comment_threads(self, video_id: str, page_token: str = None, max_results: int = 100,
+                              fields: str = COMMENT_THREAD_FIELDS, order: str = None) -> dict:
+        return await self.get("commentThreads", part="snippet", videoId=video_id, maxResults=max_results,
+                              pageToken=page_token, textFormat="plainText", order=order, fields=fields)
+
+    async def comments(self, parent_id: str, page_token: str = None, fields: str = COMMENT_FIELDS) -> dict:
+        return await self.get("comments", part="snippet", parentId=parent_id, maxResults=100,
+                              pageToken=page_token, textFormat="plainText", fields=fields)
+
+    async def videos(self, video_ids: list, fields: str = VIDEO_FIELDS) -> dict:
+        return await self.get("videos", part="contentDetails,statistics", id=",".join(video_ids), fields=fields)
+
+    async def video_comments(self, video_id: str, max_comments: int = 100) -> list:
+        """영상의 최상위 댓글을 max_comments 개까지 [Comment] 로 가져옵니다."""
+        comments = []
+        page_token = None
+        while len(comments) < max_comments:
+            response = await self.comment_threads(video_id, page_token, min(100, max_comments - len(comments)))
+            comments.extend(parse_comment_threads(response))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+        return comments[:max_comments]
+
+
+async def harvest_comments_async(video_ids: list, max_comments: int = 100, concurrency: int = 16,
+                                 base_url: str = None, api_key: str = None) -> dict:
+    """여러 영상의 댓글을 동시에 수집합니다. 실패한 영상은 빈 목록."""
+    async with AsyncYouTubeClient(api_key, base_url, concurrency) as yt:
+        async def one(video_id):
+            try:
+                return video_id, await yt.video_comments(video_id, max_comments)
+            except YouTubeAPIError as e:
+                print(f"Error fetching comments for {video_id}: {e}")
+                return video_id, []
+
+        results = await asyncio.gather(*(one(v) for v in video_ids))
+        print(f"  - 댓글 요청 {yt.requests}회 (재시도 {yt.retries}회)")
+    return dict(results)
+
+
+def harvest_comments(video_ids: list, max_comments: int = 100, concurrency: int = 16, **kwargs) -> dict:
+    """harvest_comments_async 의 동기 래퍼."""
+    return asyncio.run(harvest_comments_async(video_ids, max_comments, concurrency, **kwargs))
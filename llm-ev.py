@@ -1,127 +1,120 @@
-import os
-import json
-import psycopg2
-from psycopg2.extras import execute_values
-import pandas as pd
-from dotenv import load_dotenv
-from tqdm import tqdm
-from openai import OpenAI
+import argparse
+import sys
 
-load_dotenv()
-OPENAI_API_KEY = os.getenv("openai_api_key")
-DB_URL = os.getenv("SUPABASE_CONNECTION_STRING")
+from jtbc import config, db, metrics, profiles, profiling, shutdown, usage
+from jtbc.scoring import aggregate_timeseries, score_dataframe
 
-client = OpenAI(api_key=OPENAI_API_KEY)
-print(os.getenv("openai_api_key"))
-
-SYSTEM_PROMPT = (
-    "You are a strict JSON generator. For each input text, return:\n"
-    '{"sentiment": -1.0_to_1.0, "fairness": 0.0_to_1.0, "notes": "very brief reason"}\n'
-    "Sentiment: -1 very negative, 0 neutral, +1 very positive.\n"
-    "Fairness: 0 unfair/biased, 1 fully fair/neutral."
-)
+OPENAI_API_KEY = config.OPENAI_API_KEY
+DB_URL = config.DATABASE_URL
 
 def fetch_data(conn):
-    # Comments
-    comments = pd.read_sql(
-        "SELECT text, published_at::date AS dt FROM comments WHERE text IS NOT NULL",
-        conn,
-    )
-    # Transcripts
-    transcripts = pd.read_sql(
-        "SELECT transcript AS text, published_at::date AS dt FROM videos WHERE transcript IS NOT NULL",
-        conn,
-    )
-    return pd.concat([comments, transcripts], ignore_index=True).dropna()
+    # Comments + transcripts as (text, dt)
+    return db.get_storage().fetch_data(conn)
 
-def analyze_batch(texts):
-    joined = "\n---\n".join(texts)
-    prompt = (
-        "For each text separated by --- output a JSON array in order. "
-        "Each element follows the schema above.\n"
-        f"{joined}"
-    )
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": SYSTEM_PROMPT},
-                  {"role": "user", "content": prompt}],
-        temperature=0
-    )
-    content = resp.choices[0].message.content.strip()
-    try:
-        data = json.loads(content)
-        if isinstance(data, dict):  # if single object, wrap
-            data = [data]
-        return data
-    except Exception:
-        return [{"sentiment": 0, "fairness": 0.5, "notes": "parse_error"} for _ in texts]
+def create_table(conn):
+    db.get_storage().create_tables(conn)
 
-def score_dataframe(df, batch_size=10):
-    sentiments, fairnesses, notes = [], [], []
-    for i in tqdm(range(0, len(df), batch_size)):
-        batch = df.iloc[i:i+batch_size]
-        results = analyze_batch(batch["text"].tolist())
-        for res in results:
-            sentiments.append(res.get("sentiment", 0))
-            fairnesses.append(res.get("fairness", 0.5))
-            notes.append(res.get("notes", ""))
-    df = df.iloc[:len(sentiments)].copy()
-    df["sentiment"] = sentiments
-    df["fairness"] = fairnesses
-    df["notes"] = notes
-    return df
+def insert_scores(conn, scored_df, batch_size=500):
+    db.get_storage().insert_scores(scored_df, batch_size, conn)
 
-def aggregate_timeseries(scored_df):
-    return (
-        scored_df.groupby("dt")
-        .agg(sentiment_avg=("sentiment", "mean"),
-             fairness_avg=("fairness", "mean"),
-             n=("text", "count"))
-        .reset_index()
-        .sort_values("dt")
-    )
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="댓글/대본을 LLM으로 스코어링해 llm_scores 에 저장")
+    parser.add_argument("--from-lake", action="store_true",
+                        help="댓글/대본을 로컬 Parquet 스냅샷에서 읽기 (python -m jtbc export)")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="작업을 N개 샤드로 나눠 DB 임대로 분배. 모든 노드에서 같은 명령 실행")
+    parser.add_argument("--shard-by", choices=("row", "date"), default="row", help="샤드 기준: 행 해시(row) 또는 날짜(date)")
+    parser.add_argument("--job", default=None, help="샤드 작업 ID (기본: 프로필 이름 + id)")
+    parser.add_argument("--scoring-profile", default=None,
+                        help=f"스코어링 프로필 (프롬프트/모델/temperature/스키마), 기본 {profiles.DEFAULT_PROFILE}")
+    parser.add_argument("--limit", type=int, default=0,
+                        help="이번 실행에서 최신순으로 최대 N행만 스코어링 (백필을 여러 번에 나눔)")
+    parser.add_argument("--ab", default=None, help="비교용으로 고정 해시 표본을 이 프로필로도 스코어링")
+    parser.add_argument("--ab-fraction", type=float, default=0.05, help="A/B 표본 비율")
+    parser.add_argument("--dedup", type=float, default=0,
+                        help="이 코사인 유사도(예: 0.95) 이상인 유사 중복 텍스트는 LLM 점수 하나를 공유 "
+                             "(먼저 python -m jtbc embed 로 임베딩)")
+    # --profile is handled in __main__
+    return parser.parse_known_args(argv)[0]
 
-def create_table(conn):
-    with conn.cursor() as cur:
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS llm_scores (
-                id SERIAL PRIMARY KEY,
-                dt DATE NOT NULL,
-                text TEXT NOT NULL,
-                sentiment DOUBLE PRECISION,
-                fairness DOUBLE PRECISION,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT NOW()
-            )
-        """)
-    conn.commit()
+def score_local(conn, df, profile):
+    def save(chunk):
+        insert_scores(conn, chunk)
+        usage.flush()
 
-def insert_scores(conn, scored_df, batch_size=500):
-    rows = list(
-        scored_df[["dt", "text", "sentiment", "fairness", "notes"]].itertuples(index=False, name=None)
-    )
-    with conn.cursor() as cur:
-        for i in range(0, len(rows), batch_size):
-            execute_values(
-                cur,
-                "INSERT INTO llm_scores (dt, text, sentiment, fairness, notes) VALUES %s",
-                rows[i:i+batch_size],
-            )
-    conn.commit()
+    scored = score_dataframe(df, sink=save, profile=profile)
+    if len(scored) < len(df):
+        print(f"{len(df)}행 중 {len(scored)}행에서 중단했습니다. 다시 실행하면 이어서 처리합니다.")
+    return scored
 
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"OpenAI API 키: {config.mask_key(OPENAI_API_KEY)}")
     if not OPENAI_API_KEY or not DB_URL:
-        raise RuntimeError("Missing openai_api_key or SUPABASE_CONNECTION_STRING in .env")
-    with psycopg2.connect(DB_URL) as conn:
+        raise RuntimeError(".env 에 openai_api_key 또는 SUPABASE_CONNECTION_STRING(또는 JTBC_DATABASE_URL)이 없습니다.")
+    # Prometheus endpoint / textfile / JSON span log when JTBC_METRICS_* or JTBC_TRACE_LOG is set
+    metrics.setup()
+    # Ctrl-C / SIGTERM: stop sending batches, save what was scored, exit (JTBC_DRAIN_SECONDS deadline)
+    with shutdown.graceful(on_force=(usage.flush, metrics.flush)), db.get_storage().connection() as conn:
         create_table(conn)
-        df = fetch_data(conn)
+        # Pre-v6 rows count under no profile; scoring now would send all of those texts again
+        profiles.require_adopted(conn=conn)
+        if args.from_lake:
+            from jtbc import lake
+            df = lake.scoring_frame()
+        else:
+            df = fetch_data(conn)
         if df.empty:
-            print("No data found.")
+            print("데이터가 없습니다.")
             return
-        scored = score_dataframe(df)
-        insert_scores(conn, scored)
-        ts = aggregate_timeseries(scored)
-        print(ts.head(10))
+        df = profiles.with_hashes(df)
+        work = [(profiles.get(args.scoring_profile), df)]
+        if args.ab:
+            # A/B: the same hash-selected rows on every run/node, so both profiles end up scoring identical texts
+            work.append((profiles.get(args.ab), profiles.sample(df, args.ab_fraction)))
+
+        if args.dedup:
+            # One LLM call per near-duplicate group; the other members get that score copied afterwards
+            from jtbc import embeddings
+
+        for profile, frame in work:
+            profiles.register(profile)
+            # Only rows without a score under this profile; re-runs and interrupted runs pick up the rest
+            plan = profiles.plan(frame, profile)
+            print(profiles.describe(plan))
+            pending = plan.pending
+            if args.limit:
+                pending = pending.sort_values("dt", ascending=False, kind="stable").head(args.limit)
+            copies = pending.iloc[:0]
+            if args.dedup and not pending.empty:
+                pending, copies = embeddings.split_duplicates(df, pending, profile, args.dedup)
+                print(f"유사 중복(>= {args.dedup}): {len(pending)}행 스코어링, {len(copies)}행은 점수 복사")
+            if (pending.empty and copies.empty) or shutdown.requested():
+                continue
+            if not pending.empty:
+                if args.shards:
+                    # Each node scores whichever shards it can lease; the lease rows are the checkpoint
+                    from jtbc import sharding
+                    job_id = args.job if args.job and profile is work[0][0] else sharding.default_job_id(profile)
+                    parts = sharding.run_worker(pending, args.shards, args.shard_by, job_id, conn=conn, profile=profile)
+                    print(f"이 노드에서 {sum(len(p) for p in parts)}행 스코어링. 진행 상황: python -m jtbc shards {job_id}")
+                else:
+                    scored = score_local(conn, pending, profile)
+                    if not scored.empty:
+                        print(aggregate_timeseries(scored).head(10))
+            if not copies.empty:
+                # Sources scored on other shard nodes may not be done yet; those rows stay pending for the next run
+                copied = embeddings.copy_scores(copies, profile, conn=conn)
+                print(f"유사 중복 {copied}행에 점수 복사"
+                      + (f" ({len(copies) - copied}행은 원본 스코어링 대기)" if copied < len(copies) else ""))
+        if args.ab:
+            print(f"비교: python -m jtbc profiles --compare {work[0][0].name} {work[1][0].name}")
+    # Budget caps come from JTBC_BUDGET_USD / JTBC_BUDGET_USD_PER_HOUR
+    usage.flush()
+    print(f"사용량: {usage.describe_totals()}")
+    metrics.flush()
 
 if __name__ == "__main__":
-    main()
+    # --profile (or JTBC_PROFILE=1): stack samples, cProfile and tracemalloc diffs under .jtbc_state/profiles/
+    with profiling.profile_run("llm-ev", profiling.requested(sys.argv)):
+        main()
@@ -0,0 +1,17 @@
+import pytest
+
+from jtbc import config, db
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    """체크포인트/캐시 같은 실행 상태를 테스트마다 임시 디렉토리에 둡니다."""
+    path = tmp_path / "state"
+    monkeypatch.setattr(config, "STATE_DIR", path)
+    return path
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """테스트마다 새 SQLite 파일 저장소. (get_storage 는 URL 별로 하나만 만들므로 경로가 곧 격리 단위)"""
+    return db.get_storage(f"sqlite:///{tmp_path / 'jtbc.db'}")
@@ -0,0 +1,31 @@
+import json
+
+from jtbc import bench, cli
+
+
+def _args(tmp_path, *extra):
+    return cli.build_parser().parse_args([
+        "bench", "--videos", "3", "--comments", "30", "--audio-videos", "2", "--audio-minutes", "0.2",
+        "--score-texts", "20", "--latency", "0", "--whisper-seconds-per-mb", "0", "--error-rate", "0.1",
+        "--db", f"sqlite:///{tmp_path / 'bench.db'}", *extra,
+    ])
+
+
+def test_bench_runs_every_stage_against_fakes(tmp_path):
+    results = bench.run(_args(tmp_path))
+    by_stage = {r.stage: r for r in results}
+    assert set(by_stage) == {"comments", "transcribe", "score"}
+    assert by_stage["comments"].items == 90
+    assert by_stage["transcribe"].items == 2
+    assert by_stage["score"].items == 20
+    assert all(r.throughput > 0 for r in results)
+
+
+def test_compare_flags_regressions(tmp_path):
+    result = bench.StageResult("score", 10, 1.0, 10.0, "texts/s", 5.0, 50.0, 0.0)
+    baseline = tmp_path / "baseline.json"
+    bench.save([result._replace(throughput=20.0, p99_ms=20.0)], str(baseline), {})
+    assert json.loads(baseline.read_text(encoding="utf-8"))["stages"][0]["stage"] == "score"
+    regressions = bench.compare([result], str(baseline), tolerance=0.2)
+    assert len(regressions) == 2
+    assert bench.compare([result], str(baseline), tolerance=2.0) == []
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+from jtbc import captions
+
+
+def _segments(n, seconds=5, text="오늘 국회에서 예산안이 통과됐습니다"):
+    return [{"start": i * seconds, "end": (i + 1) * seconds, "text": text} for i in range(n)]
+
+
+class FakeTranscript:
+    def __init__(self, segments, language_code="ko"):
+        self.segments = segments
+        self.language_code = language_code
+
+    def fetch(self):
+        return SimpleNamespace(snippets=[
+            SimpleNamespace(start=s["start"], duration=s["end"] - s["start"], text=s["text"])
+            for s in self.segments])
+
+
+class FakeTranscriptList:
+    def __init__(self, manual=None, auto=None):
+        self.manual, self.auto = manual, auto
+
+    def find_manually_created_transcript(self, languages):
+        if self.manual is None:
+            raise LookupError("no manual")
+        return self.manual
+
+    def find_generated_transcript(self, languages):
+        if self.auto is None:
+            raise LookupError("no auto")
+        return self.auto
+
+
+def test_quality_gate():
+    good = _segments(12)
+    assert captions.is_acceptable("auto", good, duration_seconds=60)
+    # 영상의 절반도 덮지 못하는 자동 자막
+    assert not captions.is_acceptable("auto", good[:4], duration_seconds=60)
+    # [음악] 태그가 대부분인 자동 자막
+    noisy = good[:4] + [dict(s, text="[음악]") for s in good[4:]]
+    assert captions.assess(noisy, 60)[2] > captions.MAX_NOISE_RATIO
+    assert not captions.is_acceptable("auto", noisy, duration_seconds=60)
+    # 수동 자막은 내용만 있으면 통과
+    assert captions.is_acceptable("manual", good[:4], duration_seconds=60)
+    assert not captions.is_acceptable("manual", [], duration_seconds=60)
+
+
+def test_prefers_manual_then_falls_back(monkeypatch):
+    lists = {
+        "both": FakeTranscriptList(manual=FakeTranscript(_segments(12, text="수동")), auto=FakeTranscript(_segments(12))),
+        "auto": FakeTranscriptList(auto=FakeTranscript(_segments(12))),
+        "poor": FakeTranscriptList(auto=FakeTranscript(_segments(1))),
+    }
+    monkeypatch.setattr(captions, "_list_transcripts", lambda video_id: lists[video_id])
+
+    result = captions.fetch_best_captions("both", duration_seconds=60)
+    assert result.kind == "manual" and result.text.startswith("수동")
+
+    result = captions.fetch_best_captions("auto", duration_seconds=60)
+    assert result.kind == "auto" and result.segments[1] == {"start": 5, "end": 10, "text": _segments(1)[0]["text"]}
+
+    # 품질 미달 자동 자막만 있으면 Whisper 로 넘기도록 None
+    assert captions.fetch_best_captions("poor", duration_seconds=60) is None
+
+
+def test_listing_failure_returns_none(monkeypatch):
+    def boom(video_id):
+        raise RuntimeError("disabled")
+
+    monkeypatch.setattr(captions, "_list_transcripts", boom)
+    assert captions.fetch_best_captions("x") is None
+
+
+def test_run_logs_queue_positions_after_caption_filtering(monkeypatch, capsys):
+    from jtbc import db, transcribe
+
+    videos = [{"video_id": f"v{i}", "published_at": None} for i in range(1, 6)]
+    monkeypatch.setattr(db, "get_videos_without_transcript", lambda **kwargs: videos)
+    # v3 만 자막으로 해결됨
+    monkeypatch.setattr(transcribe, "acquire_captions", lambda queue, workers: [v for v in queue if v["video_id"] != "v3"])
+    monkeypatch.setattr(transcribe, "validate_openai_credentials", lambda: None)
+    processed = []
+    monkeypatch.setattr(transcribe, "process_video", lambda video_id, *args: processed.append(video_id))
+
+    transcribe.run(start_index=2, sleep=(0, 0), order="id")
+    assert processed == ["v2", "v4", "v5"]
+    out = capsys.readouterr().out
+    assert "[2/5] 영상 v2" in out and "[4/5] 영상 v4" in out and "[5/5] 영상 v5" in out
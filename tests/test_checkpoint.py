@@ -0,0 +1,77 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from jtbc import checkpoint, transcribe
+from jtbc.audio import AudioChunk
+
+CHUNKS = 3
+
+
+@pytest.fixture
+def audio(monkeypatch):
+    """25MB 를 넘는 (희소) 오디오 파일과 청크 3개로 나누는 가짜 분할기."""
+    ckpt = checkpoint.ChunkCheckpoint("vid0")
+    path = os.path.join(ckpt.dir, "vid0.mp3")
+    with open(path, "wb") as f:
+        f.truncate(30 * 1024 * 1024)
+    splits = []
+
+    def split(audio_path, chunk_duration_minutes=10, skip=()):
+        splits.append(set(skip))
+        chunks = [AudioChunk(i, f"{audio_path}_chunk_{i}.mp3", i * 600_000, (i + 1) * 600_000) for i in range(CHUNKS)]
+        for chunk in chunks:
+            if chunk.index not in skip:
+                with open(chunk.path, "wb") as f:
+                    f.write(b"x")
+        return chunks
+
+    monkeypatch.setattr(transcribe, "split_audio_file", split)
+    monkeypatch.setattr(transcribe.time, "sleep", lambda _: None)
+    return SimpleNamespace(path=path, splits=splits)
+
+
+def _whisper(monkeypatch, fail_on=None):
+    sent = []
+
+    def create(audio_file, *args):
+        name = os.path.basename(audio_file.name)
+        if name == fail_on:
+            raise ConnectionError("boom")
+        sent.append(name)
+        text = f"text-{name.rsplit('_', 1)[-1][0]}"
+        return SimpleNamespace(text=text, segments=[SimpleNamespace(start=1.0, end=2.5, text=text)])
+
+    monkeypatch.setattr(transcribe, "_create_transcription", create)
+    return sent
+
+
+def test_retry_resends_only_missing_chunks(audio, monkeypatch):
+    sent = _whisper(monkeypatch, fail_on="vid0.mp3_chunk_1.mp3")
+    with pytest.raises(ConnectionError):
+        transcribe.transcribe_audio(audio.path, checkpoint.ChunkCheckpoint("vid0"))
+    assert sent == ["vid0.mp3_chunk_0.mp3"]
+    assert checkpoint.list_pending() == ["vid0"]
+
+    # 새 프로세스처럼 체크포인트를 다시 읽어 재시도: 완료된 청크 0 은 보내지 않고, 남은 청크 파일을 재사용
+    sent = _whisper(monkeypatch)
+    resumed = checkpoint.ChunkCheckpoint("vid0")
+    assert resumed.done_indices() == {0}
+    result = transcribe.transcribe_audio(audio.path, resumed)
+    assert result.text == "text-0 text-1 text-2"
+    assert sent == ["vid0.mp3_chunk_1.mp3", "vid0.mp3_chunk_2.mp3"]
+    # 구간 시각은 청크 시작 위치만큼 밀려 원본 오디오 기준 (체크포인트에 남은 청크 0 포함)
+    assert [(seg["start"], seg["end"]) for seg in result.segments] == [(1.0, 2.5), (601.0, 602.5), (1201.0, 1202.5)]
+    assert audio.splits == [set()]
+
+
+def test_changed_chunk_length_discards_old_results():
+    ckpt = checkpoint.ChunkCheckpoint("vid1")
+    ckpt.plan(10, [AudioChunk(0, "a", 0, 1), AudioChunk(1, "b", 1, 2)])
+    ckpt.record(0, "old")
+    ckpt.plan(5, [AudioChunk(0, "a", 0, 1)])
+    assert ckpt.done_indices() == set() and ckpt.total == 1
+
+    ckpt.clear()
+    assert not os.path.exists(ckpt.dir)
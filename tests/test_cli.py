@@ -0,0 +1,57 @@
+import pytest
+
+from jtbc import cli, config, scheduler, transcribe
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    calls = []
+    monkeypatch.setattr(transcribe, "run", lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+def test_transcribe_defaults(runs):
+    cli.main(["transcribe"])
+    assert len(runs) == 1
+    assert runs[0].items() >= {"since": None, "until": None, "start_index": 1, "workers": 1,
+                               "sleep": config.DEFAULT_SLEEP, "order": scheduler.DEFAULT_POLICY,
+                               "boost_hours": scheduler.DEFAULT_BOOST_HOURS}.items()
+
+
+def test_resume_uses_start_index_env_and_cautious_sleep(runs, monkeypatch):
+    monkeypatch.setattr(config, "START_INDEX", 131)
+    cli.main(["transcribe", "--resume"])
+    assert runs[0]["start_index"] == 131
+    assert runs[0]["sleep"] == config.CAUTIOUS_SLEEP
+    # 재개 순번은 id 순 기준
+    assert runs[0]["order"] == "id"
+
+
+def test_explicit_flags_win(runs):
+    cli.main(["transcribe", "--since", "2025-04-13", "--until", "2025-07-10", "--start-index", "0",
+              "--workers", "3", "--sleep-min", "4", "--sleep-max", "2", "--order", "sjf", "--boost-hours", "0"])
+    assert runs[0].items() >= {"since": "2025-04-13", "until": "2025-07-10", "start_index": 1, "workers": 3,
+                               "sleep": (4, 4), "order": "sjf", "boost_hours": 0.0}.items()
+
+
+def test_key_normalization_and_masking():
+    assert config._normalize_key(' "sk-proj-abc123xyz" ') == "sk-proj-abc123xyz"
+    assert config._normalize_key("`sk-abc`") == "sk-abc"
+    assert config.mask_key("sk-proj-abc123xyz") == "sk-pro...3xyz"
+    assert config.mask_key("") == "None"
+
+
+def test_llm_ev_prints_masked_key_only_when_run(monkeypatch, capsys):
+    import importlib.util
+    from pathlib import Path
+
+    spec = importlib.util.spec_from_file_location("llm_ev", Path(__file__).parents[1] / "llm-ev.py")
+    llm_ev = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(llm_ev)
+    assert capsys.readouterr().out == ""
+
+    monkeypatch.setattr(llm_ev, "OPENAI_API_KEY", "sk-proj-abc123xyz")
+    monkeypatch.setattr(llm_ev, "DB_URL", None)
+    with pytest.raises(RuntimeError, match="SUPABASE_CONNECTION_STRING"):
+        llm_ev.main([])
+    assert capsys.readouterr().out == "OpenAI API 키: sk-pro...3xyz\n"
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from jtbc import discovery
+
+NEWEST = datetime(2025, 6, 30, 12, 0)
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class FakePlaylistItems:
+    def __init__(self, items, page_size=2):
+        self.items, self.page_size, self.pages = items, page_size, []
+
+    def list(self, part, playlistId, maxResults, pageToken=None, fields=None):
+        offset = int(pageToken or 0)
+        self.pages.append(offset)
+        response = {"items": self.items[offset:offset + self.page_size]}
+        if offset + self.page_size < len(self.items):
+            response["nextPageToken"] = str(offset + self.page_size)
+        return FakeRequest(response)
+
+
+class FakeYouTube:
+    def __init__(self, items):
+        self.playlist_items = FakePlaylistItems(items)
+
+    def playlistItems(self):
+        return self.playlist_items
+
+
+def _item(video_id, uploaded, added=None):
+    details = {"videoId": video_id}
+    if uploaded is not None:
+        details["videoPublishedAt"] = uploaded.strftime('%Y-%m-%dT%H:%M:%SZ')
+    added = added or uploaded or NEWEST
+    return {"snippet": {"title": video_id, "publishedAt": added.strftime('%Y-%m-%dT%H:%M:%SZ')},
+            "contentDetails": details}
+
+
+@pytest.fixture
+def youtube(monkeypatch):
+    def install(items):
+        fake = FakeYouTube(items)
+        monkeypatch.setattr(discovery, "get_youtube", lambda: fake)
+        return fake
+    return install
+
+
+def _daily(count):
+    return [_item(f"v{i}", NEWEST - timedelta(days=i)) for i in range(count)]
+
+
+def test_uploads_playlist_stops_at_start_date(youtube):
+    fake = youtube(_daily(20))
+    rows = list(discovery.iter_playlist_videos("UUchannel", NEWEST - timedelta(days=3), NEWEST))
+    assert [r["video_id"] for r in rows] == ["v0", "v1", "v2", "v3"]
+    # 2개씩 페이지: v4 를 만난 3번째 페이지에서 중단
+    assert fake.playlist_items.pages == [0, 2, 4]
+
+
+def test_unknown_order_stops_after_stale_pages(youtube):
+    fake = youtube(_daily(20))
+    rows = list(discovery.iter_playlist_videos("PLcurated", NEWEST - timedelta(days=3), NEWEST))
+    assert len(rows) == 4
+    assert len(fake.playlist_items.pages) == 2 + discovery.STALE_PAGES
+
+
+def test_unsorted_playlist_is_read_to_the_end(youtube):
+    items = _daily(10)
+    items[7], items[1] = items[1], items[7]
+    fake = youtube(items)
+    rows = list(discovery.iter_playlist_videos("PLmixed", NEWEST - timedelta(days=3), NEWEST))
+    assert sorted(r["video_id"] for r in rows) == ["v0", "v1", "v2", "v3"]
+    assert len(fake.playlist_items.pages) == 5
+
+
+def test_window_uses_upload_time_not_playlist_added_time(youtube):
+    # 최근에 재생목록에 추가됐지만 업로드는 오래된 영상, 비공개(업로드 시각 없음) 영상
+    items = [_item("new", NEWEST), _item("private", None),
+             _item("old-upload", NEWEST - timedelta(days=100), added=NEWEST)]
+    youtube(items)
+    rows = list(discovery.iter_playlist_videos("UUchannel", NEWEST - timedelta(days=3), NEWEST))
+    assert [r["video_id"] for r in rows] == ["new"]
+    assert rows[0]["published_at"] == NEWEST
+
+
+def test_parse_duration():
+    assert discovery.parse_duration("PT1H2M3S") == 3723
+    assert discovery.parse_duration("P1DT1S") == 86401
+    assert discovery.parse_duration("") is None
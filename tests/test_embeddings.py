@@ -0,0 +1,109 @@
+import signal
+
+import numpy as np
+import pandas as pd
+
+from jtbc import cli, config, embeddings, profiles, shutdown, usage
+
+
+def _store(tmp_path, rows: int, seed: int = 0, dims: int = 8):
+    rng = np.random.default_rng(seed)
+    store = embeddings.EmbeddingStore(model="test", dims=dims, backend="local", path=tmp_path / "store")
+    store.append([f"h{seed}-{i}" for i in range(rows)], embeddings._normalize(rng.normal(size=(rows, dims))))
+    return store
+
+
+def _members(index) -> list:
+    return [sorted(index.members(l).tolist()) for l in range(len(index.centroids))]
+
+
+def test_load_index_merges_new_rows_into_saved_lists(tmp_path):
+    store = _store(tmp_path, 200)
+    built = embeddings.load_index(store)
+    assert (built.size, built.trained) == (200, 200)
+
+    rng = np.random.default_rng(1)
+    store.append([f"new-{i}" for i in range(50)], embeddings._normalize(rng.normal(size=(50, store.dims))))
+    merged = embeddings.load_index(store)
+    assert (merged.size, merged.trained) == (250, 200)
+    np.testing.assert_array_equal(merged.centroids, built.centroids)
+    # 기존 행은 같은 목록에 그대로, 새 행은 가장 가까운 기존 중심의 목록에
+    labels, _ = embeddings.assign(store.vectors()[200:], built.centroids)
+    for l, members in enumerate(_members(merged)):
+        old = [row for row in members if row < 200]
+        assert old == sorted(built.members(l).tolist())
+        assert [row - 200 for row in members if row >= 200] == np.flatnonzero(labels == l).tolist()
+    assert sorted(merged.order.tolist()) == list(range(250))
+
+    # 저장된 색인을 다시 읽으면 그대로
+    assert _members(embeddings.load_index(store)) == _members(merged)
+
+
+def test_load_index_retrains_after_doubling(tmp_path):
+    store = _store(tmp_path, 50)
+    embeddings.load_index(store)
+    rng = np.random.default_rng(2)
+    store.append([f"new-{i}" for i in range(60)], embeddings._normalize(rng.normal(size=(60, store.dims))))
+    assert embeddings.load_index(store).trained == 110
+
+
+def test_duplicate_leaders_does_not_depend_on_chunk_size(tmp_path):
+    rng = np.random.default_rng(3)
+    base = embeddings._normalize(rng.normal(size=(40, 8)))
+    noisy = embeddings._normalize(np.repeat(base, 5, axis=0) + rng.normal(scale=0.01, size=(200, 8)))
+    store = embeddings.EmbeddingStore(model="test", dims=8, backend="local", path=tmp_path / "store")
+    store.append([f"h{i}" for i in range(200)], noisy)
+    index = embeddings.load_index(store)
+    full = embeddings.duplicate_leaders(store, index, 0.95, chunk=1000)
+    for chunk in (7, 64):
+        np.testing.assert_array_equal(embeddings.duplicate_leaders(store, index, 0.95, chunk=chunk), full)
+    assert len(np.unique(full)) < 200
+
+
+def _cli_store(monkeypatch, hashes, vectors):
+    monkeypatch.setattr(embeddings, "BACKEND", "local")
+    monkeypatch.setattr(embeddings, "MODEL", "test")
+    store = embeddings.EmbeddingStore(dims=vectors.shape[1])
+    store.append(hashes, embeddings._normalize(vectors))
+    return store
+
+
+def test_similar_looks_up_only_the_hits(storage, monkeypatch, capsys):
+    monkeypatch.setattr(config, "DATABASE_URL", storage.url)
+    df = profiles.with_hashes(pd.DataFrame({"dt": ["2025-05-01", "2025-05-02"], "text": ["특검 수사", "날씨 맑음"]}))
+    with storage.connection() as conn:
+        storage.ensure_schema(conn)
+    storage.insert_scores(df.assign(sentiment=0.0, fairness=1.0, notes="", profile_id="p", score_flags=0))
+    _cli_store(monkeypatch, list(df["text_hash"]) + ["unscored"], np.eye(3, 4))
+    monkeypatch.setattr(embeddings, "embed_batch", lambda texts, *args: embeddings._normalize([[1.0, 0.1, 0, 0]]))
+
+    def fetch_data(*args):
+        raise AssertionError("결과 지문만 찾아야 하며 전체 텍스트를 읽으면 안 됨")
+
+    monkeypatch.setattr(storage, "fetch_data", fetch_data)
+    capsys.readouterr()
+    cli.main(["similar", "특검", "-k", "3"])
+    lines = capsys.readouterr().out.strip().splitlines()[-3:]
+    assert lines[0].endswith("2025-05-01 특검 수사")
+    assert any("날씨 맑음" in line for line in lines) and any("unscored" in line for line in lines)
+
+
+def test_topics_embeds_under_budget_and_signal_handling(monkeypatch, capsys):
+    df = profiles.with_hashes(pd.DataFrame({"dt": ["2025-05-01"] * 4, "text": list("abcd")}))
+    monkeypatch.setattr(cli, "_embedding_frame", lambda args: df)
+    monkeypatch.setattr(usage, "_budget_usd", 0.0)
+    seen = {}
+
+    def embed_frame(frame, store):
+        seen["handler"] = signal.getsignal(signal.SIGTERM)
+        seen["budget"] = usage._budget_usd
+        store.append(list(frame["text_hash"]), embeddings._normalize(np.eye(4)))
+        return len(frame)
+
+    _cli_store(monkeypatch, [], np.zeros((0, 4)))
+    monkeypatch.setattr(embeddings, "embed_frame", embed_frame)
+    cli.main(["topics", "--clusters", "2", "--examples", "1", "--budget-usd", "0.5"])
+    assert seen["budget"] == 0.5
+    assert seen["handler"] not in (signal.SIG_DFL, signal.default_int_handler)
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL and not shutdown.requested()
+    assert capsys.readouterr().out.count("#") == 2
@@ -0,0 +1,71 @@
+from datetime import date, datetime
+
+import pytest
+
+from jtbc import config, lake
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(autouse=True)
+def lake_dir(tmp_path, monkeypatch):
+    path = tmp_path / "lake"
+    monkeypatch.setattr(config, "LAKE_DIR", path)
+    return path
+
+
+def _comment(id_, published_at, text):
+    return (id_, f"c{id_}", "vid0", "작성자", text, published_at, 1, datetime(2025, 6, 1), published_at.strftime("%Y-%m"))
+
+
+def test_partitioned_round_trip(lake_dir):
+    schema = lake._schema("comments")
+    rows = [_comment(1, datetime(2025, 4, 30, 23), "사월"), _comment(2, datetime(2025, 5, 1, 1), "오월"),
+            _comment(3, datetime(2025, 5, 2), "오월 둘째")]
+    assert lake._write_partitioned("comments", lake._to_arrow(rows, schema), "t0-0000") == 2
+    # 두 번째 배치는 같은 파티션에 파일을 더함
+    lake._write_partitioned("comments", lake._to_arrow([_comment(4, datetime(2025, 5, 3), "추가")], schema), "t0-0001")
+
+    assert sorted(p.name for p in (lake_dir / "comments").iterdir()) == ["month=2025-04", "month=2025-05"]
+    assert not any((lake_dir / ".staging").iterdir())
+    assert sorted(lake.read_table("comments").column("id").to_pylist()) == [1, 2, 3, 4]
+    may = lake.read_table("comments", columns=["text"], months=["2025-05"]).column("text").to_pylist()
+    assert sorted(may) == sorted(["오월", "오월 둘째", "추가"])
+
+    name, partitions, files, num_rows, size = lake.summary()[0]
+    assert (name, partitions, files, num_rows) == ("comments", 2, 3, 4) and size > 0
+
+
+def test_scoring_frame_combines_comments_and_transcripts():
+    lake._write_partitioned("comments", lake._to_arrow([_comment(1, datetime(2025, 5, 1, 9), "댓글")],
+                                                        lake._schema("comments")), "t0")
+    lake._write_partitioned("transcripts", lake._to_arrow([("vid0", datetime(2025, 5, 2), "대본", datetime(2025, 6, 1), "2025-05")],
+                                                           lake._schema("transcripts")), "t0")
+    frame = lake.scoring_frame()
+    assert sorted(zip(frame["text"], frame["dt"])) == [("대본", date(2025, 5, 2)), ("댓글", date(2025, 5, 1))]
+
+
+def test_export_is_incremental_and_picks_up_new_transcripts(storage, monkeypatch):
+    monkeypatch.setattr(config, "DATABASE_URL", storage.url)
+    storage.insert_data([
+        {"video_id": "vid0", "title": "뉴스룸", "published_at": datetime(2025, 5, 1, 20), "url": "u0",
+         "transcript": "첫 대본", "comments": [("작성자", "좋은 보도", datetime(2025, 5, 1, 21), 3, "c1")]},
+        {"video_id": "vid1", "title": "특보", "published_at": datetime(2025, 6, 2, 9), "url": "u1"},
+    ])
+    with storage.connection() as conn:
+        with storage.cursor(conn) as cur:
+            # 워터마크보다 확실히 이전 시각으로 두어 같은 초 안의 갱신과 구분
+            storage.execute(cur, "UPDATE videos SET created_at = %s", ("2025-06-03 00:00:00",))
+        conn.commit()
+
+    assert lake.export() == {"videos": 2, "comments": 1, "llm_scores": 0, "transcripts": 1}
+    assert lake.read_table("comments").column("comment_id").to_pylist() == ["c1"]
+    assert lake.export() == {"videos": 0, "comments": 0, "llm_scores": 0, "transcripts": 0}
+
+    # 나중에 채운 대본과 다시 받은 대본 모두 내보내고, 스코어링에는 영상별 최신 대본만
+    storage.update_transcript("vid1", "새 대본")
+    storage.update_transcript("vid0", "고친 대본")
+    assert lake.export(tables=("transcripts",)) == {"transcripts": 2}
+    frame = lake.scoring_frame()
+    assert sorted(frame["text"]) == ["고친 대본", "새 대본", "좋은 보도"]
+    assert sorted(p.name for p in (config.LAKE_DIR / "transcripts").iterdir()) == ["month=2025-05", "month=2025-06"]
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from jtbc import config, live, openai_client, profiles
+from jtbc.fakes import FakeOpenAIServer, FakeYouTubeServer
+
+
+@pytest.fixture
+def servers(monkeypatch, storage):
+    """가짜 YouTube/OpenAI 서버와 임시 저장소. 영상은 최근 이틀 안에 올라온 것으로 만듭니다."""
+    first = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) - timedelta(hours=60)
+    with FakeYouTubeServer(videos=2, comments_per_video=3, first_published=first) as youtube, \
+            FakeOpenAIServer() as openai:
+        for name, value in dict(DATABASE_URL=storage.url, OPENAI_API_KEY="sk-test", OPENAI_BASE_URL=openai.base_url,
+                                OPENAI_ORG_ID="", OPENAI_PROJECT_ID="", OPENAI_PROXY="").items():
+            monkeypatch.setattr(config, name, value)
+        openai_client.reset()
+        yield youtube, openai
+        openai_client.reset()
+
+
+def _count(storage, table):
+    with storage.connection() as conn:
+        with storage.cursor(conn) as cur:
+            cur.execute(f"SELECT COUNT(*) FROM {table}")
+            return cur.fetchone()[0]
+
+
+def _run_once(youtube):
+    asyncio.run(live.run_async("PLfake", hours=48, base_url=youtube.base_url, api_key="test", once=True))
+
+
+def test_poll_interval_grows_with_age_and_empty_polls():
+    assert live.poll_interval(0) == live.MIN_INTERVAL
+    assert live.poll_interval(live.HALF_LIFE_HOURS) == 2 * live.MIN_INTERVAL
+    assert live.poll_interval(0, misses=2) == 4 * live.MIN_INTERVAL
+    assert live.poll_interval(1000) == live.MAX_INTERVAL
+
+
+def test_once_stores_new_videos_comments_and_scores(servers, storage):
+    youtube, openai = servers
+    _run_once(youtube)
+    assert _count(storage, "videos") == 2
+    assert _count(storage, "comments") == 6
+    assert _count(storage, "llm_scores") == 6 and openai.completions
+    assert live.unscored(storage, youtube.video_ids, profiles.get()).empty
+
+    # 재시작: DB 의 댓글 ID 로 추적 목록을 되살리므로 다시 저장/스코어링하지 않음
+    completions = openai.completions
+    tracked = live.restore(storage, live._utcnow() - timedelta(hours=48))
+    assert {video_id: len(video.seen) for video_id, video in tracked.items()} == {"vid0": 3, "vid1": 3}
+    _run_once(youtube)
+    assert _count(storage, "comments") == 6 and _count(storage, "llm_scores") == 6
+    assert openai.completions == completions
+
+
+def test_restart_scores_stored_comments_without_scores(servers, storage):
+    youtube, openai = servers
+    asyncio.run(live.run_async("PLfake", hours=48, base_url=youtube.base_url, api_key="test", once=True,
+                               score=False))
+    assert _count(storage, "comments") == 6 and not openai.completions
+    assert len(live.unscored(storage, youtube.video_ids, profiles.get())) == 6
+
+    _run_once(youtube)
+    assert _count(storage, "llm_scores") == 6
+    assert live.unscored(storage, youtube.video_ids, profiles.get()).empty
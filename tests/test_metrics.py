@@ -0,0 +1,66 @@
+import json
+import urllib.request
+
+import pytest
+
+from jtbc import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_spans_nest_and_record_errors(tmp_path, monkeypatch):
+    log = tmp_path / "trace.jsonl"
+    monkeypatch.setattr(metrics, "TRACE_LOG", str(log))
+    monkeypatch.setattr(metrics, "_trace_file", None)
+
+    with metrics.span("transcribe_audio", video_id="vid0"):
+        with pytest.raises(ValueError):
+            with metrics.span("whisper_request"):
+                raise ValueError("boom")
+    metrics._trace_file.close()
+
+    inner, outer = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    assert (inner["stage"], inner["status"], inner["error"]) == ("whisper_request", "error", "ValueError")
+    assert inner["trace_id"] == outer["trace_id"] and inner["parent_id"] == outer["span_id"]
+    assert outer["parent_id"] is None and outer["video_id"] == "vid0"
+
+    stages = {row[0]: row for row in metrics.summary()}
+    assert stages["whisper_request"][1] == 1 and stages["whisper_request"][4] == 1
+    assert stages["transcribe_audio"][4] == 0
+
+
+def test_render_prometheus_text(tmp_path):
+    @metrics.traced("db_write")
+    def write():
+        return "ok"
+
+    assert write() == "ok"
+    metrics.inc("jtbc_whisper_upload_bytes_total", 1024)
+    metrics.observe("jtbc_stage_seconds", 0.02, stage="download_audio")
+    text = metrics.render()
+    assert "# TYPE jtbc_stage_seconds histogram" in text
+    assert "jtbc_whisper_upload_bytes_total 1024" in text
+    assert 'jtbc_stage_seconds_bucket{stage="download_audio",le="0.01"} 0' in text
+    assert 'jtbc_stage_seconds_bucket{stage="download_audio",le="0.025"} 1' in text
+    assert 'jtbc_stage_seconds_count{stage="db_write"} 1' in text
+
+    path = tmp_path / "jtbc.prom"
+    metrics.flush(str(path))
+    assert path.read_text(encoding="utf-8") == text
+
+
+def test_metrics_endpoint():
+    metrics.inc("jtbc_texts_scored_total", 3)
+    server = metrics.serve(0, host="127.0.0.1")
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            body = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert "jtbc_texts_scored_total 3" in body
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from jtbc import db, migrations
+
+POSTGRES_URL = os.getenv("JTBC_TEST_POSTGRES_URL")
+
+
+def test_migrate_is_idempotent(storage):
+    with storage.connection() as conn:
+        first = migrations.migrate(storage, conn, verbose=False)
+        second = migrations.migrate(storage, conn, verbose=False)
+        status = migrations.status(storage, conn)
+    assert first == [version for version, _, _ in migrations.MIGRATIONS]
+    assert second == []
+    assert all(applied for _, _, applied in status)
+
+
+def test_migrate_applies_only_missing_versions(storage):
+    with storage.connection() as conn:
+        migrations.migrate(storage, conn, verbose=False)
+        with storage.cursor(conn) as cur:
+            storage.execute(cur, "DELETE FROM schema_migrations WHERE version = %s", (migrations.LATEST,))
+        conn.commit()
+        assert migrations.migrate(storage, conn, verbose=False) == [migrations.LATEST]
+
+
+def test_baseline_creates_search_and_query_indexes(storage):
+    with storage.connection() as conn:
+        migrations.migrate(storage, conn, verbose=False)
+        with storage.cursor(conn) as cur:
+            cur.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            indexes = {row[0] for row in cur.fetchall()}
+    assert {"transcript_segment_grams_gram_idx", "transcript_segment_grams_segment_idx",
+            "comments_video_id_idx", "videos_pending_idx", "comments_comment_key"} <= indexes
+
+
+def test_comment_key_upserts_like_count(storage):
+    row = {"video_id": "vid0", "title": "t", "published_at": "2025-05-01 20:00:00", "url": "u",
+           "comments": [("작성자", "댓글", "2025-05-01 21:00:00", 1, "c1")]}
+    storage.insert_data([row])
+    row["comments"] = [("작성자", "댓글", "2025-05-01 21:00:00", 7, "c1")]
+    storage.insert_data([row])
+    with storage.connection() as conn:
+        with storage.cursor(conn) as cur:
+            cur.execute("SELECT like_count FROM comments")
+            assert cur.fetchall() == [(7,)]
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="JTBC_TEST_POSTGRES_URL (비워도 되는 테스트용 PostgreSQL) 미지정")
+@pytest.mark.parametrize("table", sorted(migrations.PARTITION_KEYS))
+def test_partition_monthly_keeps_every_index(table):
+    storage = db.get_storage(POSTGRES_URL)
+
+    def index_names(cur):
+        cur.execute("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s",
+                    (table,))
+        return {row[0] for row in cur.fetchall()}
+
+    with storage.connection() as conn:
+        with storage.cursor(conn) as cur:
+            cur.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public")
+        conn.commit()
+        migrations.migrate(storage, conn, verbose=False)
+        with storage.cursor(conn) as cur:
+            before = index_names(cur) - {f"{table}_pkey"}
+        migrations.partition_monthly(storage, conn, table)
+        with storage.cursor(conn) as cur:
+            assert migrations.is_partitioned(cur, table)
+            after = index_names(cur)
+    assert before and before | {f"{table}_id_idx"} == after
@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from jtbc import config, openai_client
+
+
+def test_cli_startup_skips_heavy_modules():
+    code = ("import sys; from jtbc import cli; cli.build_parser(); "
+            "print(sorted(m for m in ('openai', 'httpx', 'yt_dlp', 'psycopg2', 'pydub') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=config.REPO_ROOT).stdout
+    assert out.strip() == "[]"
+
+
+@pytest.fixture
+def credentials(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "STATE_DIR", tmp_path)
+    monkeypatch.setattr(config, "OPENAI_API_KEY", "sk-test-key")
+    monkeypatch.setattr(config, "OPENAI_VALIDATION_TTL", 3600)
+    return tmp_path / "openai_credentials.json"
+
+
+def test_validation_cache_is_keyed_by_credentials(credentials, monkeypatch):
+    assert not openai_client._load_cached_validation()
+    openai_client._store_cached_validation()
+    assert "sk-test-key" not in credentials.read_text(encoding="utf-8")
+    assert openai_client._load_cached_validation()
+
+    monkeypatch.setattr(config, "OPENAI_PROJECT_ID", "proj_other")
+    assert not openai_client._load_cached_validation()
+
+
+def test_validation_cache_expires(credentials, monkeypatch):
+    credentials.write_text(json.dumps({"fingerprint": openai_client._credential_fingerprint(), "validated_at": 0}),
+                           encoding="utf-8")
+    assert not openai_client._load_cached_validation()
+    monkeypatch.setattr(config, "OPENAI_VALIDATION_TTL", 0)
+    openai_client._store_cached_validation()
+    assert not openai_client._load_cached_validation()
@@ -0,0 +1,48 @@
+import os
+from types import SimpleNamespace
+
+from jtbc import checkpoint, probe, transcribe
+
+
+def test_short_video_is_one_chunk():
+    plan = probe.plan_chunks(20 * 60)
+    assert not plan.needs_split
+    assert plan.chunks == [(0, 0, 20 * 60 * 1000)]
+    assert plan.cost_usd == 20 * probe.WHISPER_USD_PER_MINUTE
+
+
+def test_long_video_uses_split_audio_file_boundaries():
+    duration = 2 * 3600 + 5 * 60
+    plan = probe.plan_chunks(duration)
+    assert plan.needs_split and plan.estimated_mb > probe.WHISPER_LIMIT_MB
+    step = probe.CHUNK_MINUTES * 60 * 1000
+    assert len(plan.chunks) == 13
+    assert plan.chunks[1] == (1, step, 2 * step)
+    assert plan.chunks[-1] == (12, 12 * step, duration * 1000)
+
+
+def test_segmented_downloads_only_missing_ranges(monkeypatch):
+    downloads, sent = [], []
+
+    def download(video_id, output_path, sleep=None, start_ms=None, end_ms=None):
+        downloads.append(start_ms)
+        with open(output_path + ".mp3", "wb") as f:
+            f.write(b"x")
+
+    def create(audio_file, *args):
+        sent.append(os.path.basename(audio_file.name))
+        return SimpleNamespace(text=f"t{len(sent)}", segments=[])
+
+    monkeypatch.setattr(transcribe, "download_audio", download)
+    monkeypatch.setattr(transcribe, "_create_transcription", create)
+    plan = probe.plan_chunks(3 * 3600)
+    ckpt = checkpoint.ChunkCheckpoint("vid0")
+    ckpt.plan(probe.CHUNK_MINUTES, [transcribe.AudioChunk(i, "", s, e) for i, s, e in plan.chunks])
+    for index in range(0, len(plan.chunks), 2):
+        ckpt.record(index, f"done{index}")
+
+    text = transcribe.transcribe_segmented("vid0", ckpt, plan)
+    odd = [start for index, start, _ in plan.chunks if index % 2]
+    assert downloads == odd
+    assert len(sent) == len(odd)
+    assert text.text.split()[:3] == ["done0", "t1", "done2"]
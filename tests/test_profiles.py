@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from jtbc import profiles
+
+V2 = profiles.V1._replace(name="v2", system_prompt=profiles.V1.system_prompt + "\nBe brief.")
+
+
+def _scores(df, profile):
+    df = profiles.with_hashes(df)
+    return df.assign(sentiment=0.0, fairness=1.0, notes="", profile_id=profile.profile_id, score_flags=0)
+
+
+def test_profile_id_ignores_the_name():
+    assert profiles.V1._replace(name="renamed").profile_id == profiles.V1.profile_id
+    assert V2.profile_id != profiles.V1.profile_id
+
+
+def test_plan_skips_rows_the_profile_already_scored(storage):
+    df = pd.DataFrame({"dt": ["2025-05-01"] * 4, "text": ["a", "b", "dup", "dup"]})
+    with storage.connection() as conn:
+        storage.ensure_schema(conn)
+    storage.insert_scores(_scores(df.iloc[[0, 2]], profiles.V1))
+    storage.insert_scores(_scores(df.iloc[[1]], V2))
+
+    plan = profiles.plan(df, profiles.V1, storage)
+    # 같은 (dt, text) 는 저장된 횟수만큼만 빠지므로 두 번째 dup 은 남음
+    assert list(plan.pending["text"]) == ["b", "dup"]
+    assert (plan.total, plan.current, plan.stale, plan.new) == (4, 2, 1, 1)
+
+    storage.insert_scores(_scores(plan.pending, profiles.V1))
+    assert profiles.plan(df, profiles.V1, storage).pending.empty
+
+
+def test_sample_is_stable_across_runs():
+    df = pd.DataFrame({"dt": ["2025-05-01"] * 200, "text": [f"t{i}" for i in range(200)]})
+    first, second = profiles.sample(df, 0.2), profiles.sample(df.iloc[::-1], 0.2)
+    assert sorted(first["text"]) == sorted(second["text"])
+    assert 10 < len(first) < 80
+
+
+def test_legacy_scores_block_scoring_until_adopted(storage):
+    df = pd.DataFrame({"dt": ["2025-05-01"], "text": ["기존 점수"]})
+    with storage.connection() as conn:
+        storage.ensure_schema(conn)
+        with storage.cursor(conn) as cur:
+            cur.execute("INSERT INTO llm_scores (dt, text, sentiment, fairness, notes) "
+                        "VALUES ('2025-05-01', '기존 점수', 0.1, 0.5, '')")
+        conn.commit()
+    with pytest.raises(RuntimeError, match="--adopt-legacy"):
+        profiles.require_adopted(storage)
+
+    assert storage.adopt_legacy_scores(profiles.V1.profile_id) == 1
+    profiles.require_adopted(storage)
+    plan = profiles.plan(df, profiles.V1, storage)
+    assert (plan.current, plan.new) == (1, 0)
@@ -0,0 +1,52 @@
+import threading
+
+from jtbc import metrics, profiling
+
+
+def test_requested():
+    assert profiling.requested(["transcribe", "--profile"])
+    assert not profiling.requested(["transcribe"])
+
+
+def test_profile_run_writes_artifacts(state_dir):
+    @profiling.track_memory("build")
+    def build():
+        return [bytes(1024) for _ in range(2000)]
+
+    def busy(stop):
+        while not stop.is_set():
+            sum(range(1000))
+
+    metrics.reset()
+    stop = threading.Event()
+    with profiling.profile_run("test") as out:
+        worker = threading.Thread(target=busy, args=(stop,), name="busy-worker")
+        worker.start()
+        with metrics.span("build_stage"):
+            assert len(build()) == 2000
+        threading.Event().wait(0.05)
+        stop.set()
+        worker.join()
+    metrics.reset()
+
+    assert out.parent == state_dir / "profiles"
+    names = {p.name for p in out.iterdir()}
+    assert {"stacks.folded", "cprofile.pstats", "cprofile.txt", "stages.txt", "memory-build-001.txt"} <= names
+    # 작업자 스레드도 샘플링됨 (cProfile 은 메인 스레드만 봄)
+    assert "busy-worker;" in (out / "stacks.folded").read_text(encoding="utf-8")
+    stages = (out / "stages.txt").read_text(encoding="utf-8")
+    assert "build_stage" in stages and "(run)" in stages
+    assert (out / "memory-build-001.txt").read_text(encoding="utf-8").startswith("build: 호출 중 최대")
+
+
+def test_disabled_profile_and_untracked_memory_are_no_ops():
+    calls = []
+
+    @profiling.track_memory("noop")
+    def work():
+        calls.append(1)
+        return "done"
+
+    with profiling.profile_run("off", enabled=False) as out:
+        assert work() == "done"
+    assert out is None and calls == [1]
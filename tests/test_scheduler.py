@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from jtbc import scheduler
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+def _video(video_id, days_old, comments=0, duration=None, id_=0):
+    return {"id": id_, "video_id": video_id, "published_at": NOW - timedelta(days=days_old),
+            "comment_count": comments, "comment_likes": 0, "duration_seconds": duration}
+
+
+VIDEOS = [
+    _video("old-busy-short", 90, comments=500, duration=300, id_=1),
+    _video("recent-quiet-long", 5, comments=0, duration=3600, id_=2),
+    _video("recent-busy-short", 5, comments=200, duration=600, id_=3),
+    _video("fresh", 0.5, comments=0, duration=7200, id_=4),
+]
+
+
+def _order(policy, boost_hours=0.0):
+    return [v["video_id"] for v in scheduler.order_videos(VIDEOS, policy, boost_hours, now=NOW)]
+
+
+def test_policies():
+    assert _order("id") == ["old-busy-short", "recent-quiet-long", "recent-busy-short", "fresh"]
+    assert _order("recency") == ["fresh", "recent-quiet-long", "recent-busy-short", "old-busy-short"]
+    assert _order("engagement")[:2] == ["old-busy-short", "recent-busy-short"]
+    assert _order("sjf") == ["old-busy-short", "recent-busy-short", "recent-quiet-long", "fresh"]
+    assert _order("balanced")[0] == "recent-busy-short"
+
+
+def test_boost_moves_new_uploads_first_except_in_id_order():
+    assert _order("sjf", boost_hours=24)[0] == "fresh"
+    assert _order("id", boost_hours=24)[0] == "old-busy-short"
+
+
+def test_unknown_duration_uses_median_of_known():
+    videos = VIDEOS + [_video("unknown", 5, comments=200, duration=None, id_=5)]
+    ordered = [v["video_id"] for v in scheduler.order_videos(videos, "sjf", 0, now=NOW)]
+    # 알려진 길이 300/600/3600/7200 의 중앙값 2100초로 추정
+    assert ordered.index("recent-busy-short") < ordered.index("unknown") < ordered.index("recent-quiet-long")
+    assert scheduler.estimate_hours(videos) == pytest.approx((300 + 3600 + 600 + 7200 + 2100) / 3600)
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        scheduler.order_videos(VIDEOS, "random")
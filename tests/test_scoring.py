@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from jtbc import profiles
+from jtbc.scoring import (FLAG_CLIPPED, FLAG_INVALID, FLAG_MISALIGNED, FLAG_MISSING, ScoreColumns)
+
+
+def test_fill_writes_in_place_and_flags_short_batch():
+    columns = ScoreColumns(5)
+    end = columns.fill(1, 3, [{"sentiment": 0.5, "fairness": "0.25", "notes": "ok"}, {"sentiment": -0.2}])
+    assert end == 4
+    assert columns.sentiment[1] == 0.5 and columns.fairness[1] == 0.25
+    assert columns.notes[1] == "ok"
+    # 행 0, 4 는 이 배치가 아니므로 그대로
+    assert np.isnan(columns.sentiment[0]) and columns.flags[0] == 0 and columns.flags[4] == 0
+    # 결과가 모자라면 배치 전체에 misaligned, 빠진 행에 missing
+    assert all(columns.flags[1:4] & FLAG_MISALIGNED)
+    assert columns.flags[3] & FLAG_MISSING
+    assert not columns.flags[2] & FLAG_MISSING
+
+
+def test_fill_drops_extra_results_and_non_dict_items():
+    columns = ScoreColumns(2)
+    columns.fill(0, 2, ["not a dict", {"sentiment": 0.1, "fairness": 0.9}, {"sentiment": 1.0}])
+    assert columns.flags[0] & FLAG_MISSING
+    assert columns.sentiment[1] == 0.1
+    assert all(columns.flags & FLAG_MISALIGNED)
+
+
+def test_validate_flags_invalid_and_clips_out_of_range():
+    columns = ScoreColumns(3)
+    columns.fill(0, 3, [{"sentiment": "abc", "fairness": 0.5},
+                        {"sentiment": 3.0, "fairness": -1.0},
+                        {"sentiment": True, "fairness": float("inf")}])
+    columns.validate(0, 3)
+    assert columns.flags[0] & FLAG_INVALID and np.isnan(columns.sentiment[0])
+    assert columns.flags[1] & FLAG_CLIPPED
+    assert (columns.sentiment[1], columns.fairness[1]) == (1.0, 0.0)
+    # bool 은 숫자로 보지 않고, inf 는 NULL 이 됨
+    assert columns.flags[2] & FLAG_INVALID
+    assert np.isnan(columns.sentiment[2]) and np.isnan(columns.fairness[2])
+    assert columns.counts(3) == {"invalid": 2, "clipped": 1}
+
+
+def test_validate_does_not_mark_missing_rows_invalid():
+    columns = ScoreColumns(2)
+    columns.fill(0, 2, [{"sentiment": 0.0, "fairness": 1.0}])
+    columns.validate(0, 2)
+    assert columns.flags[1] & FLAG_MISSING and not columns.flags[1] & FLAG_INVALID
+
+
+def test_frame_attaches_scores_and_profile():
+    df = pd.DataFrame({"text": ["a", "b"], "dt": ["2025-05-01", "2025-05-02"]})
+    columns = ScoreColumns(2)
+    columns.fill(0, 2, [{"sentiment": 0.2, "fairness": 0.4, "notes": "x"}, {"sentiment": -0.2, "fairness": 0.6}])
+    frame = columns.frame(df, 0, 2)
+    assert list(frame["sentiment"]) == [0.2, -0.2]
+    assert set(frame["profile_id"]) == {profiles.V1.profile_id}
+    assert list(frame["text_hash"]) == [profiles.row_digest(dt, text) for dt, text in zip(df["dt"], df["text"])]
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from jtbc import db
+
+
+def _video(storage, video_id: str, published_at: datetime, segments: list):
+    storage.upsert_videos([{"video_id": video_id, "title": video_id, "published_at": published_at,
+                            "url": f"https://youtu.be/{video_id}"}])
+    storage.update_transcript(video_id, " ".join(segments),
+                              segments=[{"start": i, "end": i + 1, "text": text} for i, text in enumerate(segments)])
+
+
+def test_segment_grams_stay_inside_words():
+    assert db.segment_grams("특검 수사") == {"특검", "수사"}
+    assert db.segment_grams("Abc 가") == {"ab", "bc"}
+    assert db.segment_grams("") == set()
+
+
+def test_query_gram_picks_the_longest_word():
+    assert db.query_gram("특검 수사팀") == "수사"
+    assert db.query_gram("검") is None
+    assert db.query_gram("  ") is None
+
+
+def test_search_segments_newest_first_and_reindexed_on_replace(storage):
+    now = datetime.now()
+    _video(storage, "old", now - timedelta(days=400), ["특검 수사 시작", "날씨"])
+    _video(storage, "new", now - timedelta(days=1), ["특검 연장"])
+    assert [row["video_id"] for row in storage.search_segments("특검")] == ["new", "old"]
+    assert [row["text"] for row in storage.search_segments("수사 시작")] == ["특검 수사 시작"]
+
+    # 대본을 교체하면 예전 구간의 색인 행도 사라짐
+    _video(storage, "old", now - timedelta(days=400), ["날씨"])
+    assert [row["video_id"] for row in storage.search_segments("특검")] == ["new"]
+
+
+def test_republished_video_moves_in_index_order(storage):
+    now = datetime.now()
+    _video(storage, "a", now - timedelta(days=10), ["특검 수사"])
+    _video(storage, "b", now - timedelta(days=5), ["특검 연장"])
+    assert [row["video_id"] for row in storage.search_segments("특검")] == ["b", "a"]
+    # 게시일이 정정되면 색인에 복사해 둔 published_at 도 따라감
+    storage.upsert_videos([{"video_id": "a", "title": "a", "published_at": now - timedelta(days=1), "url": "u"}])
+    assert [row["video_id"] for row in storage.search_segments("특검")] == ["a", "b"]
+
+
+def test_single_character_query_searches_recent_videos_only(storage):
+    now = datetime.now()
+    _video(storage, "old", now - timedelta(days=400), ["검찰"])
+    _video(storage, "new", now - timedelta(days=1), ["검사"])
+    assert [row["video_id"] for row in storage.search_segments("검", short_days=30)] == ["new"]
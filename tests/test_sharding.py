@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from jtbc import db, scoring, sharding, usage
+
+
+def test_claim_shard_gives_each_shard_to_one_owner(storage):
+    storage.init_shards("job", 4, "row")
+    with ThreadPoolExecutor(8) as pool:
+        claimed = list(pool.map(lambda i: storage.claim_shard("job", f"node-{i}", 60), range(8)))
+    won = [row for row in claimed if row is not None]
+    assert sorted(row["shard"] for row in won) == [0, 1, 2, 3]
+    assert len({row["owner"] for row in won}) == 4
+    assert storage.claim_shard("job", "late", 60) is None
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_is_fenced(storage):
+    storage.init_shards("job", 1, "row")
+    first = storage.claim_shard("job", "a", -1)
+    second = storage.claim_shard("job", "b", 60)
+    assert (first["shard"], second["shard"]) == (0, 0)
+    assert not storage.renew_shard("job", 0, "a", 60)
+    scored = pd.DataFrame({"dt": ["2025-05-01"], "text": ["x"], "sentiment": [0.0], "fairness": [1.0], "notes": [""]})
+    with pytest.raises(db.LeaseLost):
+        storage.commit_shard_chunk("job", 0, "a", scored, "h", 60)
+
+
+def test_init_shards_rejects_a_different_layout(storage):
+    storage.init_shards("job", 2, "row")
+    storage.init_shards("job", 2, "row")
+    with pytest.raises(ValueError):
+        storage.init_shards("job", 3, "row")
+
+
+def test_resume_after_duplicate_rows_keeps_the_second_copy(storage, monkeypatch):
+    df = pd.DataFrame({"dt": ["2025-05-01"] * 5, "text": ["a", "b", "dup", "dup", "c"]})
+    order = sharding.assign(df, 1).sort_values("_key")["text"].tolist()
+    stop_after = order.index("dup") + 1  # 같은 지문 두 행 사이에서 끊김
+    calls = {"n": 0}
+
+    def analyze_batch(texts, profile=None):
+        if calls["n"] == stop_after:
+            raise usage.BudgetExceeded("test")
+        calls["n"] += 1
+        return [{"sentiment": 0.0, "fairness": 1.0, "notes": ""} for _ in texts]
+
+    real = scoring.score_dataframe
+    monkeypatch.setattr(scoring, "analyze_batch", analyze_batch)
+    monkeypatch.setattr(scoring, "score_dataframe", lambda part, sink, **kwargs: real(part, batch_size=1, sink=sink, flush_rows=1, **kwargs))
+
+    first = sharding.run_worker(df, 1, job_id="job", storage=storage)
+    calls["n"] = -100  # 두 번째 실행은 끝까지
+    second = sharding.run_worker(df, 1, job_id="job", storage=storage)
+    texts = first[0]["text"].tolist() + second[0]["text"].tolist()
+    assert len(first[0]) == stop_after and sorted(texts) == sorted(df["text"])
+    assert storage.shard_jobs()[0]["rows_done"] == len(df)
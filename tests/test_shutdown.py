@@ -0,0 +1,65 @@
+import os
+import signal
+import threading
+
+import pandas as pd
+import pytest
+
+from jtbc import profiles, scoring, shutdown
+
+
+@pytest.fixture(autouse=True)
+def fresh_shutdown(monkeypatch):
+    """종료 요청 상태는 프로세스 전역이라 테스트마다 새로 만듭니다."""
+    monkeypatch.setattr(shutdown, "_event", threading.Event())
+    monkeypatch.setattr(shutdown, "_force_callbacks", [])
+    monkeypatch.setattr(shutdown, "_timer", None)
+
+
+def test_signal_requests_drain_and_wakes_sleepers():
+    forced = []
+    with shutdown.graceful(drain_seconds=60, on_force=(lambda: forced.append(1),)):
+        assert not shutdown.requested()
+        os.kill(os.getpid(), signal.SIGTERM)
+        assert shutdown.wait(5) is True
+        assert shutdown.requested()
+        with pytest.raises(shutdown.Interrupted):
+            shutdown.check()
+        assert shutdown._timer is not None
+    # 블록을 정상적으로 빠져나오면 강제 종료 타이머와 콜백이 해제됨
+    assert shutdown._timer is None and shutdown._force_callbacks == []
+    assert forced == []
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+
+
+def _texts(n):
+    return pd.DataFrame({"dt": ["2025-05-01"] * n, "text": [f"댓글 {i}" for i in range(n)]})
+
+
+def test_scoring_drains_after_request_and_resumes_from_stored_scores(storage, monkeypatch):
+    calls = []
+
+    def analyze(texts, profile=None):
+        calls.append(len(texts))
+        if len(calls) == 2:
+            shutdown.request("test", drain_seconds=60)  # 진행 중인 배치는 끝까지 받음
+        return [{"sentiment": 0.1, "fairness": 0.5, "notes": ""} for _ in texts]
+
+    monkeypatch.setattr(scoring, "analyze_batch", analyze)
+    with storage.connection() as conn:
+        storage.ensure_schema(conn)
+    committed = []
+
+    def sink(frame):
+        committed.append(frame)
+        storage.insert_scores(frame)
+
+    df = _texts(10)
+    scored = scoring.score_dataframe(df, batch_size=2, sink=sink, flush_rows=3, profile=profiles.V1)
+    assert calls == [2, 2] and len(scored) == 4
+    assert [len(frame) for frame in committed] == [4]
+    shutdown._timer.cancel()
+
+    # 재실행: 저장된 4행은 건너뜀
+    remaining = profiles.plan(df, profiles.V1, storage).pending
+    assert remaining["text"].tolist() == [f"댓글 {i}" for i in range(4, 10)]
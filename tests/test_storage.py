@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pytest
+
+from jtbc import db
+
+
+def _collect(storage):
+    storage.insert_data([{
+        "video_id": "vid0", "title": "뉴스룸", "published_at": datetime(2025, 5, 1, 20), "url": "u",
+        "transcript": "특검 수사 시작", "segments": [{"start": 0, "end": 2, "text": "특검 수사 시작"}],
+        "comments": [("작성자", "좋은 보도", datetime(2025, 5, 1, 21), 3, "c1")],
+    }])
+
+
+def test_sqlite_round_trip(storage):
+    _collect(storage)
+    status = storage.get_transcript_status()
+    assert (status["total"], status["done"], status["pending"]) == (1, 1, 0)
+    assert sorted(storage.fetch_data()["text"]) == ["좋은 보도", "특검 수사 시작"]
+    assert [row["start_s"] for row in storage.search_segments("수사")] == [0.0]
+
+
+def test_sync_uploads_once_and_reindexes_segments(storage, tmp_path):
+    pytest.importorskip("duckdb")
+    _collect(storage)
+    target_url = f"duckdb:///{tmp_path / 'target.duckdb'}"
+
+    counts = db.sync_storage(storage.url, target_url)
+    assert counts == {"videos": 1, "transcript_segments": 1, "comments": 1, "llm_scores": 0,
+                      "scoring_profiles": 0}
+    target = db.get_storage(target_url)
+    assert [row["video_id"] for row in target.search_segments("특검")] == ["vid0"]
+
+    # 워터마크 이후 행만 다시 올림
+    again = db.sync_storage(storage.url, target_url)
+    assert again["comments"] == 0 and again["transcript_segments"] == 0
@@ -0,0 +1,52 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from jtbc import transport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    peers = []
+
+    def do_GET(self):
+        self.peers.append(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    _Handler.peers = []
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_client_reuses_kept_alive_connection(server):
+    with transport.build_http_client(concurrency=2) as client:
+        for _ in range(5):
+            assert client.get(server).text == "ok"
+    assert len(_Handler.peers) == 5
+    assert len(set(_Handler.peers)) == 1
+
+
+def test_pool_size_follows_concurrency(monkeypatch):
+    monkeypatch.setattr(transport, "MAX_CONNECTIONS", 0)
+    assert transport.build_limits(1).max_connections == 4
+    assert transport.build_limits(16).max_connections == 18
+    monkeypatch.setattr(transport, "MAX_CONNECTIONS", 7)
+    assert transport.build_limits(16).max_connections == 7
+
+
+def test_timeouts_are_split_per_phase():
+    timeout = transport.build_timeout()
+    assert (timeout.connect, timeout.read, timeout.write, timeout.pool) == (
+        transport.CONNECT_TIMEOUT, transport.READ_TIMEOUT, transport.WRITE_TIMEOUT, transport.POOL_TIMEOUT)
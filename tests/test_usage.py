@@ -0,0 +1,66 @@
+from collections import deque
+
+import pytest
+
+from jtbc import config, usage
+
+
+@pytest.fixture(autouse=True)
+def ledger(monkeypatch):
+    """사용량 집계는 프로세스 전역이라 테스트마다 비워 둡니다."""
+    monkeypatch.setattr(usage, "_pending", [])
+    monkeypatch.setattr(usage, "_totals", {})
+    monkeypatch.setattr(usage, "_recent", deque())
+    monkeypatch.setattr(usage, "_spent", 0.0)
+    monkeypatch.setattr(usage, "_budget_usd", 0.0)
+    monkeypatch.setattr(usage, "_budget_per_hour", 0.0)
+    monkeypatch.setattr(usage, "_atexit_registered", True)
+
+
+def test_costs():
+    assert usage.whisper_cost(120) == pytest.approx(2 * usage.WHISPER_USD_PER_MINUTE)
+    assert usage.chat_cost(1_000_000, 0) == pytest.approx(usage.CHAT_USD_PER_1M_INPUT)
+
+
+def test_total_budget_stops_further_calls():
+    usage.set_budget(total_usd=0.01)
+    usage.check_budget()
+    usage.record("whisper", "whisper-1", 1.0, audio_seconds=120)  # $0.012
+    with pytest.raises(usage.BudgetExceeded):
+        usage.check_budget()
+
+
+def test_hourly_budget_throttles_until_window_clears(monkeypatch):
+    clock = {"now": 10_000.0}
+    sleeps = []
+
+    def wait(seconds):
+        sleeps.append(seconds)
+        clock["now"] += seconds
+        return False
+
+    monkeypatch.setattr(usage.time, "time", lambda: clock["now"])
+    monkeypatch.setattr(usage.shutdown, "wait", wait)
+    usage.set_budget(per_hour_usd=0.01)
+    usage.record("whisper", "whisper-1", 1.0, audio_seconds=120)
+    usage.check_budget()
+    # 1시간 창에서 첫 기록이 빠질 때까지 최대 60초씩 잠든 뒤 진행
+    assert sum(sleeps) == pytest.approx(3600) and max(sleeps) <= 60
+
+
+def test_ledger_flushes_to_storage(storage, monkeypatch):
+    monkeypatch.setattr(config, "DATABASE_URL", storage.url)
+    with usage.tag(video_id="vid0"):
+        usage.record("whisper", "whisper-1", 2.0, retries=1, audio_seconds=60)
+    usage.record("chat", "gpt-4o-mini", 0.5, items=10, prompt_tokens=1000, completion_tokens=200)
+    usage.record("chat", "gpt-4o-mini", 0.5, outcome="RateLimitError")
+    assert usage.totals()["chat"]["errors"] == 1
+    usage.flush()
+    assert usage._pending == []
+
+    report = storage.usage_report()
+    models = {row["kind"]: row for row in report["models"]}
+    assert models["chat"]["calls"] == 2 and models["chat"]["items"] == 10
+    assert models["whisper"]["retries"] == 1
+    assert [row["video_id"] for row in report["videos"]] == ["vid0"]
+    assert report["runs"][0]["run_id"] == usage.RUN_ID
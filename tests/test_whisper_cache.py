@@ -0,0 +1,57 @@
+import pytest
+
+from jtbc import bench, config, openai_client, transcribe, whisper_cache
+from jtbc.fakes import FakeOpenAIServer
+
+
+@pytest.fixture
+def whisper(monkeypatch, storage):
+    """가짜 Whisper 서버와 임시 저장소. 캐시는 state_dir 아래에 생깁니다."""
+    with FakeOpenAIServer(audio_bytes_per_second=bench.SAMPLE_RATE * 2) as server:
+        for name, value in dict(DATABASE_URL=storage.url, OPENAI_API_KEY="sk-test", OPENAI_BASE_URL=server.base_url,
+                                OPENAI_ORG_ID="", OPENAI_PROJECT_ID="", OPENAI_PROXY="").items():
+            monkeypatch.setattr(config, name, value)
+        monkeypatch.setattr(whisper_cache, "_mode", "on")
+        openai_client.reset()
+        yield server
+        openai_client.reset()
+
+
+def _transcribe(path, video_id, index=0, total=1, offset_s=0.0):
+    with open(path, "rb") as audio_file:
+        return transcribe._create_transcription(audio_file, video_id, index, total, offset_s)
+
+
+def test_same_audio_is_sent_once_and_replayed_offline(whisper, storage, tmp_path):
+    chunks = [tmp_path / "chunk0.wav", tmp_path / "chunk1.wav"]
+    for seed, path in enumerate(chunks):
+        bench.write_wav(path, 20, seed=seed)
+
+    first = [_transcribe(path, "vid0", i, 2, i * 20.0) for i, path in enumerate(chunks)]
+    assert whisper.transcriptions == 2
+    again = _transcribe(chunks[0], "vid0", 0, 2, 0.0)
+    assert whisper.transcriptions == 2 and again.text == first[0].text
+    assert whisper_cache.stats() == {"entries": 2, "bytes": whisper_cache.stats()["bytes"], "videos": 1}
+
+    # replay 모드: API 없이 manifest 로 대본/구간 재구성
+    whisper_cache.set_mode("replay")
+    transcript = transcribe.replay_transcript("vid0")
+    assert transcript.text == " ".join(response.text for response in first)
+    assert transcript.segments[-1]["end"] == pytest.approx(40.0, abs=0.1)
+    with pytest.raises(whisper_cache.CacheMiss):
+        bench.write_wav(tmp_path / "new.wav", 5, seed=9)
+        _transcribe(tmp_path / "new.wav", "vid1")
+    assert whisper.transcriptions == 2
+
+    storage.upsert_videos([{"video_id": "vid0", "title": "t", "published_at": "2025-05-01 20:00:00", "url": "u"}])
+    assert transcribe.replay() == 1
+    assert storage.get_transcript_status()["done"] == 1
+
+
+def test_replay_reports_missing_chunks(whisper, tmp_path):
+    bench.write_wav(tmp_path / "chunk0.wav", 5)
+    _transcribe(tmp_path / "chunk0.wav", "vid2", 0, 2, 0.0)
+    with pytest.raises(whisper_cache.CacheMiss, match="2/2"):
+        whisper_cache.replay_chunks("vid2")
+    with pytest.raises(ValueError):
+        whisper_cache.set_mode("sometimes")
@@ -0,0 +1,44 @@
+import asyncio
+
+from jtbc import ytapi
+from jtbc.fakes import FakeYouTubeServer, _parse_fields, apply_fields
+
+
+def test_harvest_comments_retries_injected_errors():
+    with FakeYouTubeServer(videos=3, comments_per_video=120, error_rate=0.2, seed=1) as server:
+        comments = ytapi.harvest_comments(server.video_ids, max_comments=120, base_url=server.base_url, api_key="test")
+    assert sorted(comments) == sorted(server.video_ids)
+    assert all(len(rows) == 120 for rows in comments.values())
+
+
+def test_playlist_items_carry_upload_time():
+    async def fetch(server):
+        async with ytapi.AsyncYouTubeClient("test", server.base_url) as yt:
+            return await yt.playlist_items("PLfake")
+
+    with FakeYouTubeServer(videos=2, comments_per_video=0) as server:
+        response = asyncio.run(fetch(server))
+    assert [item["contentDetails"]["videoId"] for item in response["items"]] == server.video_ids
+    assert all(item["contentDetails"]["videoPublishedAt"] for item in response["items"])
+
+
+def test_retry_policy():
+    assert ytapi.is_retryable(503, "")
+    assert ytapi.is_retryable(429, "")
+    assert ytapi.is_retryable(403, "rateLimitExceeded")
+    assert not ytapi.is_retryable(403, "quotaExceeded")
+    assert not ytapi.is_retryable(404, "")
+
+
+def test_field_mask_trims_comment_threads():
+    assert _parse_fields("a,b(c,d/e),f/g") == {"a": {}, "b": {"c": {}, "d": {"e": {}}}, "f": {"g": {}}}
+    with FakeYouTubeServer(videos=1, comments_per_video=3) as server:
+        full = server.comment_threads({"videoId": server.video_ids[0]})
+    trimmed = apply_fields(full, _parse_fields(ytapi.COMMENT_THREAD_FIELDS))
+    assert len(str(trimmed)) < len(str(full))
+
+    comments = ytapi.parse_comment_threads(trimmed)
+    assert len(comments) == 3
+    assert all(isinstance(c, ytapi.Comment) and c.comment_id for c in comments)
+    # 필드 순서 = comments INSERT 컬럼 순서 (video_id 제외)
+    assert ytapi.Comment._fields == ("author", "text", "published_at", "like_count", "comment_id")